@@ -0,0 +1,143 @@
+"""
+Búsqueda de pacientes por nombre, en memoria.
+
+IndicePacientes guarda, para cada fragmento de 3 letras (trigrama), los
+pacientes cuyo nombre lo contiene. Buscar un texto solo revisa los pacientes
+que tienen todos sus trigramas, en lugar de recorrer la lista completa.
+"""
+import unicodedata
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from src.models import Paciente
+
+# Largo de los fragmentos indexados
+_LARGO_NGRAMA = 3
+
+
+def normalizar(texto: str) -> str:
+    """
+    Texto como se compara en la búsqueda: en minúsculas y sin acentos
+    ("Peña Ñúñez" -> "pena nunez"), igual que el índice FTS de la base.
+    """
+    texto = texto.lower()
+    if texto.isascii():
+        return texto
+    # NFD separa cada letra de su acento; después se descartan los acentos
+    return "".join(c for c in unicodedata.normalize("NFD", texto) if not unicodedata.combining(c))
+
+
+def _ngramas(texto: str) -> Set[str]:
+    """Todos los fragmentos de _LARGO_NGRAMA letras de texto"""
+    return {texto[i:i + _LARGO_NGRAMA] for i in range(len(texto) - _LARGO_NGRAMA + 1)}
+
+
+class IndicePacientes:
+    """
+    Índice de búsqueda de pacientes por nombre (el texto buscado puede estar
+    en cualquier parte del nombre, sin distinguir mayúsculas ni acentos).
+    - Se carga una vez con todos los pacientes (cargar) y después se mantiene
+      al día con guardar (paciente nuevo o modificado) y quitar (eliminado).
+    - Recuerda la última búsqueda: si el texto nuevo contiene al anterior
+      (por ejemplo al seguir escribiendo), solo filtra los resultados anteriores.
+    Los resultados salen ordenados por nombre, como obtener_todos_pacientes.
+    """
+    
+    def __init__(self, pacientes: Iterable[Paciente] = ()):
+        self._pacientes: Dict[int, Paciente] = {}
+        self._nombres: Dict[int, str] = {}           # id -> nombre normalizado
+        self._ngramas: Dict[str, Set[int]] = {}      # fragmento -> ids
+        self._ultima: Optional[Tuple[str, List[int]]] = None
+        self._orden: Optional[List[int]] = None      # todos los ids, ordenados por nombre
+        self.cargar(pacientes)
+    
+    def __len__(self):
+        return len(self._pacientes)
+    
+    def cargar(self, pacientes: Iterable[Paciente]):
+        """Reemplaza todo el contenido del índice"""
+        self._pacientes.clear()
+        self._nombres.clear()
+        self._ngramas.clear()
+        for paciente in pacientes:
+            self._agregar(paciente)
+        self._olvidar_busquedas()
+    
+    def guardar(self, paciente: Paciente):
+        """Agrega un paciente nuevo o actualiza uno que ya estaba"""
+        if paciente.id in self._pacientes:
+            self._quitar(paciente.id)
+        self._agregar(paciente)
+        self._olvidar_busquedas()
+    
+    def quitar(self, paciente_id: int):
+        """Saca un paciente del índice (si estaba)"""
+        if paciente_id in self._pacientes:
+            self._quitar(paciente_id)
+        self._olvidar_busquedas()
+    
+    def obtener(self, paciente_id: int) -> Optional[Paciente]:
+        """El paciente con ese id, o None si no está en el índice"""
+        return self._pacientes.get(paciente_id)
+    
+    def buscar(self, texto: str = "") -> List[Paciente]:
+        """Pacientes cuyo nombre contiene texto (todos si texto está vacío), ordenados por nombre"""
+        consulta = normalizar(texto.strip())
+        
+        if len(consulta) < _LARGO_NGRAMA:
+            # Texto corto (sin trigramas): se revisan todos
+            candidatos = self._todos()
+        elif self._ultima is not None and self._ultima[0] and self._ultima[0] in consulta:
+            # Se siguió escribiendo: los resultados están entre los anteriores
+            candidatos = self._ultima[1]
+        else:
+            candidatos = self._ordenar(self._candidatos(consulta))
+        
+        ids = [i for i in candidatos if consulta in self._nombres[i]]
+        self._ultima = (consulta, ids)
+        return [self._pacientes[i] for i in ids]
+    
+    # ----- Internas -----
+    
+    def _olvidar_busquedas(self):
+        # Cambió el contenido: la última búsqueda y el orden ya no valen
+        self._ultima = None
+        self._orden = None
+    
+    def _todos(self) -> List[int]:
+        if self._orden is None:
+            self._orden = self._ordenar(self._pacientes)
+        return self._orden
+    
+    def _agregar(self, paciente: Paciente):
+        nombre = normalizar(paciente.nombre)
+        self._pacientes[paciente.id] = paciente
+        self._nombres[paciente.id] = nombre
+        for fragmento in _ngramas(nombre):
+            self._ngramas.setdefault(fragmento, set()).add(paciente.id)
+    
+    def _quitar(self, paciente_id: int):
+        nombre = self._nombres.pop(paciente_id)
+        del self._pacientes[paciente_id]
+        for fragmento in _ngramas(nombre):
+            ids = self._ngramas[fragmento]
+            ids.discard(paciente_id)
+            if not ids:
+                del self._ngramas[fragmento]
+    
+    def _candidatos(self, consulta: str) -> Set[int]:
+        """Ids que pueden contener consulta: los que tienen todos sus trigramas"""
+        # Intersección de los trigramas, empezando por el menos frecuente
+        grupos = sorted(
+            (self._ngramas.get(fragmento, set()) for fragmento in _ngramas(consulta)),
+            key=len
+        )
+        candidatos = set(grupos[0])
+        for grupo in grupos[1:]:
+            if not candidatos:
+                break
+            candidatos &= grupo
+        return candidatos
+    
+    def _ordenar(self, ids: Iterable[int]) -> List[int]:
+        # Mismo orden que ORDER BY nombre en SQLite (por código de cada letra)
+        return sorted(ids, key=lambda i: (self._pacientes[i].nombre, i))
@@ -0,0 +1,50 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+from src.conexion import version_datos
+
+
+class CacheLRU:
+    """
+    Caché de resultados calculados a partir de la base de datos.
+    - Guarda como máximo `capacidad` resultados: al pasarse descarta el usado
+      hace más tiempo (LRU).
+    - Se vacía sola cuando cambian los datos (ver conexion.version_datos), así
+      nunca retorna un resultado desactualizado.
+    Los resultados se comparten entre llamadas: no hay que modificarlos.
+    """
+    
+    def __init__(self, capacidad: int = 24):
+        self.capacidad = capacidad
+        self._datos: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._version = None
+        self._lock = threading.Lock()
+    
+    def obtener(self, clave: Hashable, calcular: Callable[[], Any]) -> Any:
+        """Retorna el resultado guardado para clave, o lo calcula con calcular() y lo guarda"""
+        version = version_datos()
+        
+        with self._lock:
+            if version != self._version:
+                self._datos.clear()
+                self._version = version
+            elif clave in self._datos:
+                self._datos.move_to_end(clave)
+                return self._datos[clave]
+        
+        valor = calcular()
+        
+        with self._lock:
+            # Si mientras se calculaba otra llamada ya vio datos más nuevos,
+            # este valor puede estar desactualizado: no guardarlo
+            if version == self._version:
+                self._datos[clave] = valor
+                if len(self._datos) > self.capacidad:
+                    self._datos.popitem(last=False)
+        return valor
+    
+    def limpiar(self):
+        """Descarta todos los resultados guardados"""
+        with self._lock:
+            self._datos.clear()
@@ -0,0 +1,203 @@
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Iterator
+
+from src import config
+
+# PRAGMAs que se aplican una sola vez, al abrir cada conexión
+PRAGMAS = (
+    "PRAGMA foreign_keys = ON",
+    "PRAGMA busy_timeout = 5000",    # Esperar (ms) si otro hilo tiene la base bloqueada
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA cache_size = -8000",     # ~8 MB de caché de páginas
+)
+
+# Conexiones abiertas, una por hilo. Cada hilo usa y cierra solo la suya:
+# cerrar_conexiones() no toca las de otros hilos (podrían estar en medio de
+# una consulta), solo sube _generacion, y cada hilo al ver que su conexión
+# es de una generación anterior la cierra y abre otra.
+_local = threading.local()
+_generacion = 0
+_lock = threading.Lock()
+
+# Cambios de los datos vistos hasta ahora (ver version_datos)
+_escrituras = 0
+
+# Conexión que solo se usa para leer PRAGMA data_version (ver version_datos):
+# [conexión, último data_version visto], o None si todavía no se abrió
+_monitor = None
+
+
+def _abrir_conexion() -> sqlite3.Connection:
+    """Abre una conexión nueva a la base de datos y le aplica los PRAGMAs"""
+    config.DB_PATH.parent.mkdir(exist_ok=True)
+
+    # isolation_level=None: las transacciones se manejan explícitamente en transaccion()
+    conn = sqlite3.connect(config.DB_PATH, isolation_level=None, check_same_thread=False)
+    for pragma in PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+
+def _conexion_del_hilo() -> sqlite3.Connection:
+    """Retorna la conexión del hilo actual, abriéndola si todavía no existe"""
+    conn = getattr(_local, "conn", None)
+
+    if conn is not None and _local.generacion != _generacion and _local.profundidad == 0:
+        # Otro hilo llamó a cerrar_conexiones() (por ejemplo para reemplazar
+        # el archivo de la base): descartar esta y abrir otra. Dentro de una
+        # transacción se sigue usando la misma hasta terminarla.
+        conn.close()
+        conn = None
+
+    if conn is None:
+        generacion = _generacion
+        conn = _abrir_conexion()
+        _local.conn = conn
+        _local.generacion = generacion
+        _local.profundidad = 0
+    return conn
+
+
+@contextmanager
+def conexion() -> Iterator[sqlite3.Connection]:
+    """
+    Presta la conexión del hilo actual para hacer consultas.
+    La conexión NO se cierra al salir: queda abierta para la próxima consulta.
+    """
+    yield _conexion_del_hilo()
+
+
+@contextmanager
+def transaccion() -> Iterator[sqlite3.Connection]:
+    """
+    Presta la conexión del hilo actual dentro de una transacción.
+    Hace COMMIT al salir sin errores y ROLLBACK si hubo una excepción.
+    Se puede anidar: solo la transacción más externa hace el COMMIT.
+    """
+    conn = _conexion_del_hilo()
+
+    if _local.profundidad > 0:
+        # Ya estamos dentro de una transacción: la externa decide
+        _local.profundidad += 1
+        try:
+            yield conn
+        finally:
+            _local.profundidad -= 1
+        return
+
+    conn.execute("BEGIN")
+    _local.profundidad = 1
+    try:
+        yield conn
+    except BaseException:
+        conn.execute("ROLLBACK")
+        # Quien falló al guardar pudo haber modificado antes objetos que
+        # vienen de una caché (ver cache.CacheLRU): invalidarlas por las dudas
+        _contar_escritura()
+        raise
+    else:
+        # version_datos ve el cambio en el data_version de _monitor
+        conn.execute("COMMIT")
+    finally:
+        _local.profundidad = 0
+
+
+@contextmanager
+def lectura() -> Iterator[sqlite3.Connection]:
+    """
+    Presta la conexión del hilo actual para hacer varias consultas que tienen
+    que ver los mismos datos (una sola transacción de lectura: si otro proceso
+    escribe en el medio, no se mezclan datos de antes y de después).
+    Se puede anidar con transaccion() y con otra lectura(): solo la más
+    externa abre y termina la transacción. No cuenta como escritura, salvo
+    que una transaccion() anidada haya escrito algo.
+    """
+    conn = _conexion_del_hilo()
+
+    if _local.profundidad > 0:
+        # Ya estamos dentro de una transacción: la externa decide
+        _local.profundidad += 1
+        try:
+            yield conn
+        finally:
+            _local.profundidad -= 1
+        return
+
+    cambios = conn.total_changes
+    conn.execute("BEGIN")
+    _local.profundidad = 1
+    try:
+        yield conn
+    except BaseException:
+        conn.execute("ROLLBACK")
+        if conn.total_changes != cambios:
+            # Como en transaccion(): una escritura anidada que se deshizo
+            _contar_escritura()
+        raise
+    else:
+        conn.execute("COMMIT")
+    finally:
+        _local.profundidad = 0
+
+
+def _contar_escritura():
+    """Hace cambiar version_datos aunque data_version no cambie (por ejemplo al deshacer)"""
+    global _escrituras
+    with _lock:
+        _escrituras += 1
+
+
+def version_datos() -> int:
+    """
+    Retorna un valor que cambia cada vez que cambian los datos de la base.
+    Sirve para saber si un resultado guardado en caché sigue siendo válido.
+    
+    Los cambios se detectan con PRAGMA data_version, que cambia cuando
+    confirma una escritura cualquier OTRA conexión: las de los demás hilos de
+    este proceso y las de otros procesos (por ejemplo otra instancia de la
+    aplicación). Por eso se lee siempre de _monitor, una conexión aparte que
+    nunca escribe: cada escritura se cuenta una sola vez, la haga quien la
+    haga. También cuentan las transacciones deshechas y cerrar_conexiones
+    (ver _contar_escritura).
+    """
+    global _escrituras, _monitor
+    with _lock:
+        if _monitor is None:
+            conn = _abrir_conexion()
+            _monitor = [conn, conn.execute("PRAGMA data_version").fetchone()[0]]
+        else:
+            data_version = _monitor[0].execute("PRAGMA data_version").fetchone()[0]
+            if data_version != _monitor[1]:
+                _monitor[1] = data_version
+                _escrituras += 1
+        return _escrituras
+
+
+def cerrar_conexiones():
+    """
+    Cierra la conexión del hilo actual y marca como viejas las de los demás
+    hilos: cada uno cierra la suya y abre otra en su próxima consulta.
+    Se llama al cerrar la aplicación y antes de reemplazar el archivo de la base
+    (por ejemplo al restaurar un backup).
+    """
+    global _generacion, _monitor
+    with _lock:
+        _generacion += 1
+        # El archivo (o la ruta) puede cambiar: version_datos abre otro monitor
+        if _monitor is not None:
+            _monitor[0].close()
+            _monitor = None
+    
+    # El archivo puede cambiar (restauración de backup): invalidar las cachés
+    _contar_escritura()
+
+    conn = getattr(_local, "conn", None)
+    if conn is not None:
+        _local.conn = None
+        try:
+            conn.execute("PRAGMA optimize")
+        except sqlite3.Error:
+            pass
+        conn.close()
@@ -0,0 +1,13 @@
+# Configuración general de la aplicación
+from pathlib import Path
+
+# Ruta a la base de datos
+DB_PATH = Path("data/clinica.db")
+BACKUPS_PATH = Path("backups")
+
+# Copia de la lista de pacientes para mostrarla al abrir (ver snapshot_pacientes.py)
+SNAPSHOT_PACIENTES_PATH = Path("data/lista_pacientes.bin")
+
+# Tiempo máximo (en segundos) desde que arranca la aplicación hasta que la
+# ventana responde (ver iniciar_aplicacion y python -m src.herramientas tiempo-inicio)
+PRESUPUESTO_INICIO = 1.0
@@ -1,19 +1,26 @@
-import sqlite3
-from datetime import datetime
-from typing import List, Optional
+from contextlib import closing, contextmanager
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Dict, Iterator, List, Optional, Tuple
 from pathlib import Path
-import shutil
+import re
+import sqlite3
 
+from src import snapshot_pacientes
+from src.busqueda import normalizar
+from src.cache import CacheLRU
+from src import config
+from src.conexion import conexion, lectura, transaccion, cerrar_conexiones
+from src.migraciones import (
+    aplicar_migraciones, llenar_resumen_mensual, version_actual, VERSION_ESQUEMA, MARCA_MES_CERRADO,
+    MOVER_DEUDA_AL_CIERRE
+)
 from src.models import (
-    Paciente, Sesion, Pago, Informe,
+    Paciente, Sesion, Pago, Informe, PacienteSnapshot, Cambios, a_centavos, a_pesos, POR_NOMBRE,
     TipoPaciente, TipoSesion, EstadoSesion, ConceptoPago,
     TipoInforme, EstadoInforme, EstadoPagoInforme
 )
 
-# Ruta a la base de datos
-DB_PATH = Path("data/clinica.db")
-BACKUPS_PATH = Path("backups")
-
 
 def crear_backup() -> str:
     """
@@ -21,16 +28,18 @@ def crear_backup() -> str:
     Retorna la ruta del archivo creado.
     """
     # Crear carpeta backups si no existe
-    BACKUPS_PATH.mkdir(exist_ok=True)
+    config.BACKUPS_PATH.mkdir(exist_ok=True)
     
     # Generar nombre con timestamp
     timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
     backup_name = f"clinica_backup_{timestamp}.db"
-    backup_path = BACKUPS_PATH / backup_name
+    backup_path = config.BACKUPS_PATH / backup_name
     
-    # Copiar base de datos
-    if DB_PATH.exists():
-        shutil.copy2(DB_PATH, backup_path)
+    # Copiar base de datos con la API de backup de SQLite: copia un estado
+    # consistente aunque otro hilo esté escribiendo
+    if config.DB_PATH.exists():
+        with conexion() as conn, closing(sqlite3.connect(backup_path)) as destino:
+            conn.backup(destino)
         return str(backup_path)
     else:
         raise FileNotFoundError("La base de datos no existe aún")
@@ -41,11 +50,11 @@ def obtener_lista_backups() -> List[dict]:
     Obtiene lista de backups ordenados por fecha (más reciente primero).
     Retorna lista de dicts con: {'nombre': str, 'fecha': str, 'tamaño': str, 'ruta': str}
     """
-    if not BACKUPS_PATH.exists():
+    if not config.BACKUPS_PATH.exists():
         return []
     
     backups = []
-    for archivo in BACKUPS_PATH.glob("clinica_backup_*.db"):
+    for archivo in config.BACKUPS_PATH.glob("clinica_backup_*.db"):
         stat = archivo.stat()
         # Extraer fecha del nombre: clinica_backup_2025-12-02_14-30-45.db
         fecha_str = archivo.stem.replace("clinica_backup_", "")
@@ -79,14 +88,30 @@ def restaurar_backup(ruta_backup: str) -> bool:
         raise FileNotFoundError(f"El backup no existe: {ruta_backup}")
     
     # Crear backup de la versión actual antes de restaurar
-    if DB_PATH.exists():
+    if config.DB_PATH.exists():
         timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-        backup_actual = BACKUPS_PATH / f"clinica_backup_prerestauracion_{timestamp}.db"
-        BACKUPS_PATH.mkdir(exist_ok=True)
-        shutil.copy2(DB_PATH, backup_actual)
-    
-    # Restaurar el backup deseado
-    shutil.copy2(ruta_backup_path, DB_PATH)
+        backup_actual = config.BACKUPS_PATH / f"clinica_backup_prerestauracion_{timestamp}.db"
+        config.BACKUPS_PATH.mkdir(exist_ok=True)
+        with conexion() as conn, closing(sqlite3.connect(backup_actual)) as destino:
+            conn.backup(destino)
+    
+    # Restaurar el backup deseado con la API de backup de SQLite, sobre la
+    # base abierta: no se reemplaza el archivo, así las conexiones de otros
+    # hilos (que pueden seguir abiertas) ven los datos restaurados en vez de
+    # quedar apuntando a un archivo cambiado por debajo. Si el backup no es
+    # una base válida falla antes de tocar nada.
+    with closing(sqlite3.connect(f"{ruta_backup_path.resolve().as_uri()}?mode=ro", uri=True)) as origen, \
+            conexion() as conn:
+        origen.backup(conn)
+    
+    # Que cada hilo abra una conexión nueva (invalida también las cachés)
+    cerrar_conexiones()
+    
+    # La lista guardada de pacientes es de la base anterior
+    snapshot_pacientes.borrar()
+    
+    # Un backup viejo puede tener un esquema anterior: actualizarlo
+    inicializar_base_datos()
     return True
 
 
@@ -94,7 +119,7 @@ def limpiar_backups_antiguos(dias: int = 30, cantidad_minima: int = 5):
     """
     Elimina backups más antiguos que 'dias' días, pero mantiene al menos 'cantidad_minima'.
     """
-    if not BACKUPS_PATH.exists():
+    if not config.BACKUPS_PATH.exists():
         return
     
     backups = obtener_lista_backups()
@@ -118,531 +143,1096 @@ def limpiar_backups_antiguos(dias: int = 30, cantidad_minima: int = 5):
 
 
 def inicializar_base_datos():
-    """Crea las tablas si no existen"""
+    """
+    Crea las tablas si no existen y actualiza el esquema a la última versión.
+    Sirve tanto para bases nuevas como para bases viejas o backups restaurados.
+    """
     # Asegurarse de que existe la carpeta data
-    DB_PATH.parent.mkdir(exist_ok=True)
+    config.DB_PATH.parent.mkdir(exist_ok=True)
     
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
+    # Caso normal al abrir la aplicación: el esquema ya está al día y no hace
+    # falta abrir una transacción de escritura
+    with conexion() as conn:
+        if version_actual(conn) >= VERSION_ESQUEMA:
+            return
     
-    # Tabla pacientes
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS pacientes (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            nombre TEXT NOT NULL,
-            tipo TEXT NOT NULL,
-            costo_sesion REAL NOT NULL,
-            deuda REAL NOT NULL,
-            arancel_social INTEGER NOT NULL,
-            notas TEXT,
-            fecha_creacion TEXT NOT NULL
-        )
-    """)
-    
-    # Tabla sesiones
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS sesiones (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            paciente_id INTEGER NOT NULL,
-            fecha TEXT NOT NULL,
-            precio REAL NOT NULL,
-            estado TEXT NOT NULL,
-            tipo TEXT NOT NULL,
-            notas TEXT,
-            FOREIGN KEY (paciente_id) REFERENCES pacientes(id)
-        )
-    """)
-    
-    # Tabla pagos
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS pagos (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            paciente_id INTEGER NOT NULL,
-            fecha TEXT NOT NULL,
-            monto REAL NOT NULL,
-            concepto TEXT NOT NULL,
-            notas TEXT,
-            FOREIGN KEY (paciente_id) REFERENCES pacientes(id)
-        )
-    """)
-    
-    # Tabla informes
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS informes (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            paciente_id INTEGER NOT NULL,
-            tipo TEXT NOT NULL,
-            estado TEXT NOT NULL,
-            estado_pago TEXT NOT NULL,
-            precio REAL NOT NULL,
-            monto_pagado REAL NOT NULL,
-            notas TEXT,
-            fecha_creacion TEXT NOT NULL,
-            FOREIGN KEY (paciente_id) REFERENCES pacientes(id)
-        )
-    """)
-    
-    conn.commit()
-    conn.close()
+    with transaccion() as conn:
+        aplicar_migraciones(conn)
+
+
+# ========== ERRORES ==========
+
+class PeriodoCerradoError(ValueError):
+    """Se intentó agregar, eliminar o cambiar un registro de un mes cerrado"""
+
+
+@contextmanager
+def _transaccion_de_escritura() -> Iterator:
+    """
+    Como transaccion(), pero convierte el error de los triggers de meses
+    cerrados en PeriodoCerradoError (con el mensaje del trigger).
+    """
+    try:
+        with transaccion() as conn:
+            yield conn
+    except sqlite3.IntegrityError as e:
+        if str(e).startswith(MARCA_MES_CERRADO):
+            raise PeriodoCerradoError(str(e)) from None
+        raise
+
+
+# ========== CONVERSIÓN DE FILAS A OBJETOS ==========
+
+# Las funciones _fila_a_* tienen la firma de sqlite3 row_factory (cursor, fila):
+# el cursor arma directamente los objetos, sin una lista de tuplas intermedia.
+# Los argumentos van por posición (en el orden de las columnas de SELECT *) y
+# los enums se buscan en dicts locales, para no repetir trabajo por cada campo.
+_fecha = datetime.fromisoformat
+_TIPO_PACIENTE = POR_NOMBRE[TipoPaciente]
+_TIPO_SESION = POR_NOMBRE[TipoSesion]
+_ESTADO_SESION = POR_NOMBRE[EstadoSesion]
+_CONCEPTO_PAGO = POR_NOMBRE[ConceptoPago]
+_TIPO_INFORME = POR_NOMBRE[TipoInforme]
+_ESTADO_INFORME = POR_NOMBRE[EstadoInforme]
+_ESTADO_PAGO_INFORME = POR_NOMBRE[EstadoPagoInforme]
+
+
+def _fila_a_paciente(_cursor, row) -> Paciente:
+    """Convierte una fila de la tabla pacientes (SELECT *) en un Paciente"""
+    id_, nombre, tipo, costo_sesion, deuda, arancel_social, notas, fecha_creacion = row
+    return Paciente(
+        id_, nombre, _TIPO_PACIENTE[tipo],
+        costo_sesion / 100, deuda / 100,  # La BD guarda centavos
+        bool(arancel_social), notas, _fecha(fecha_creacion)
+    )
+
+
+def _fila_a_sesion(_cursor, row) -> Sesion:
+    """Convierte una fila de la tabla sesiones (SELECT *) en una Sesion"""
+    id_, paciente_id, fecha, precio, estado, tipo, notas, _fecha_pago = row
+    return Sesion(
+        id_, paciente_id, _fecha(fecha), precio / 100,
+        _ESTADO_SESION[estado], _TIPO_SESION[tipo], notas
+    )
+
+
+def _fila_a_pago(_cursor, row) -> Pago:
+    """Convierte una fila de la tabla pagos (SELECT *) en un Pago"""
+    id_, paciente_id, fecha, monto, concepto, notas, _saldo_a_favor = row
+    return Pago(id_, paciente_id, _fecha(fecha), monto / 100, _CONCEPTO_PAGO[concepto], notas)
+
+
+def _fila_a_informe(_cursor, row) -> Informe:
+    """Convierte una fila de la tabla informes (SELECT *) en un Informe"""
+    id_, paciente_id, tipo, estado, estado_pago, precio, monto_pagado, notas, fecha_creacion, _fecha_pago = row
+    return Informe(
+        id_, paciente_id, _TIPO_INFORME[tipo], _ESTADO_INFORME[estado],
+        _ESTADO_PAGO_INFORME[estado_pago], precio / 100, monto_pagado / 100,
+        notas, _fecha(fecha_creacion)
+    )
+
+
+def _consultar(conn, fabrica, sql: str, parametros=()) -> list:
+    """Ejecuta la consulta y retorna la lista de objetos armados por fabrica (una _fila_a_*)"""
+    cursor = conn.cursor()
+    cursor.row_factory = fabrica
+    return cursor.execute(sql, parametros).fetchall()
+
+
+# Nombre guardado en la BD -> texto que se muestra (ej: "PENDIENTE" -> "Pendiente")
+_TEXTO_TIPO_PACIENTE = {t.name: t.value for t in TipoPaciente}
+_TEXTO_TIPO_SESION = {t.name: t.value for t in TipoSesion}
+_TEXTO_ESTADO_SESION = {e.name: e.value for e in EstadoSesion}
+_TEXTO_CONCEPTO_PAGO = {c.name: c.value for c in ConceptoPago}
+_TEXTO_TIPO_INFORME = {t.name: t.value for t in TipoInforme}
+_TEXTO_ESTADO_INFORME = {e.name: e.value for e in EstadoInforme}
+_TEXTO_ESTADO_PAGO_INFORME = {e.name: e.value for e in EstadoPagoInforme}
+
+
+def _fecha_a_texto(fecha: date) -> str:
+    """
+    Convierte una fecha (date o datetime) al texto que se guarda en la BD:
+    'YYYY-MM-DDTHH:MM:SS'. Al tener todas el mismo largo, comparar el texto es
+    comparar las fechas, y los filtros por rango usan los índices sobre fecha.
+    """
+    if isinstance(fecha, datetime):
+        return fecha.isoformat(sep="T", timespec="seconds")
+    return f"{fecha.isoformat()}T00:00:00"
+
+
+def _fecha_iso_a_texto(fecha_iso: str) -> str:
+    """Convierte '2025-12-02T...' en '02/12/2025' sin crear un datetime"""
+    return f"{fecha_iso[8:10]}/{fecha_iso[5:7]}/{fecha_iso[0:4]}"
 
 
 # ========== FUNCIONES PARA PACIENTES ==========
 
 def guardar_paciente(paciente: Paciente) -> int:
     """Guarda un paciente nuevo o actualiza uno existente. Retorna el ID."""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
-    if paciente.id is None:
-        # Insertar nuevo
-        cursor.execute("""
-            INSERT INTO pacientes (nombre, tipo, costo_sesion, deuda, arancel_social, notas, fecha_creacion)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        """, (
-            paciente.nombre,
-            paciente.tipo.name,  # Guarda el nombre del enum (ej: "ESTANDAR")
-            paciente.costo_sesion,
-            paciente.deuda,
-            1 if paciente.arancel_social else 0,  # SQLite no tiene boolean
-            paciente.notas,
-            paciente.fecha_creacion.isoformat()
-        ))
-        paciente.id = cursor.lastrowid
-        paciente_id = paciente.id
-    else:
-        # Actualizar existente
-        cursor.execute("""
-            UPDATE pacientes 
-            SET nombre=?, tipo=?, costo_sesion=?, deuda=?, arancel_social=?, notas=?
-            WHERE id=?
-        """, (
-            paciente.nombre,
-            paciente.tipo.name,
-            paciente.costo_sesion,
-            paciente.deuda,
-            1 if paciente.arancel_social else 0,
-            paciente.notas,
-            paciente.id
-        ))
-        paciente_id = paciente.id
+    with transaccion() as conn:
+        cursor = conn.cursor()
+        
+        if paciente.id is None:
+            # Insertar nuevo
+            cursor.execute("""
+                INSERT INTO pacientes (nombre, tipo, costo_sesion, deuda, arancel_social, notas, fecha_creacion)
+                VALUES (?, ?, ?, 0, ?, ?, ?)
+            """, (
+                paciente.nombre,
+                paciente.tipo.name,  # Guarda el nombre del enum (ej: "ESTANDAR")
+                a_centavos(paciente.costo_sesion),
+                1 if paciente.arancel_social else 0,  # SQLite no tiene boolean
+                paciente.notas,
+                _fecha_a_texto(paciente.fecha_creacion)
+            ))
+            paciente.id = cursor.lastrowid
+            paciente_id = paciente.id
+            # Deuda con la que se da de alta al paciente
+            _mover_deuda(conn, paciente_id, a_centavos(paciente.deuda), paciente.fecha_creacion)
+        else:
+            # Actualizar existente. La deuda NO se escribe: la mantienen los
+            # triggers y paciente.deuda puede estar desactualizada (para
+            # cambiarla a mano está ajustar_deuda)
+            cursor.execute("""
+                UPDATE pacientes 
+                SET nombre=?, tipo=?, costo_sesion=?, arancel_social=?, notas=?
+                WHERE id=?
+            """, (
+                paciente.nombre,
+                paciente.tipo.name,
+                a_centavos(paciente.costo_sesion),
+                1 if paciente.arancel_social else 0,
+                paciente.notas,
+                paciente.id
+            ))
+            paciente_id = paciente.id
     
-    conn.commit()
-    conn.close()
     return paciente_id
 
 
+def _mover_deuda(conn, paciente_id: int, centavos: int, fecha: date):
+    """
+    Suma centavos (negativo para restar) a la deuda del paciente y a su deuda
+    al cierre de resumen_mensual desde el mes de fecha. Es para los cambios de
+    la deuda que no pasan por los triggers (saldo a favor, ajustes): los de
+    sesiones e informes los hacen los triggers.
+    """
+    if not centavos:
+        return
+    conn.execute("UPDATE pacientes SET deuda = deuda + ? WHERE id=?", (centavos, paciente_id))
+    parametros = {"paciente_id": paciente_id, "fecha": _fecha_a_texto(fecha), "deuda": centavos}
+    for sql in MOVER_DEUDA_AL_CIERRE:
+        conn.execute(sql, parametros)
+
+
+def ajustar_deuda(paciente_id: int, deuda_nueva: float, motivo: str) -> float:
+    """
+    Cambia a mano la deuda de un paciente (por ejemplo una deuda previa al
+    sistema, o una corrección) y registra el cambio y su motivo en
+    ajustes_deuda. Retorna la deuda anterior.
+    """
+    motivo = motivo.strip()
+    if not motivo:
+        raise ValueError("Hay que indicar el motivo del ajuste de deuda")
+    
+    with transaccion() as conn:
+        fila = conn.execute("SELECT deuda FROM pacientes WHERE id=?", (paciente_id,)).fetchone()
+        if fila is None:
+            raise ValueError(f"No existe el paciente {paciente_id}")
+        
+        anterior = fila[0]
+        nueva = a_centavos(deuda_nueva)
+        ahora = datetime.now()
+        _mover_deuda(conn, paciente_id, nueva - anterior, ahora)
+        conn.execute("""
+            INSERT INTO ajustes_deuda (paciente_id, fecha, deuda_anterior, deuda_nueva, motivo)
+            VALUES (?, ?, ?, ?, ?)
+        """, (paciente_id, _fecha_a_texto(ahora), anterior, nueva, motivo))
+    
+    return a_pesos(anterior)
+
+
 def obtener_todos_pacientes() -> List[Paciente]:
     """Obtiene todos los pacientes"""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
-    cursor.execute("SELECT * FROM pacientes ORDER BY nombre")
-    rows = cursor.fetchall()
-    conn.close()
-    
-    pacientes = []
-    for row in rows:
-        pacientes.append(Paciente(
-            id=row[0],
-            nombre=row[1],
-            tipo=TipoPaciente[row[2]],  # Convierte string a enum
-            costo_sesion=row[3],
-            deuda=row[4],
-            arancel_social=bool(row[5]),
-            notas=row[6],
-            fecha_creacion=datetime.fromisoformat(row[7])
-        ))
-    
-    return pacientes
+    with conexion() as conn:
+        return _consultar(conn, _fila_a_paciente, "SELECT * FROM pacientes ORDER BY nombre")
 
 
 def obtener_paciente(paciente_id: int) -> Optional[Paciente]:
     """Obtiene un paciente por ID"""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
-    cursor.execute("SELECT * FROM pacientes WHERE id=?", (paciente_id,))
-    row = cursor.fetchone()
-    conn.close()
+    with conexion() as conn:
+        pacientes = _consultar(conn, _fila_a_paciente, "SELECT * FROM pacientes WHERE id=?", (paciente_id,))
     
-    if row is None:
+    if not pacientes:
         return None
     
-    return Paciente(
-        id=row[0],
-        nombre=row[1],
-        tipo=TipoPaciente[row[2]],
-        costo_sesion=row[3],
-        deuda=row[4],
-        arancel_social=bool(row[5]),
-        notas=row[6],
-        fecha_creacion=datetime.fromisoformat(row[7])
-    )
+    return pacientes[0]
+
+
+# ========== BÚSQUEDA DE PACIENTES ==========
+
+# Peso de cada columna de pacientes_fts al ordenar los resultados (bm25):
+# coincidir en el nombre vale más que coincidir en las notas
+_PESO_NOMBRE = 10.0
+_PESO_NOTAS = 1.0
+
+# Parecido mínimo (de 0 a 1, ver difflib) para tomar una palabra indexada
+# como corrección de una palabra mal escrita, y largo mínimo para intentarlo
+_PARECIDO_MINIMO = 0.75
+_LARGO_MINIMO_CORRECCION = 3
+
+# Palabras del índice de búsqueda (cambian solo cuando se escribe en la base)
+_cache_vocabulario = CacheLRU(capacidad=1)
+
+
+def busqueda_disponible() -> bool:
+    """True si la base tiene el índice de búsqueda (el SQLite instalado tiene FTS5)"""
+    with conexion() as conn:
+        return conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type='table' AND name='pacientes_fts'"
+        ).fetchone() is not None
+
+
+def buscar_pacientes(texto: str, limite: int = 50) -> List[Paciente]:
+    """
+    Busca pacientes por nombre y notas, sin distinguir mayúsculas ni acentos.
+    Cada palabra de texto tiene que aparecer como comienzo de alguna palabra
+    del paciente ("jos gar" encuentra a "José García").
+    Los resultados vienen ordenados por relevancia (primero los que coinciden
+    en el nombre) y son como máximo limite.
+    Si ninguna palabra coincide, prueba con las palabras indexadas más
+    parecidas a las que se escribieron (errores de tipeo: "gonzales" -> "gonzalez").
+    Solo se comparan las que empiezan con la misma letra: recorrer todo el
+    vocabulario es lento con muchos pacientes.
+    """
+    palabras = re.findall(r"\w+", normalizar(texto))
+    if not palabras:
+        return []
+    
+    if not busqueda_disponible():
+        return _buscar_pacientes_sin_indice(palabras, limite)
+    
+    # Entre comillas, para que ninguna palabra se tome como operador de FTS5
+    resultado = _buscar_en_indice([[f'"{p}"*'] for p in palabras], limite)
+    if resultado:
+        return resultado
+    
+    # Solo hace falta si hay errores de tipeo: no cargarlo al iniciar
+    from difflib import get_close_matches
+    
+    vocabulario = _cache_vocabulario.obtener("palabras", _leer_vocabulario)
+    alternativas = []
+    for palabra in palabras:
+        opciones = [f'"{palabra}"*']
+        if len(palabra) >= _LARGO_MINIMO_CORRECCION:
+            parecidas = get_close_matches(
+                palabra, vocabulario.get(palabra[0], ()), n=3, cutoff=_PARECIDO_MINIMO
+            )
+            opciones += [f'"{p}"' for p in parecidas]
+        alternativas.append(opciones)
+    return _buscar_en_indice(alternativas, limite)
+
+
+def _buscar_en_indice(alternativas: List[List[str]], limite: int) -> List[Paciente]:
+    """Pacientes que tienen alguna de las opciones de cada palabra, por relevancia"""
+    consulta = " AND ".join(f"({' OR '.join(opciones)})" for opciones in alternativas)
+    with conexion() as conn:
+        return _consultar(conn, _fila_a_paciente, """
+            SELECT p.* FROM pacientes_fts
+            JOIN pacientes p ON p.id = pacientes_fts.rowid
+            WHERE pacientes_fts MATCH ?
+            ORDER BY bm25(pacientes_fts, ?, ?), p.nombre, p.id
+            LIMIT ?
+        """, (consulta, _PESO_NOMBRE, _PESO_NOTAS, limite))
+
+
+def _leer_vocabulario() -> Dict[str, List[str]]:
+    """Palabras del índice de búsqueda, agrupadas por su primera letra"""
+    vocabulario = {}
+    with conexion() as conn:
+        for (palabra,) in conn.execute("SELECT term FROM pacientes_fts_vocab"):
+            vocabulario.setdefault(palabra[0], []).append(palabra)
+    return vocabulario
+
+
+def _buscar_pacientes_sin_indice(palabras: List[str], limite: int) -> List[Paciente]:
+    """Búsqueda recorriendo todos los pacientes, para bases sin índice (SQLite sin FTS5)"""
+    resultado = []
+    for paciente in obtener_todos_pacientes():
+        texto = normalizar(f"{paciente.nombre} {paciente.notas or ''}")
+        if all(palabra in texto for palabra in palabras):
+            resultado.append(paciente)
+            if len(resultado) == limite:
+                break
+    return resultado
 
 
 # ========== FUNCIONES PARA SESIONES ==========
 
 def guardar_sesion(sesion: Sesion) -> int:
-    """Guarda una sesión nueva o actualiza una existente"""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
-    if sesion.id is None:
-        cursor.execute("""
-            INSERT INTO sesiones (paciente_id, fecha, precio, estado, tipo, notas)
-            VALUES (?, ?, ?, ?, ?, ?)
-        """, (
-            sesion.paciente_id,
-            sesion.fecha.isoformat(),
-            sesion.precio,
-            sesion.estado.name,
-            sesion.tipo.name,
-            sesion.notas
-        ))
-        sesion.id = cursor.lastrowid
-        sesion_id = sesion.id
-    else:
-        cursor.execute("""
-            UPDATE sesiones 
-            SET paciente_id=?, fecha=?, precio=?, estado=?, tipo=?, notas=?
-            WHERE id=?
-        """, (
-            sesion.paciente_id,
-            sesion.fecha.isoformat(),
-            sesion.precio,
-            sesion.estado.name,
-            sesion.tipo.name,
-            sesion.notas,
-            sesion.id
-        ))
-        sesion_id = sesion.id
-    
-    conn.commit()
-    conn.close()
+    """
+    Guarda una sesión nueva o actualiza una existente.
+    fecha_pago (la usa la deuda al cierre de cada mes) queda en la fecha de la
+    sesión si se guarda nueva y ya paga, en el momento actual si deja de estar
+    pendiente, y vacía si vuelve a estar pendiente.
+    """
+    with _transaccion_de_escritura() as conn:
+        cursor = conn.cursor()
+        fecha = _fecha_a_texto(sesion.fecha)
+        
+        if sesion.id is None:
+            cursor.execute("""
+                INSERT INTO sesiones (paciente_id, fecha, precio, estado, tipo, notas, fecha_pago)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, (
+                sesion.paciente_id,
+                fecha,
+                a_centavos(sesion.precio),
+                sesion.estado.name,
+                sesion.tipo.name,
+                sesion.notas,
+                None if sesion.estado == EstadoSesion.PENDIENTE else fecha
+            ))
+            sesion.id = cursor.lastrowid
+            sesion_id = sesion.id
+        else:
+            # En el SET, estado es el valor que tenía antes de este UPDATE
+            cursor.execute("""
+                UPDATE sesiones 
+                SET paciente_id=?, fecha=?, precio=?, estado=?, tipo=?, notas=?,
+                    fecha_pago = CASE WHEN ? = 'PENDIENTE' THEN NULL
+                                      WHEN estado = 'PENDIENTE' THEN ?
+                                      ELSE fecha_pago END
+                WHERE id=?
+            """, (
+                sesion.paciente_id,
+                fecha,
+                a_centavos(sesion.precio),
+                sesion.estado.name,
+                sesion.tipo.name,
+                sesion.notas,
+                sesion.estado.name,
+                _fecha_a_texto(datetime.now()),
+                sesion.id
+            ))
+            sesion_id = sesion.id
     
     return sesion_id
 
+
+def registrar_sesion(sesion: Sesion) -> Cambios:
+    """
+    Guarda una sesión nueva y le aplica el saldo a favor del paciente si tiene
+    (ver aplicar_saldo_a_favor_a_nueva_sesion), todo en una misma transacción.
+    """
+    with _transaccion_de_escritura() as conn:
+        guardar_sesion(sesion)
+        aplicar_saldo_a_favor_a_nueva_sesion(sesion.paciente_id, sesion)
+        return _leer_cambios(conn, sesion.paciente_id, sesiones=[sesion.id])
+
+
+def modificar_sesion(sesion: Sesion) -> Cambios:
+    """Guarda los cambios de una sesión existente"""
+    with _transaccion_de_escritura() as conn:
+        guardar_sesion(sesion)
+        return _leer_cambios(conn, sesion.paciente_id, sesiones=[sesion.id])
+
+
 def obtener_sesiones_paciente(paciente_id: int) -> List[Sesion]:
     """Obtiene todas las sesiones de un paciente"""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
-    cursor.execute("""
-        SELECT * FROM sesiones 
-        WHERE paciente_id=? 
-        ORDER BY fecha DESC
-    """, (paciente_id,))
-    rows = cursor.fetchall()
-    conn.close()
-    
-    sesiones = []
-    for row in rows:
-        sesiones.append(Sesion(
-            id=row[0],
-            paciente_id=row[1],
-            fecha=datetime.fromisoformat(row[2]),
-            precio=row[3],
-            estado=EstadoSesion[row[4]],
-            tipo=TipoSesion[row[5]],
-            notas=row[6]
-        ))
-    
-    return sesiones
+    with conexion() as conn:
+        return _consultar(conn, _fila_a_sesion, """
+            SELECT * FROM sesiones 
+            WHERE paciente_id=? 
+            ORDER BY fecha DESC, id
+        """, (paciente_id,))
 
 
 # ========== FUNCIONES PARA PAGOS ==========
 
 def guardar_pago(pago: Pago) -> int:
     """Guarda un pago nuevo"""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
+    with _transaccion_de_escritura() as conn:
+        cursor = conn.execute("""
+            INSERT INTO pagos (paciente_id, fecha, monto, concepto, notas)
+            VALUES (?, ?, ?, ?, ?)
+        """, (
+            pago.paciente_id,
+            _fecha_a_texto(pago.fecha),
+            a_centavos(pago.monto),
+            pago.concepto.name,
+            pago.notas
+        ))
+        pago_id = cursor.lastrowid
     
-    cursor.execute("""
-        INSERT INTO pagos (paciente_id, fecha, monto, concepto, notas)
-        VALUES (?, ?, ?, ?, ?)
-    """, (
-        pago.paciente_id,
-        pago.fecha.isoformat(),
-        pago.monto,
-        pago.concepto.name,
-        pago.notas
-    ))
-    pago_id = cursor.lastrowid
-    
-    conn.commit()
-    conn.close()
     return pago_id
 
 
 def obtener_pagos_paciente(paciente_id: int) -> List[Pago]:
     """Obtiene todos los pagos de un paciente"""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
-    cursor.execute("""
-        SELECT * FROM pagos 
-        WHERE paciente_id=? 
-        ORDER BY fecha DESC
-    """, (paciente_id,))
-    rows = cursor.fetchall()
-    conn.close()
-    
-    pagos = []
-    for row in rows:
-        pagos.append(Pago(
-            id=row[0],
-            paciente_id=row[1],
-            fecha=datetime.fromisoformat(row[2]),
-            monto=row[3],
-            concepto=ConceptoPago[row[4]],
-            notas=row[5]
-        ))
-    
-    return pagos
+    with conexion() as conn:
+        return _consultar(conn, _fila_a_pago, """
+            SELECT * FROM pagos 
+            WHERE paciente_id=? 
+            ORDER BY fecha DESC, id
+        """, (paciente_id,))
 
 
 # ========== FUNCIONES PARA INFORMES ==========
 
 def guardar_informe(informe: Informe) -> int:
-    """Guarda un informe nuevo o actualiza uno existente"""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
-    if informe.id is None:
-        cursor.execute("""
-            INSERT INTO informes (paciente_id, tipo, estado, estado_pago, precio, monto_pagado, notas, fecha_creacion)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            informe.paciente_id,
-            informe.tipo.name,
-            informe.estado.name,
-            informe.estado_pago.name,
-            informe.precio,
-            informe.monto_pagado,
-            informe.notas,
-            informe.fecha_creacion.isoformat()
-        ))
-        informe.id = cursor.lastrowid
-        informe_id = informe.id
-    else:
-        cursor.execute("""
-            UPDATE informes 
-            SET tipo=?, estado=?, estado_pago=?, precio=?, monto_pagado=?, notas=?
-            WHERE id=?
-        """, (
-            informe.tipo.name,
-            informe.estado.name,
-            informe.estado_pago.name,
-            informe.precio,
-            informe.monto_pagado,
-            informe.notas,
-            informe.id
-        ))
-        informe_id = informe.id
+    """
+    Guarda un informe nuevo o actualiza uno existente.
+    fecha_pago (la usa la deuda al cierre de cada mes) queda en la fecha de
+    creación si se guarda nuevo con algo pagado, en el momento actual si
+    cambia el pago, y vacía si vuelve a no tener nada pagado.
+    """
+    with _transaccion_de_escritura() as conn:
+        cursor = conn.cursor()
+        monto_pagado = a_centavos(informe.monto_pagado)
+        sin_pagar = informe.estado_pago == EstadoPagoInforme.PENDIENTE and monto_pagado == 0
+        
+        if informe.id is None:
+            fecha_creacion = _fecha_a_texto(informe.fecha_creacion)
+            cursor.execute("""
+                INSERT INTO informes (paciente_id, tipo, estado, estado_pago, precio, monto_pagado, notas,
+                                      fecha_creacion, fecha_pago)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (
+                informe.paciente_id,
+                informe.tipo.name,
+                informe.estado.name,
+                informe.estado_pago.name,
+                a_centavos(informe.precio),
+                monto_pagado,
+                informe.notas,
+                fecha_creacion,
+                None if sin_pagar else fecha_creacion
+            ))
+            informe.id = cursor.lastrowid
+            informe_id = informe.id
+        else:
+            # En el SET, estado_pago y monto_pagado son los valores de antes de este UPDATE
+            cursor.execute("""
+                UPDATE informes 
+                SET tipo=?, estado=?, estado_pago=?, precio=?, monto_pagado=?, notas=?,
+                    fecha_pago = CASE WHEN ? THEN NULL
+                                      WHEN estado_pago = ? AND monto_pagado = ? THEN fecha_pago
+                                      ELSE ? END
+                WHERE id=?
+            """, (
+                informe.tipo.name,
+                informe.estado.name,
+                informe.estado_pago.name,
+                a_centavos(informe.precio),
+                monto_pagado,
+                informe.notas,
+                sin_pagar,
+                informe.estado_pago.name,
+                monto_pagado,
+                _fecha_a_texto(datetime.now()),
+                informe.id
+            ))
+            informe_id = informe.id
     
-    conn.commit()
-    conn.close()
     return informe_id
 
 
+def registrar_informe(informe: Informe) -> Cambios:
+    """Guarda un informe nuevo"""
+    with _transaccion_de_escritura() as conn:
+        guardar_informe(informe)
+        return _leer_cambios(conn, informe.paciente_id, informes=[informe.id])
+
+
+def modificar_informe(informe: Informe) -> Cambios:
+    """Guarda los cambios de un informe existente"""
+    with _transaccion_de_escritura() as conn:
+        guardar_informe(informe)
+        return _leer_cambios(conn, informe.paciente_id, informes=[informe.id])
+
+
 def obtener_informes_paciente(paciente_id: int) -> List[Informe]:
     """Obtiene todos los informes de un paciente"""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
+    with conexion() as conn:
+        return _consultar(conn, _fila_a_informe, """
+            SELECT * FROM informes 
+            WHERE paciente_id=? 
+            ORDER BY fecha_creacion DESC, id
+        """, (paciente_id,))
+
+
+# ========== SNAPSHOT DEL PACIENTE ==========
+
+# Snapshots de los últimos pacientes vistos: volver a un paciente reciente no
+# consulta la base mientras no haya escrituras (ver cache.CacheLRU)
+_cache_pacientes = CacheLRU(capacidad=16)
+
+
+def obtener_snapshot_paciente(paciente_id: int) -> Optional[PacienteSnapshot]:
+    """
+    Obtiene el paciente con sus sesiones, pagos e informes (en el mismo orden
+    que obtener_*_paciente) y los conteos que muestran las pestañas.
+    Retorna None si el paciente no existe.
     
-    cursor.execute("""
-        SELECT * FROM informes 
-        WHERE paciente_id=? 
-        ORDER BY fecha_creacion DESC
-    """, (paciente_id,))
-    rows = cursor.fetchall()
-    conn.close()
-    
-    informes = []
-    for row in rows:
-        informes.append(Informe(
-            id=row[0],
-            paciente_id=row[1],
-            tipo=TipoInforme[row[2]],
-            estado=EstadoInforme[row[3]],
-            estado_pago=EstadoPagoInforme[row[4]],
-            precio=row[5],
-            monto_pagado=row[6],
-            notas=row[7],
-            fecha_creacion=datetime.fromisoformat(row[8])
-        ))
+    El resultado se guarda en caché hasta la próxima escritura en la base:
+    no hay que modificarlo.
+    """
+    return _cache_pacientes.obtener(paciente_id, lambda: _leer_snapshot_paciente(paciente_id))
+
+
+def _leer_snapshot_paciente(paciente_id: int) -> Optional[PacienteSnapshot]:
+    """Lee todos los datos del paciente en una sola transacción de lectura"""
+    with lectura() as conn:
+        pacientes = _consultar(conn, _fila_a_paciente, "SELECT * FROM pacientes WHERE id=?", (paciente_id,))
+        if not pacientes:
+            return None
+        
+        sesiones = _consultar(conn, _fila_a_sesion, """
+            SELECT * FROM sesiones WHERE paciente_id=? ORDER BY fecha DESC, id
+        """, (paciente_id,))
+        pagos = _consultar(conn, _fila_a_pago, """
+            SELECT * FROM pagos WHERE paciente_id=? ORDER BY fecha DESC, id
+        """, (paciente_id,))
+        informes = _consultar(conn, _fila_a_informe, """
+            SELECT * FROM informes WHERE paciente_id=? ORDER BY fecha_creacion DESC, id
+        """, (paciente_id,))
+    
+    return _armar_snapshot(pacientes[0], sesiones, pagos, informes)
+
+
+def _armar_snapshot(paciente: Paciente, sesiones: list, pagos: list, informes: list) -> PacienteSnapshot:
+    """Arma el PacienteSnapshot calculando los conteos y totales"""
+    return PacienteSnapshot(
+        paciente=paciente,
+        sesiones=sesiones,
+        pagos=pagos,
+        informes=informes,
+        sesiones_pagas=sum(1 for s in sesiones if s.estado == EstadoSesion.PAGA),
+        sesiones_pendientes=sum(1 for s in sesiones if s.estado == EstadoSesion.PENDIENTE),
+        informes_pagados=sum(1 for i in informes if i.estado_pago == EstadoPagoInforme.PAGADO),
+        monto_pagado=a_pesos(sum(a_centavos(p.monto) for p in pagos)),  # Sumado en centavos: exacto
+    )
+
+
+def _mezclar(objetos: list, guardados: list, eliminados: list, fecha) -> list:
+    """
+    Retorna la lista objetos sin los eliminados y con los guardados (nuevos o
+    reemplazando al de igual id), ordenada como en la BD: fecha DESC, id.
+    """
+    quitar = set(eliminados)
+    quitar.update(objeto.id for objeto in guardados)
+    resultado = [objeto for objeto in objetos if objeto.id not in quitar]
+    
+    if guardados:
+        resultado.extend(guardados)
+        # Los ordenamientos de Python son estables: primero por id, después por fecha
+        resultado.sort(key=lambda objeto: objeto.id)
+        resultado.sort(key=fecha, reverse=True)
+    return resultado
+
+
+def aplicar_cambios_al_snapshot(snapshot: PacienteSnapshot, cambios: Cambios) -> Optional[PacienteSnapshot]:
+    """
+    Retorna un snapshot nuevo con los cambios aplicados, sin consultar la base
+    (el snapshot original no se modifica). Retorna None si el paciente ya no existe.
+    """
+    if cambios.paciente is None:
+        return None
     
-    return informes
+    return _armar_snapshot(
+        cambios.paciente,
+        _mezclar(snapshot.sesiones, cambios.sesiones, cambios.sesiones_eliminadas, lambda s: s.fecha),
+        _mezclar(snapshot.pagos, cambios.pagos, cambios.pagos_eliminados, lambda p: p.fecha),
+        _mezclar(snapshot.informes, cambios.informes, cambios.informes_eliminados, lambda i: i.fecha_creacion),
+    )
+
+
+def _leer_cambios(conn, paciente_id: int, sesiones=(), pagos=(), informes=(),
+                  sesiones_eliminadas=(), pagos_eliminados=(), informes_eliminados=()) -> Cambios:
+    """
+    Arma los Cambios de una modificación: relee el paciente (con la deuda que
+    dejaron los triggers) y los registros guardados, dados por sus ids.
+    Se llama dentro de la misma transacción de la modificación.
+    """
+    def releer(tabla, fabrica, ids):
+        if not ids:
+            return []
+        marcas = ",".join("?" * len(ids))
+        return _consultar(conn, fabrica, f"SELECT * FROM {tabla} WHERE id IN ({marcas})", list(ids))
+    
+    pacientes = _consultar(conn, _fila_a_paciente, "SELECT * FROM pacientes WHERE id=?", (paciente_id,))
+    return Cambios(
+        paciente=pacientes[0] if pacientes else None,
+        sesiones=releer("sesiones", _fila_a_sesion, sesiones),
+        pagos=releer("pagos", _fila_a_pago, pagos),
+        informes=releer("informes", _fila_a_informe, informes),
+        sesiones_eliminadas=list(sesiones_eliminadas),
+        pagos_eliminados=list(pagos_eliminados),
+        informes_eliminados=list(informes_eliminados),
+    )
+
+
+# ========== CONTEOS ==========
+
+def contar_registros() -> dict:
+    """
+    Cuenta los registros de cada tabla en una sola consulta.
+    Retorna {'pacientes': int, 'sesiones': int, 'pagos': int, 'informes': int}
+    """
+    with conexion() as conn:
+        row = conn.execute("""
+            SELECT (SELECT COUNT(*) FROM pacientes),
+                   (SELECT COUNT(*) FROM sesiones),
+                   (SELECT COUNT(*) FROM pagos),
+                   (SELECT COUNT(*) FROM informes)
+        """).fetchone()
+    
+    return {
+        'pacientes': row[0],
+        'sesiones': row[1],
+        'pagos': row[2],
+        'informes': row[3]
+    }
 
 
 # ========== LÓGICA DE APLICACIÓN DE PAGOS ==========
 
-def aplicar_pago_automatico(paciente_id: int, monto: float) -> dict:
+def aplicar_pago_automatico(paciente_id: int, monto: float, fecha: Optional[datetime] = None) -> dict:
     """
     Aplica un pago automáticamente siguiendo esta prioridad:
     1. Sesiones pendientes (más antiguas primero)
     2. Informes pendientes con pago faltante
     3. Saldo a favor (deuda negativa)
     
-    Retorna un diccionario con los detalles de qué se pagó
+    fecha es la del pago (por defecto, ahora): queda como fecha_pago de lo que
+    se paga y como fecha del saldo a favor.
+    
+    Todo se hace en una sola transacción: o se aplica el pago completo o no
+    se aplica nada. La deuda del paciente la descuentan los triggers a medida
+    que se marcan sesiones e informes como pagados.
+    
+    Las cuentas se hacen en centavos enteros (como están en la BD), así que
+    son exactas y no hace falta tolerancia para errores de redondeo.
+    
+    Retorna un diccionario con los detalles de qué se pagó (montos en pesos)
     """
-    monto_restante = monto
+    restante = a_centavos(monto)
+    fecha_pago = fecha if fecha is not None else datetime.now()
+    texto_fecha_pago = _fecha_a_texto(fecha_pago)
     aplicaciones = {
         "sesiones_pagadas": [],
         "informes_actualizados": [],
         "saldo_a_favor": 0
     }
     
-    # PASO 1: Aplicar a sesiones pendientes (más antiguas primero)
-    sesiones = obtener_sesiones_paciente(paciente_id)
-    sesiones_pendientes = [s for s in sesiones if s.estado == EstadoSesion.PENDIENTE]
-    sesiones_pendientes.sort(key=lambda s: s.fecha)  # Más antiguas primero
-    
-    for sesion in sesiones_pendientes:
-        if monto_restante <= 0.01:  # Permitir pequeños errores de redondeo
-            break
+    with _transaccion_de_escritura() as conn:
+        deuda_anterior = conn.execute(
+            "SELECT deuda FROM pacientes WHERE id=?", (paciente_id,)
+        ).fetchone()[0]
+        
+        # PASO 1: Aplicar a sesiones pendientes (más antiguas primero)
+        sesiones_pendientes = conn.execute("""
+            SELECT id, fecha, tipo, precio FROM sesiones
+            WHERE paciente_id=? AND estado=?
+            ORDER BY fecha, id
+        """, (paciente_id, EstadoSesion.PENDIENTE.name)).fetchall()
         
-        if monto_restante >= sesion.precio - 0.01:
+        sesiones_a_pagar = []
+        for sesion_id, fecha, tipo, precio in sesiones_pendientes:
+            if restante == 0 or restante < precio:
+                # No alcanza para esta sesión
+                break
+            
             # Paga la sesión completa
-            sesion.estado = EstadoSesion.PAGA
-            guardar_sesion(sesion)
+            sesiones_a_pagar.append((EstadoSesion.PAGA.name, texto_fecha_pago, sesion_id))
             aplicaciones["sesiones_pagadas"].append({
-                "id": sesion.id,
-                "tipo": sesion.tipo.value,
-                "fecha": sesion.fecha.strftime("%d/%m/%Y"),
-                "precio": sesion.precio
+                "id": sesion_id,
+                "tipo": _TEXTO_TIPO_SESION[tipo],
+                "fecha": _fecha_iso_a_texto(fecha),
+                "precio": a_pesos(precio)
             })
-            monto_restante -= sesion.precio
-        else:
-            # No alcanza para esta sesión
-            break
-    
-    # PASO 2: Aplicar a informes pendientes
-    if monto_restante > 0.01:
-        informes = obtener_informes_paciente(paciente_id)
-        informes_pendientes = [
-            i for i in informes 
-            if i.estado_pago != EstadoPagoInforme.PAGADO
-        ]
-        # Ordenar por fecha de creación (más antiguos primero)
-        informes_pendientes.sort(key=lambda i: i.fecha_creacion)
+            restante -= precio
         
-        for informe in informes_pendientes:
-            if monto_restante <= 0.01:
-                break
-            
-            deuda_informe = informe.precio - informe.monto_pagado
+        conn.executemany("UPDATE sesiones SET estado=?, fecha_pago=? WHERE id=?", sesiones_a_pagar)
+        
+        # PASO 2: Aplicar a informes pendientes
+        if restante > 0:
+            # Ordenados por fecha de creación (más antiguos primero)
+            informes_pendientes = conn.execute("""
+                SELECT id, tipo, precio, monto_pagado FROM informes
+                WHERE paciente_id=? AND estado_pago!=?
+                ORDER BY fecha_creacion, id
+            """, (paciente_id, EstadoPagoInforme.PAGADO.name)).fetchall()
             
-            if monto_restante >= deuda_informe - 0.01:
-                # Paga el informe completo
-                informe.monto_pagado = informe.precio
-                informe.estado_pago = EstadoPagoInforme.PAGADO
-                monto_restante -= deuda_informe
-                aplicaciones["informes_actualizados"].append({
-                    "id": informe.id,
-                    "tipo": informe.tipo.value,
-                    "monto_aplicado": deuda_informe,
-                    "nuevo_estado": EstadoPagoInforme.PAGADO.value
-                })
-            else:
-                # Pago parcial
-                informe.monto_pagado += monto_restante
-                informe.estado_pago = EstadoPagoInforme.PAGO_PARCIAL
+            informes_a_actualizar = []
+            for informe_id, tipo, precio, monto_pagado in informes_pendientes:
+                if restante == 0:
+                    break
+                
+                deuda_informe = precio - monto_pagado
+                
+                if restante >= deuda_informe:
+                    # Paga el informe completo
+                    aplicado = deuda_informe
+                    estado_pago = EstadoPagoInforme.PAGADO
+                else:
+                    # Pago parcial
+                    aplicado = restante
+                    estado_pago = EstadoPagoInforme.PAGO_PARCIAL
+                
+                restante -= aplicado
                 aplicaciones["informes_actualizados"].append({
-                    "id": informe.id,
-                    "tipo": informe.tipo.value,
-                    "monto_aplicado": monto_restante,
-                    "nuevo_estado": EstadoPagoInforme.PAGO_PARCIAL.value
+                    "id": informe_id,
+                    "tipo": _TEXTO_TIPO_INFORME[tipo],
+                    "monto_aplicado": a_pesos(aplicado),
+                    "nuevo_estado": estado_pago.value
                 })
-                monto_restante = 0
+                informes_a_actualizar.append(
+                    (monto_pagado + aplicado, estado_pago.name, texto_fecha_pago, informe_id)
+                )
             
-            guardar_informe(informe)
-    
-    # PASO 3: Si sobra dinero, queda como saldo a favor (deuda negativa)
-    if monto_restante > 0.01:
-        aplicaciones["saldo_a_favor"] = round(monto_restante, 2)
-    
-    # Actualizar deuda del paciente
-    paciente = obtener_paciente(paciente_id)
-    deuda_anterior = paciente.deuda
-    
-    # Recalcular deuda desde cero basada en sesiones e informes pendientes
-    deuda_sesiones = sum(s.precio for s in obtener_sesiones_paciente(paciente_id) 
-                         if s.estado == EstadoSesion.PENDIENTE)
-    deuda_informes = sum(i.precio - i.monto_pagado 
-                         for i in obtener_informes_paciente(paciente_id) 
-                         if i.estado_pago != EstadoPagoInforme.PAGADO)
-    
-    deuda_total = deuda_sesiones + deuda_informes
-    
-    # Si hay saldo a favor (monto_restante), restar de la deuda (quedará negativa)
-    if monto_restante > 0.01:
-        deuda_total -= monto_restante
-    
-    paciente.deuda = deuda_total
-    guardar_paciente(paciente)
+            conn.executemany(
+                "UPDATE informes SET monto_pagado=?, estado_pago=?, fecha_pago=? WHERE id=?",
+                informes_a_actualizar
+            )
+        
+        # PASO 3: Si sobra dinero, queda como saldo a favor (deuda negativa)
+        if restante > 0:
+            aplicaciones["saldo_a_favor"] = a_pesos(restante)
+            _mover_deuda(conn, paciente_id, -restante, fecha_pago)
+        
+        deuda_nueva = conn.execute(
+            "SELECT deuda FROM pacientes WHERE id=?", (paciente_id,)
+        ).fetchone()[0]
     
-    aplicaciones["deuda_anterior"] = deuda_anterior
-    aplicaciones["deuda_nueva"] = paciente.deuda
+    aplicaciones["deuda_anterior"] = a_pesos(deuda_anterior)
+    aplicaciones["deuda_nueva"] = a_pesos(deuda_nueva)
     
     return aplicaciones
 
 
-def actualizar_deuda_paciente(paciente_id: int):
+def registrar_pago(pago: Pago) -> dict:
     """
-    Recalcula la deuda total del paciente basándose en sesiones e informes pendientes
+    Guarda un pago nuevo y lo aplica automáticamente (ver aplicar_pago_automatico),
+    todo en una misma transacción.
+    Retorna el mismo diccionario que aplicar_pago_automatico, más "cambios":
+    los Cambios con el pago y las sesiones e informes que se pagaron con él.
     """
-    sesiones = obtener_sesiones_paciente(paciente_id)
-    informes = obtener_informes_paciente(paciente_id)
-    
-    deuda_sesiones = sum(s.precio for s in sesiones if s.estado == EstadoSesion.PENDIENTE)
-    deuda_informes = sum(i.precio - i.monto_pagado for i in informes if i.estado_pago != EstadoPagoInforme.PAGADO)
+    with transaccion() as conn:
+        pago_id = guardar_pago(pago)
+        resultado = aplicar_pago_automatico(pago.paciente_id, pago.monto, pago.fecha)
+        
+        # Lo que quedó como saldo a favor, para poder deshacerlo (ver eliminar_pago)
+        if resultado["saldo_a_favor"]:
+            conn.execute(
+                "UPDATE pagos SET saldo_a_favor=? WHERE id=?",
+                (a_centavos(resultado["saldo_a_favor"]), pago_id)
+            )
+        resultado["cambios"] = _leer_cambios(
+            conn, pago.paciente_id,
+            sesiones=[sesion["id"] for sesion in resultado["sesiones_pagadas"]],
+            pagos=[pago_id],
+            informes=[informe["id"] for informe in resultado["informes_actualizados"]]
+        )
+    return resultado
+
+
+def _calcular_deuda_pendiente(conn, paciente_id: int) -> int:
+    """
+    Suma (en centavos) el precio de las sesiones pendientes y lo que falta
+    pagar de los informes
+    """
+    return conn.execute("""
+        SELECT
+            (SELECT COALESCE(SUM(precio), 0) FROM sesiones
+             WHERE paciente_id=? AND estado=?)
+          + (SELECT COALESCE(SUM(precio - monto_pagado), 0) FROM informes
+             WHERE paciente_id=? AND estado_pago!=?)
+    """, (
+        paciente_id, EstadoSesion.PENDIENTE.name,
+        paciente_id, EstadoPagoInforme.PAGADO.name
+    )).fetchone()[0]
+
+
+def actualizar_deuda_paciente(paciente_id: int) -> float:
+    """
+    Recalcula DESDE CERO la deuda total del paciente basándose en sesiones e
+    informes pendientes, y la guarda. Retorna la deuda nueva.
     
-    paciente = obtener_paciente(paciente_id)
-    paciente.deuda = deuda_sesiones + deuda_informes
-    guardar_paciente(paciente)
+    No hace falta llamarla después de cada cambio: los triggers de la base
+    mantienen pacientes.deuda al día. Sirve para reparar una deuda desfasada.
+    OJO: descarta el saldo a favor y cualquier ajuste manual de la deuda.
+    """
+    with transaccion() as conn:
+        anterior = conn.execute("SELECT deuda FROM pacientes WHERE id=?", (paciente_id,)).fetchone()[0]
+        deuda = _calcular_deuda_pendiente(conn, paciente_id)
+        _mover_deuda(conn, paciente_id, deuda - anterior, datetime.now())
+    return a_pesos(deuda)
+
+
+def verificar_deuda_paciente(paciente_id: int) -> dict:
+    """
+    Compara la deuda guardada (mantenida por los triggers) con la que surge de
+    recalcular sesiones e informes pendientes. No modifica nada.
+    Retorna {'guardada': float, 'calculada': float, 'diferencia': float}.
+    La diferencia es el saldo a favor o los ajustes manuales del paciente.
+    """
+    with conexion() as conn:
+        guardada = conn.execute(
+            "SELECT deuda FROM pacientes WHERE id=?", (paciente_id,)
+        ).fetchone()[0]
+        calculada = _calcular_deuda_pendiente(conn, paciente_id)
+    
+    return {
+        'guardada': a_pesos(guardada),
+        'calculada': a_pesos(calculada),
+        'diferencia': a_pesos(guardada - calculada)
+    }
 
 
 def aplicar_saldo_a_favor_a_nueva_sesion(paciente_id: int, sesion: Sesion):
     """
     Si el paciente tiene saldo a favor (deuda negativa), aplica automáticamente
     a la nueva sesión. Si el saldo cubre toda la sesión, la marca como PAGA.
+    Se llama después de guardar la sesión (cuyo precio ya sumó el trigger a la
+    deuda); si el saldo la cubre solo en parte, la deuda ya queda correcta.
     """
-    paciente = obtener_paciente(paciente_id)
-    
-    # Si no hay saldo a favor, no hacer nada
-    if paciente.deuda >= 0:
+    if sesion.estado != EstadoSesion.PENDIENTE:
         return
     
-    saldo_a_favor = abs(paciente.deuda)
+    precio = a_centavos(sesion.precio)
     
-    # Si el saldo a favor cubre toda la sesión
-    if saldo_a_favor >= sesion.precio:
-        # Marcar sesión como PAGA y ajustar deuda
-        sesion.estado = EstadoSesion.PAGA
-        guardar_sesion(sesion)
+    with _transaccion_de_escritura() as conn:
+        deuda = conn.execute(
+            "SELECT deuda FROM pacientes WHERE id=?", (paciente_id,)
+        ).fetchone()[0]
         
-        # Actualizar deuda: restar el precio de la sesión del saldo a favor
-        paciente.deuda = -(saldo_a_favor - sesion.precio)
-        guardar_paciente(paciente)
-    # Si el saldo a favor cubre parcialmente
-    elif saldo_a_favor > 0:
-        # La sesión queda como PENDIENTE pero la deuda se ajusta
-        # La parte del saldo se aplica, el resto queda pendiente
-        paciente.deuda = saldo_a_favor - sesion.precio
-        guardar_paciente(paciente)
+        # Deuda que tenía el paciente antes de esta sesión
+        deuda_previa = deuda - precio
+        
+        # Si no había saldo a favor, no hacer nada
+        if deuda_previa >= 0:
+            return
+        
+        saldo_a_favor = -deuda_previa
+        
+        # Si el saldo a favor cubre toda la sesión
+        if saldo_a_favor >= precio:
+            # Marcar sesión como PAGA (el trigger resta el precio de la deuda),
+            # pagada en su fecha con el saldo que ya había
+            sesion.estado = EstadoSesion.PAGA
+            conn.execute(
+                "UPDATE sesiones SET estado=?, fecha_pago=fecha WHERE id=?",
+                (sesion.estado.name, sesion.id)
+            )
+            
+            # La sesión se pagó con el saldo a favor: consumirlo
+            _mover_deuda(conn, paciente_id, precio, sesion.fecha)
+
+
+# ========== CONSULTAS POR RANGO DE FECHAS ==========
+
+def rango_mes(mes: int, año: int) -> Tuple[datetime, datetime]:
+    """
+    Retorna (inicio, fin) del mes, para usar como desde/hasta en las consultas
+    por rango: inicio es el primer día del mes y fin el primer día del mes
+    siguiente (excluido).
+    """
+    inicio = datetime(año, mes, 1)
+    if mes == 12:
+        fin = datetime(año + 1, 1, 1)
+    else:
+        fin = datetime(año, mes + 1, 1)
+    return inicio, fin
+
+
+def _condicion_rango(columna: str, desde: Optional[date], hasta: Optional[date]) -> Tuple[str, tuple]:
+    """
+    Arma la condición "columna >= desde AND columna < hasta" (hasta excluido)
+    y sus parámetros. Un extremo en None queda abierto.
+    Comparar contra el texto normalizado permite usar el índice sobre la columna.
+    """
+    condiciones = []
+    parametros = []
+    if desde is not None:
+        condiciones.append(f"{columna} >= ?")
+        parametros.append(_fecha_a_texto(desde))
+    if hasta is not None:
+        condiciones.append(f"{columna} < ?")
+        parametros.append(_fecha_a_texto(hasta))
+    return " AND ".join(condiciones) or "1", tuple(parametros)
+
+
+def _obtener_en_rango(tabla: str, columna: str, fabrica, desde, hasta, paciente_id) -> list:
+    """Consulta genérica de registros de una tabla con la fecha en [desde, hasta)"""
+    condicion, parametros = _condicion_rango(columna, desde, hasta)
+    if paciente_id is not None:
+        condicion = f"paciente_id = ? AND {condicion}"
+        parametros = (paciente_id,) + parametros
+    
+    with conexion() as conn:
+        return _consultar(conn, fabrica, f"""
+            SELECT * FROM {tabla}
+            WHERE {condicion}
+            ORDER BY {columna}, id
+        """, parametros)
+
+
+def obtener_sesiones_en_rango(desde: Optional[date], hasta: Optional[date],
+                              paciente_id: Optional[int] = None) -> List[Sesion]:
+    """
+    Obtiene las sesiones con fecha en [desde, hasta), de un paciente o de todos,
+    ordenadas por fecha (más antiguas primero). Ej: obtener_sesiones_en_rango(*rango_mes(3, 2025))
+    """
+    return _obtener_en_rango("sesiones", "fecha", _fila_a_sesion, desde, hasta, paciente_id)
+
+
+def obtener_pagos_en_rango(desde: Optional[date], hasta: Optional[date],
+                           paciente_id: Optional[int] = None) -> List[Pago]:
+    """Obtiene los pagos con fecha en [desde, hasta), ordenados por fecha"""
+    return _obtener_en_rango("pagos", "fecha", _fila_a_pago, desde, hasta, paciente_id)
+
+
+def obtener_informes_en_rango(desde: Optional[date], hasta: Optional[date],
+                              paciente_id: Optional[int] = None) -> List[Informe]:
+    """Obtiene los informes creados en [desde, hasta), ordenados por fecha de creación"""
+    return _obtener_en_rango("informes", "fecha_creacion", _fila_a_informe, desde, hasta, paciente_id)
+
+
+# ========== RESUMEN MENSUAL ==========
+
+def _clave_mes(mes: int, año: int) -> str:
+    """Clave de un mes en resumen_mensual: 'YYYY-MM'"""
+    return f"{año:04d}-{mes:02d}"
+
+
+def reconstruir_resumen_mensual():
+    """
+    Recalcula desde cero la tabla resumen_mensual con los datos actuales.
+    No hace falta en el uso normal (los triggers la mantienen al día): sirve
+    para repararla si quedó desfasada. Ver también src/herramientas.py.
+    """
+    with transaccion() as conn:
+        llenar_resumen_mensual(conn)
+
+
+def obtener_totales_por_mes(desde: Optional[date] = None, hasta: Optional[date] = None) -> List[dict]:
+    """
+    Totales de todos los pacientes por mes, leídos de resumen_mensual (un
+    renglón por paciente y mes, sin recorrer sesiones ni pagos).
+    Los meses se toman enteros: desde el mes de `desde` hasta el mes anterior
+    al de `hasta` (como los extremos que retorna rango_mes). Solo aparecen los
+    meses con movimientos, en orden.
+    Retorna lista de dicts con: {'mes': 'YYYY-MM', 'facturado', 'cobrado', 'informes'} (en pesos)
+    """
+    condiciones = []
+    parametros = []
+    if desde is not None:
+        condiciones.append("mes >= ?")
+        parametros.append(_clave_mes(desde.month, desde.year))
+    if hasta is not None:
+        condiciones.append("mes < ?")
+        parametros.append(_clave_mes(hasta.month, hasta.year))
+    
+    with conexion() as conn:
+        rows = conn.execute(f"""
+            SELECT mes, SUM(facturado), SUM(cobrado), SUM(informes)
+            FROM resumen_mensual
+            WHERE {" AND ".join(condiciones) or "1"}
+            GROUP BY mes
+            ORDER BY mes
+        """, parametros).fetchall()
+    
+    return [
+        {
+            'mes': mes,
+            'facturado': a_pesos(facturado),
+            'cobrado': a_pesos(cobrado),
+            'informes': a_pesos(informes)
+        }
+        for mes, facturado, cobrado, informes in rows
+    ]
+
+
+def _deuda_al_fin_de_mes(conn, clave_mes: str) -> Dict[int, Tuple[int, int]]:
+    """
+    Deuda de cada paciente al terminar el mes, en centavos, como quedó
+    registrada en resumen_mensual (deuda_cierre e informes_cierre, ver
+    src/migraciones.py): la del último renglón del paciente hasta ese mes.
+    Cada pago cuenta en su fecha, así que marcar algo pagado después no
+    cambia la deuda de los meses anteriores.
+    Retorna {paciente_id: (deuda total, deuda de informes)}; la deuda total es
+    negativa si el paciente tenía saldo a favor.
+    """
+    rows = conn.execute("""
+        SELECT r.paciente_id, r.deuda_cierre, r.informes_cierre
+        FROM pacientes p
+        JOIN resumen_mensual r
+            ON r.paciente_id = p.id
+           AND r.mes = (SELECT MAX(mes) FROM resumen_mensual
+                        WHERE paciente_id = p.id AND mes <= ?)
+    """, (clave_mes,)).fetchall()
+    return {paciente_id: (deuda, informes) for paciente_id, deuda, informes in rows}
+
+
+def obtener_deuda_al_cierre(mes: int, año: int) -> Dict[int, float]:
+    """
+    Deuda de cada paciente al terminar el mes (en pesos), leída de
+    resumen_mensual (ver _deuda_al_fin_de_mes). Solo aparecen los pacientes
+    que debían algo.
+    """
+    with conexion() as conn:
+        deudas = _deuda_al_fin_de_mes(conn, _clave_mes(mes, año))
+    
+    return {
+        paciente_id: a_pesos(deuda)
+        for paciente_id, (deuda, _informes) in deudas.items()
+        if deuda > 0
+    }
+
+
+# ========== ESTADÍSTICAS ==========
+
+# Totales de las estadísticas mensuales (son también las columnas de cierres_mensuales)
+_CLAVES_TOTALES = (
+    "total_cobrado", "cobrado_estandar", "cobrado_mensual", "cobrado_diagnostico",
+    "informes_total",
+    "deuda_total", "deuda_estandar", "deuda_mensual", "deuda_diagnostico",
+)
+
+# Estadísticas ya calculadas, por (mes, año): volver a ver un mes o exportar el
+# PDF del mes que se está viendo no repite las consultas mientras no haya cambios
+_cache_estadisticas = CacheLRU(capacidad=24)
+
+# Sufijo de las claves según el tipo de paciente
+_SUFIJO_TIPO = {
+    TipoPaciente.ESTANDAR.name: "estandar",
+    TipoPaciente.MENSUAL.name: "mensual",
+    TipoPaciente.DIAGNOSTICO.name: "diagnostico",
+}
 
 
 def obtener_estadisticas_mensuales(mes: int = None, año: int = None) -> dict:
     """
     Obtiene estadísticas de facturación de un mes específico.
     Si no se especifica mes/año, usa el mes actual.
+    Si el mes está cerrado (ver cerrar_mes) lee los valores guardados en el
+    cierre; si no, los calcula con los datos actuales.
     Retorna un diccionario con:
     - total_cobrado: dinero total cobrado en el mes
-    - desglose_cobrado: desglose por tipo de paciente
-    - informes_total: monto total de informes cobrables
-    - deuda_total: deuda total acumulada
-    - deuda_por_tipo: desglose de deuda por tipo de paciente
+    - cobrado_estandar, cobrado_mensual, cobrado_diagnostico: lo cobrado por
+      tipo de paciente
+    - informes_total: lo que faltaba cobrar de informes al terminar el mes
+    - deuda_total: deuda total acumulada al terminar el mes
+    - deuda_estandar, deuda_mensual, deuda_diagnostico: la deuda por tipo de
+      paciente
+    - detalle_pacientes: lista de dicts con nombre, tipo, cobrado, deuda y
+      arancel_social de cada paciente que pagó o debía algo
+    - fecha_cierre: cuándo se cerró el mes, o None si está abierto
+    
+    El resultado se guarda en caché hasta la próxima escritura en la base:
+    no hay que modificar el diccionario retornado.
     """
     from datetime import datetime as dt
     
@@ -650,74 +1240,178 @@ def obtener_estadisticas_mensuales(mes: int = None, año: int = None) -> dict:
     mes_actual = mes if mes is not None else ahora.month
     año_actual = año if año is not None else ahora.year
     
-    stats = {
-        "total_cobrado": 0,
-        "cobrado_estandar": 0,
-        "cobrado_mensual": 0,
-        "cobrado_diagnostico": 0,
-        "informes_total": 0,
-        "deuda_total": 0,
-        "deuda_estandar": 0,
-        "deuda_mensual": 0,
-        "deuda_diagnostico": 0,
-        "detalle_pacientes": []
-    }
-    
-    pacientes = obtener_todos_pacientes()
-    
-    for paciente in pacientes:
-        sesiones = obtener_sesiones_paciente(paciente.id)
-        pagos = obtener_pagos_paciente(paciente.id)
-        informes = obtener_informes_paciente(paciente.id)
-        
-        # Pagos del mes actual
-        pagos_mes = [p for p in pagos 
-                     if p.fecha.month == mes_actual and p.fecha.year == año_actual]
+    return _cache_estadisticas.obtener(
+        (mes_actual, año_actual),
+        lambda: _leer_o_calcular_estadisticas(_clave_mes(mes_actual, año_actual))
+    )
+
+
+def _leer_o_calcular_estadisticas(clave_mes: str) -> dict:
+    """Estadísticas del mes: las del cierre si está cerrado, si no calculadas en el momento"""
+    with conexion() as conn:
+        cierre = _leer_cierre(conn, clave_mes)
+        if cierre is not None:
+            return cierre
         
-        monto_pagado_mes = sum(p.monto for p in pagos_mes)
+        totales, detalle = _calcular_estadisticas(conn, clave_mes)
+    
+    return _armar_estadisticas(totales, detalle, None)
+
+
+def _calcular_estadisticas(conn, clave_mes: str) -> Tuple[dict, list]:
+    """
+    Calcula las estadísticas del mes con los datos actuales, en centavos.
+    La deuda es la que había al terminar el mes (ver _deuda_al_fin_de_mes):
+    la de un mes pasado no cambia con lo que pasó después.
+    Retorna (totales, detalle): totales tiene las claves de _CLAVES_TOTALES y
+    detalle es una lista de (paciente_id, nombre, tipo, arancel_social, cobrado, deuda).
+    """
+    # Todo sale de resumen_mensual: lo cobrado del renglón del mes y la deuda
+    # del último renglón de cada paciente hasta el mes (sin recorrer sesiones ni informes)
+    rows = conn.execute("""
+        SELECT p.id, p.nombre, p.tipo, p.arancel_social, COALESCE(pg.cobrado, 0)
+        FROM pacientes p
+        LEFT JOIN resumen_mensual pg
+            ON pg.paciente_id = p.id AND pg.mes = ?
+        ORDER BY p.nombre, p.id
+    """, (clave_mes,)).fetchall()
+    deudas = _deuda_al_fin_de_mes(conn, clave_mes)
+    
+    totales = dict.fromkeys(_CLAVES_TOTALES, 0)
+    detalle = []
+    
+    # Los montos de la BD son centavos enteros: se suman exactos
+    for paciente_id, nombre, tipo, arancel_social, monto_pagado_mes in rows:
+        sufijo = _SUFIJO_TIPO.get(tipo)
+        deuda, deuda_informes = deudas.get(paciente_id, (0, 0))
         
         # Desglose por tipo
         if monto_pagado_mes > 0:
-            stats["total_cobrado"] += monto_pagado_mes
-            if paciente.tipo == TipoPaciente.ESTANDAR:
-                stats["cobrado_estandar"] += monto_pagado_mes
-            elif paciente.tipo == TipoPaciente.MENSUAL:
-                stats["cobrado_mensual"] += monto_pagado_mes
-            elif paciente.tipo == TipoPaciente.DIAGNOSTICO:
-                stats["cobrado_diagnostico"] += monto_pagado_mes
+            totales["total_cobrado"] += monto_pagado_mes
+            if sufijo:
+                totales[f"cobrado_{sufijo}"] += monto_pagado_mes
         
         # Informes pendientes de cobro
-        informes_no_pagados = [i for i in informes 
-                               if i.estado_pago != EstadoPagoInforme.PAGADO]
-        deuda_informes = sum(i.precio - i.monto_pagado for i in informes_no_pagados)
-        stats["informes_total"] += deuda_informes
-        
-        # Deuda del paciente
-        deuda_paciente = sum(s.precio for s in sesiones if s.estado == EstadoSesion.PENDIENTE)
-        deuda_paciente += deuda_informes
+        totales["informes_total"] += deuda_informes
         
-        stats["deuda_total"] += deuda_paciente
+        # Deuda del paciente (el saldo a favor no es deuda)
+        deuda_paciente = max(deuda, 0)
         
-        if paciente.tipo == TipoPaciente.ESTANDAR:
-            stats["deuda_estandar"] += deuda_paciente
-        elif paciente.tipo == TipoPaciente.MENSUAL:
-            stats["deuda_mensual"] += deuda_paciente
-        elif paciente.tipo == TipoPaciente.DIAGNOSTICO:
-            stats["deuda_diagnostico"] += deuda_paciente
+        totales["deuda_total"] += deuda_paciente
+        if sufijo:
+            totales[f"deuda_{sufijo}"] += deuda_paciente
         
         # Agregar a detalle si hay información relevante
         if monto_pagado_mes > 0 or deuda_paciente > 0:
-            stats["detalle_pacientes"].append({
-                "nombre": paciente.nombre,
-                "tipo": paciente.tipo.value,
-                "cobrado": monto_pagado_mes,
-                "deuda": deuda_paciente,
-                "arancel_social": paciente.arancel_social
-            })
-    
+            detalle.append((paciente_id, nombre, tipo, arancel_social, monto_pagado_mes, deuda_paciente))
+    
+    return totales, detalle
+
+
+def _armar_estadisticas(totales: dict, detalle: list, fecha_cierre: Optional[datetime]) -> dict:
+    """Arma el diccionario de obtener_estadisticas_mensuales (en pesos) a partir de centavos"""
+    stats = {clave: a_pesos(totales[clave]) for clave in _CLAVES_TOTALES}
+    stats["detalle_pacientes"] = [
+        {
+            "nombre": nombre,
+            "tipo": _TEXTO_TIPO_PACIENTE[tipo],
+            "cobrado": a_pesos(cobrado),
+            "deuda": a_pesos(deuda),
+            "arancel_social": bool(arancel_social)
+        }
+        for _paciente_id, nombre, tipo, arancel_social, cobrado, deuda in detalle
+    ]
+    stats["fecha_cierre"] = fecha_cierre
     return stats
 
 
+# ========== CIERRE DE MES ==========
+
+def _leer_cierre(conn, clave_mes: str) -> Optional[dict]:
+    """Lee las estadísticas guardadas al cerrar el mes, o None si el mes no está cerrado"""
+    row = conn.execute(
+        f"SELECT fecha_cierre, {', '.join(_CLAVES_TOTALES)} FROM cierres_mensuales WHERE mes=?",
+        (clave_mes,)
+    ).fetchone()
+    if row is None:
+        return None
+    
+    detalle = conn.execute("""
+        SELECT paciente_id, nombre, tipo, arancel_social, cobrado, deuda
+        FROM cierres_mensuales_pacientes
+        WHERE mes=?
+        ORDER BY posicion
+    """, (clave_mes,)).fetchall()
+    
+    return _armar_estadisticas(dict(zip(_CLAVES_TOTALES, row[1:])), detalle, _fecha(row[0]))
+
+
+def mes_cerrado(mes: int, año: int) -> bool:
+    """Retorna True si el mes ya fue cerrado con cerrar_mes"""
+    with conexion() as conn:
+        return conn.execute(
+            "SELECT 1 FROM cierres_mensuales WHERE mes=?", (_clave_mes(mes, año),)
+        ).fetchone() is not None
+
+
+def obtener_meses_cerrados() -> List[str]:
+    """Retorna los meses cerrados ('YYYY-MM'), del más antiguo al más reciente"""
+    with conexion() as conn:
+        return [mes for (mes,) in conn.execute("SELECT mes FROM cierres_mensuales ORDER BY mes")]
+
+
+def cerrar_mes(mes: int, año: int) -> dict:
+    """
+    Cierra un mes ya terminado: guarda sus estadísticas (totales y detalle por
+    paciente, con la deuda de cada uno al terminar el mes, aunque se cierre
+    meses después) y a partir de ahí obtener_estadisticas_mensuales las lee
+    de ahí, sin recalcular.
+    Después del cierre la base no permite agregar, eliminar ni cambiar montos
+    o fechas de sesiones, pagos e informes de ese mes (PeriodoCerradoError);
+    sí se pueden marcar como pagados. El cierre no se puede deshacer.
+    Tampoco se cierran los meses anteriores a la migración 11 en una base que
+    ya tenía datos: no se sabe cuándo se pagó lo que estaba pago y su deuda al
+    cierre es aproximada (ver fechas_pago_estimadas en src/migraciones.py).
+    Retorna las estadísticas guardadas.
+    """
+    _inicio, fin = rango_mes(mes, año)
+    if fin > datetime.now():
+        raise ValueError("Solo se pueden cerrar meses que ya terminaron")
+    
+    clave_mes = _clave_mes(mes, año)
+    fecha_cierre = datetime.now().replace(microsecond=0)
+    
+    with transaccion() as conn:
+        if conn.execute("SELECT 1 FROM cierres_mensuales WHERE mes=?", (clave_mes,)).fetchone():
+            raise ValueError(f"El mes {mes:02d}/{año} ya está cerrado")
+        
+        # 'YYYY-MM' del texto de la fecha se compara igual que clave_mes
+        estimadas_hasta = conn.execute(
+            "SELECT MAX(substr(hasta, 1, 7)) FROM fechas_pago_estimadas"
+        ).fetchone()[0]
+        if estimadas_hasta is not None and clave_mes < estimadas_hasta:
+            raise ValueError(
+                f"No se puede cerrar {mes:02d}/{año}: los pagos registrados antes de "
+                f"actualizar la base ({estimadas_hasta[5:]}/{estimadas_hasta[:4]}) no "
+                "tienen fecha de pago y la deuda al cierre sería aproximada"
+            )
+        
+        totales, detalle = _calcular_estadisticas(conn, clave_mes)
+        
+        conn.execute(f"""
+            INSERT INTO cierres_mensuales (mes, fecha_cierre, {', '.join(_CLAVES_TOTALES)})
+            VALUES (?, ?, {', '.join('?' * len(_CLAVES_TOTALES))})
+        """, (clave_mes, _fecha_a_texto(fecha_cierre), *(totales[clave] for clave in _CLAVES_TOTALES)))
+        
+        conn.executemany("""
+            INSERT INTO cierres_mensuales_pacientes
+                (mes, posicion, paciente_id, nombre, tipo, arancel_social, cobrado, deuda)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, [(clave_mes, posicion, *fila) for posicion, fila in enumerate(detalle)])
+    
+    return _armar_estadisticas(totales, detalle, fecha_cierre)
+
+
 # ========== FUNCIONES PARA ELIMINAR ==========
 
 def eliminar_paciente(paciente_id: int):
@@ -725,52 +1419,65 @@ def eliminar_paciente(paciente_id: int):
     Elimina un paciente y TODOS sus registros asociados (sesiones, pagos, informes)
     CUIDADO: Esta operación no se puede deshacer
     """
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
-    # Eliminar todos los registros asociados primero
-    cursor.execute("DELETE FROM sesiones WHERE paciente_id=?", (paciente_id,))
-    cursor.execute("DELETE FROM pagos WHERE paciente_id=?", (paciente_id,))
-    cursor.execute("DELETE FROM informes WHERE paciente_id=?", (paciente_id,))
-    
-    # Eliminar el paciente
-    cursor.execute("DELETE FROM pacientes WHERE id=?", (paciente_id,))
-    
-    conn.commit()
-    conn.close()
+    with _transaccion_de_escritura() as conn:
+        # Eliminar todos los registros asociados primero
+        conn.execute("DELETE FROM sesiones WHERE paciente_id=?", (paciente_id,))
+        conn.execute("DELETE FROM pagos WHERE paciente_id=?", (paciente_id,))
+        conn.execute("DELETE FROM informes WHERE paciente_id=?", (paciente_id,))
+        
+        # Eliminar el paciente
+        conn.execute("DELETE FROM pacientes WHERE id=?", (paciente_id,))
 
 
-def eliminar_sesion(sesion_id: int):
-    """Elimina una sesión específica"""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
-    cursor.execute("DELETE FROM sesiones WHERE id=?", (sesion_id,))
+def _eliminar_registro(conn, tabla: str, registro_id: int) -> Optional[int]:
+    """Elimina un registro de tabla y retorna el id de su paciente (None si no existía)"""
+    fila = conn.execute(f"SELECT paciente_id FROM {tabla} WHERE id=?", (registro_id,)).fetchone()
+    if fila is None:
+        return None
     
-    conn.commit()
-    conn.close()
+    conn.execute(f"DELETE FROM {tabla} WHERE id=?", (registro_id,))
+    return fila[0]
 
 
-def eliminar_pago(pago_id: int):
-    """Elimina un pago específico"""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
-    cursor.execute("DELETE FROM pagos WHERE id=?", (pago_id,))
-    
-    conn.commit()
-    conn.close()
+def eliminar_sesion(sesion_id: int) -> Optional[Cambios]:
+    """Elimina una sesión específica. Retorna los Cambios (None si no existía)"""
+    with _transaccion_de_escritura() as conn:
+        paciente_id = _eliminar_registro(conn, "sesiones", sesion_id)
+        if paciente_id is None:
+            return None
+        return _leer_cambios(conn, paciente_id, sesiones_eliminadas=[sesion_id])
 
 
-def eliminar_informe(informe_id: int):
-    """Elimina un informe específico"""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
-    cursor.execute("DELETE FROM informes WHERE id=?", (informe_id,))
-    
-    conn.commit()
-    conn.close()
+def eliminar_pago(pago_id: int) -> Optional[Cambios]:
+    """
+    Elimina un pago específico. Retorna los Cambios (None si no existía)
+    Las sesiones e informes que pagó siguen pagados; lo que el pago dejó como
+    saldo a favor vuelve a sumarse a la deuda. Los ajustes manuales y el
+    saldo a favor de otros pagos no cambian.
+    """
+    with _transaccion_de_escritura() as conn:
+        fila = conn.execute(
+            "SELECT paciente_id, fecha, saldo_a_favor FROM pagos WHERE id=?", (pago_id,)
+        ).fetchone()
+        if fila is None:
+            return None
+        paciente_id, fecha, saldo_a_favor = fila
+        
+        conn.execute("DELETE FROM pagos WHERE id=?", (pago_id,))
+        
+        # Los pagos no pasan por los triggers de deuda: deshacer solo lo que
+        # este pago descontó directamente de la deuda, en la fecha del pago
+        _mover_deuda(conn, paciente_id, saldo_a_favor, _fecha(fecha))
+        return _leer_cambios(conn, paciente_id, pagos_eliminados=[pago_id])
+
+
+def eliminar_informe(informe_id: int) -> Optional[Cambios]:
+    """Elimina un informe específico. Retorna los Cambios (None si no existía)"""
+    with _transaccion_de_escritura() as conn:
+        paciente_id = _eliminar_registro(conn, "informes", informe_id)
+        if paciente_id is None:
+            return None
+        return _leer_cambios(conn, paciente_id, informes_eliminados=[informe_id])
 
 
 def exportar_reporte_pdf(stats: dict, mes: int, año: int, ruta_archivo: str):
@@ -783,36 +1490,18 @@ def exportar_reporte_pdf(stats: dict, mes: int, año: int, ruta_archivo: str):
     - año: año del reporte
     - ruta_archivo: ruta donde guardar el PDF
     """
-    from reportlab.lib.pagesizes import letter, A4
-    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.lib.pagesizes import letter
     from reportlab.lib.units import inch
-    from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak
-    from reportlab.lib import colors
+    from reportlab.platypus import SimpleDocTemplate, Table, Paragraph, Spacer
     from datetime import datetime as dt
     
+    estilos = _estilos_pdf()
+    title_style = estilos["titulo"]
+    heading_style = estilos["encabezado"]
+    
     # Crear documento
     doc = SimpleDocTemplate(ruta_archivo, pagesize=letter, topMargin=0.5*inch, bottomMargin=0.5*inch)
     elements = []
-    styles = getSampleStyleSheet()
-    
-    # Estilo personalizado para título
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=18,
-        textColor=colors.HexColor('#2c3e50'),
-        spaceAfter=30,
-        alignment=1  # Centro
-    )
-    
-    heading_style = ParagraphStyle(
-        'CustomHeading',
-        parent=styles['Heading2'],
-        fontSize=13,
-        textColor=colors.HexColor('#27ae60'),
-        spaceBefore=12,
-        spaceAfter=6
-    )
     
     # Título
     mes_nombre = dt(año, mes, 1).strftime("%B %Y")
@@ -832,19 +1521,7 @@ def exportar_reporte_pdf(stats: dict, mes: int, año: int, ruta_archivo: str):
     ]
     
     ingresos_table = Table(ingresos_data, colWidths=[4*inch, 2*inch])
-    ingresos_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#27ae60')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 11),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('BACKGROUND', (0, 1), (-1, 1), colors.HexColor('#d5f4e6')),
-        ('FONTNAME', (0, 1), (-1, 1), 'Helvetica-Bold'),
-        ('GRID', (0, 0), (-1, -1), 1, colors.grey),
-        ('ROWBACKGROUNDS', (0, 2), (-1, -1), [colors.white, colors.HexColor('#f0f0f0')]),
-    ]))
+    ingresos_table.setStyle(estilos["tabla_ingresos"])
     elements.append(ingresos_table)
     elements.append(Spacer(1, 0.3*inch))
     
@@ -860,19 +1537,7 @@ def exportar_reporte_pdf(stats: dict, mes: int, año: int, ruta_archivo: str):
     ]
     
     deuda_table = Table(deuda_data, colWidths=[4*inch, 2*inch])
-    deuda_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#e74c3c')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 11),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('BACKGROUND', (0, 1), (-1, 1), colors.HexColor('#fadbd8')),
-        ('FONTNAME', (0, 1), (-1, 1), 'Helvetica-Bold'),
-        ('GRID', (0, 0), (-1, -1), 1, colors.grey),
-        ('ROWBACKGROUNDS', (0, 2), (-1, -1), [colors.white, colors.HexColor('#f0f0f0')]),
-    ]))
+    deuda_table.setStyle(estilos["tabla_deuda"])
     elements.append(deuda_table)
     elements.append(Spacer(1, 0.3*inch))
     
@@ -893,7 +1558,75 @@ def exportar_reporte_pdf(stats: dict, mes: int, año: int, ruta_archivo: str):
             ])
         
         detalle_table = Table(detalle_data, colWidths=[2.5*inch, 1.5*inch, 1.2*inch, 1.2*inch])
-        detalle_table.setStyle(TableStyle([
+        detalle_table.setStyle(estilos["tabla_detalle"])
+        elements.append(detalle_table)
+    
+    # Construir PDF
+    doc.build(elements)
+
+
+@lru_cache(maxsize=1)
+def _estilos_pdf() -> dict:
+    """
+    Estilos de párrafos y tablas del reporte PDF. Armarlos (sobre todo
+    getSampleStyleSheet) lleva su tiempo y son siempre los mismos: se arman
+    una sola vez, en la primera exportación.
+    """
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.platypus import TableStyle
+    from reportlab.lib import colors
+    
+    styles = getSampleStyleSheet()
+    
+    # Estilo personalizado para título
+    title_style = ParagraphStyle(
+        'CustomTitle',
+        parent=styles['Heading1'],
+        fontSize=18,
+        textColor=colors.HexColor('#2c3e50'),
+        spaceAfter=30,
+        alignment=1  # Centro
+    )
+    
+    heading_style = ParagraphStyle(
+        'CustomHeading',
+        parent=styles['Heading2'],
+        fontSize=13,
+        textColor=colors.HexColor('#27ae60'),
+        spaceBefore=12,
+        spaceAfter=6
+    )
+    
+    return {
+        "titulo": title_style,
+        "encabezado": heading_style,
+        "tabla_ingresos": TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#27ae60')),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+            ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, 0), 11),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+            ('BACKGROUND', (0, 1), (-1, 1), colors.HexColor('#d5f4e6')),
+            ('FONTNAME', (0, 1), (-1, 1), 'Helvetica-Bold'),
+            ('GRID', (0, 0), (-1, -1), 1, colors.grey),
+            ('ROWBACKGROUNDS', (0, 2), (-1, -1), [colors.white, colors.HexColor('#f0f0f0')]),
+        ]),
+        "tabla_deuda": TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#e74c3c')),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+            ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, 0), 11),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+            ('BACKGROUND', (0, 1), (-1, 1), colors.HexColor('#fadbd8')),
+            ('FONTNAME', (0, 1), (-1, 1), 'Helvetica-Bold'),
+            ('GRID', (0, 0), (-1, -1), 1, colors.grey),
+            ('ROWBACKGROUNDS', (0, 2), (-1, -1), [colors.white, colors.HexColor('#f0f0f0')]),
+        ]),
+        "tabla_detalle": TableStyle([
             ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2c3e50')),
             ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
             ('ALIGN', (0, 0), (0, -1), 'LEFT'),
@@ -904,119 +1637,143 @@ def exportar_reporte_pdf(stats: dict, mes: int, año: int, ruta_archivo: str):
             ('GRID', (0, 0), (-1, -1), 1, colors.grey),
             ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f0f0f0')]),
             ('FONTSIZE', (0, 1), (-1, -1), 9),
-        ]))
-        elements.append(detalle_table)
-    
-    # Construir PDF
-    doc.build(elements)
+        ]),
+    }
 
 
 # ===== FUNCIONES DE EXPORTACIÓN A CSV =====
 
-def exportar_pacientes_csv(ruta_archivo: str):
+# Cantidad de filas que se leen de la base por vez al exportar
+TAMAÑO_LOTE_EXPORTACION = 500
+
+
+def _escribir_csv(ruta_archivo: str, encabezado: list, sql: str, formatear_fila, parametros=()):
     """
-    Exporta la lista de pacientes a CSV con información resumida.
-    Incluye: Nombre, Tipo, Costo Sesión, Deuda Actual, Arancel Social, Notas
+    Escribe un CSV leyendo el resultado de la consulta por lotes (fetchmany),
+    así la memoria usada no depende de la cantidad de filas exportadas.
+    formatear_fila recibe una fila de la consulta y retorna la fila del CSV.
     """
     import csv
     
-    pacientes = obtener_todos_pacientes()
-    
-    with open(ruta_archivo, 'w', newline='', encoding='utf-8') as csvfile:
-        fieldnames = ['Nombre', 'Tipo', 'Costo Sesión', 'Deuda Actual', 'Arancel Social', 'Notas']
-        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+    with conexion() as conn, open(ruta_archivo, 'w', newline='', encoding='utf-8') as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(encabezado)
         
-        writer.writeheader()
-        for pac in pacientes:
-            writer.writerow({
-                'Nombre': pac.nombre,
-                'Tipo': pac.tipo.value,
-                'Costo Sesión': f"${pac.costo_sesion:,.2f}",
-                'Deuda Actual': f"${pac.deuda:,.2f}",
-                'Arancel Social': 'Sí' if pac.arancel_social else 'No',
-                'Notas': pac.notas
-            })
+        cursor = conn.execute(sql, parametros)
+        while True:
+            filas = cursor.fetchmany(TAMAÑO_LOTE_EXPORTACION)
+            if not filas:
+                break
+            writer.writerows(map(formatear_fila, filas))
+
+
+def exportar_pacientes_csv(ruta_archivo: str):
+    """
+    Exporta la lista de pacientes a CSV con información resumida.
+    Incluye: Nombre, Tipo, Costo Sesión, Deuda Actual, Arancel Social, Notas
+    """
+    _escribir_csv(
+        ruta_archivo,
+        ['Nombre', 'Tipo', 'Costo Sesión', 'Deuda Actual', 'Arancel Social', 'Notas'],
+        """
+            SELECT nombre, tipo, costo_sesion, deuda, arancel_social, notas
+            FROM pacientes
+            ORDER BY nombre, id
+        """,
+        lambda f: (
+            f[0],
+            _TEXTO_TIPO_PACIENTE[f[1]],
+            f"${a_pesos(f[2]):,.2f}",
+            f"${a_pesos(f[3]):,.2f}",
+            'Sí' if f[4] else 'No',
+            f[5]
+        )
+    )
+
 
+# En las consultas siguientes, CROSS JOIN fuerza a recorrer los pacientes en
+# orden de nombre (índice) y buscar los registros de cada uno por su índice,
+# así SQLite solo ordena los registros de un paciente a la vez.
 
-def exportar_sesiones_csv(ruta_archivo: str):
+def exportar_sesiones_csv(ruta_archivo: str, desde: Optional[date] = None, hasta: Optional[date] = None):
     """
-    Exporta todas las sesiones a CSV.
+    Exporta todas las sesiones a CSV (o solo las del período [desde, hasta) si se indica).
     Incluye: Paciente, Fecha, Tipo, Precio, Estado, Notas
     """
-    import csv
-    
-    pacientes = obtener_todos_pacientes()
-    
-    with open(ruta_archivo, 'w', newline='', encoding='utf-8') as csvfile:
-        fieldnames = ['Paciente', 'Fecha', 'Tipo', 'Precio', 'Estado', 'Notas']
-        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-        
-        writer.writeheader()
-        for pac in pacientes:
-            sesiones = obtener_sesiones_paciente(pac.id)
-            for sesion in sesiones:
-                writer.writerow({
-                    'Paciente': pac.nombre,
-                    'Fecha': sesion.fecha.strftime("%d/%m/%Y"),
-                    'Tipo': sesion.tipo.value,
-                    'Precio': f"${sesion.precio:,.2f}",
-                    'Estado': sesion.estado.value,
-                    'Notas': sesion.notas
-                })
+    condicion, parametros = _condicion_rango("s.fecha", desde, hasta)
+    _escribir_csv(
+        ruta_archivo,
+        ['Paciente', 'Fecha', 'Tipo', 'Precio', 'Estado', 'Notas'],
+        f"""
+            SELECT p.nombre, s.fecha, s.tipo, s.precio, s.estado, s.notas
+            FROM pacientes p CROSS JOIN sesiones s ON s.paciente_id = p.id
+            WHERE {condicion}
+            ORDER BY p.nombre, p.id, s.fecha DESC, s.id
+        """,
+        lambda f: (
+            f[0],
+            _fecha_iso_a_texto(f[1]),
+            _TEXTO_TIPO_SESION[f[2]],
+            f"${a_pesos(f[3]):,.2f}",
+            _TEXTO_ESTADO_SESION[f[4]],
+            f[5]
+        ),
+        parametros
+    )
 
 
-def exportar_pagos_csv(ruta_archivo: str):
+def exportar_pagos_csv(ruta_archivo: str, desde: Optional[date] = None, hasta: Optional[date] = None):
     """
-    Exporta todos los pagos a CSV.
+    Exporta todos los pagos a CSV (o solo los del período [desde, hasta) si se indica).
     Incluye: Paciente, Fecha, Monto, Concepto, Notas
     """
-    import csv
-    
-    pacientes = obtener_todos_pacientes()
-    
-    with open(ruta_archivo, 'w', newline='', encoding='utf-8') as csvfile:
-        fieldnames = ['Paciente', 'Fecha', 'Monto', 'Concepto', 'Notas']
-        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-        
-        writer.writeheader()
-        for pac in pacientes:
-            pagos = obtener_pagos_paciente(pac.id)
-            for pago in pagos:
-                writer.writerow({
-                    'Paciente': pac.nombre,
-                    'Fecha': pago.fecha.strftime("%d/%m/%Y"),
-                    'Monto': f"${pago.monto:,.2f}",
-                    'Concepto': pago.concepto.value,
-                    'Notas': pago.notas
-                })
+    condicion, parametros = _condicion_rango("pg.fecha", desde, hasta)
+    _escribir_csv(
+        ruta_archivo,
+        ['Paciente', 'Fecha', 'Monto', 'Concepto', 'Notas'],
+        f"""
+            SELECT p.nombre, pg.fecha, pg.monto, pg.concepto, pg.notas
+            FROM pacientes p CROSS JOIN pagos pg ON pg.paciente_id = p.id
+            WHERE {condicion}
+            ORDER BY p.nombre, p.id, pg.fecha DESC, pg.id
+        """,
+        lambda f: (
+            f[0],
+            _fecha_iso_a_texto(f[1]),
+            f"${a_pesos(f[2]):,.2f}",
+            _TEXTO_CONCEPTO_PAGO[f[3]],
+            f[4]
+        ),
+        parametros
+    )
 
 
-def exportar_informes_csv(ruta_archivo: str):
+def exportar_informes_csv(ruta_archivo: str, desde: Optional[date] = None, hasta: Optional[date] = None):
     """
-    Exporta todos los informes a CSV.
+    Exporta todos los informes a CSV (o solo los del período [desde, hasta) si se indica).
     Incluye: Paciente, Tipo, Estado, Precio, Monto Pagado, Estado de Pago, Notas
     """
-    import csv
-    
-    pacientes = obtener_todos_pacientes()
-    
-    with open(ruta_archivo, 'w', newline='', encoding='utf-8') as csvfile:
-        fieldnames = ['Paciente', 'Tipo', 'Estado', 'Precio', 'Monto Pagado', 'Estado Pago', 'Notas']
-        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-        
-        writer.writeheader()
-        for pac in pacientes:
-            informes = obtener_informes_paciente(pac.id)
-            for informe in informes:
-                writer.writerow({
-                    'Paciente': pac.nombre,
-                    'Tipo': informe.tipo.value,
-                    'Estado': informe.estado.value,
-                    'Precio': f"${informe.precio:,.2f}",
-                    'Monto Pagado': f"${informe.monto_pagado:,.2f}",
-                    'Estado Pago': informe.estado_pago.value,
-                    'Notas': informe.notas
-                })
+    condicion, parametros = _condicion_rango("i.fecha_creacion", desde, hasta)
+    _escribir_csv(
+        ruta_archivo,
+        ['Paciente', 'Tipo', 'Estado', 'Precio', 'Monto Pagado', 'Estado Pago', 'Notas'],
+        f"""
+            SELECT p.nombre, i.tipo, i.estado, i.precio, i.monto_pagado, i.estado_pago, i.notas
+            FROM pacientes p CROSS JOIN informes i ON i.paciente_id = p.id
+            WHERE {condicion}
+            ORDER BY p.nombre, p.id, i.fecha_creacion DESC, i.id
+        """,
+        lambda f: (
+            f[0],
+            _TEXTO_TIPO_INFORME[f[1]],
+            _TEXTO_ESTADO_INFORME[f[2]],
+            f"${a_pesos(f[3]):,.2f}",
+            f"${a_pesos(f[4]):,.2f}",
+            _TEXTO_ESTADO_PAGO_INFORME[f[5]],
+            f[6]
+        ),
+        parametros
+    )
 
 
 def exportar_resumen_csv(ruta_archivo: str):
@@ -1026,15 +1783,25 @@ def exportar_resumen_csv(ruta_archivo: str):
     import csv
     from datetime import datetime as dt
     
-    pacientes = obtener_todos_pacientes()
+    # Deuda y saldo a favor por tipo de paciente, sumados en la BD (en centavos)
+    with conexion() as conn:
+        por_tipo = {tipo: (deuda, saldo_favor) for tipo, deuda, saldo_favor in conn.execute("""
+            SELECT tipo,
+                   SUM(CASE WHEN deuda > 0 THEN deuda ELSE 0 END),
+                   SUM(CASE WHEN deuda < 0 THEN -deuda ELSE 0 END)
+            FROM pacientes
+            GROUP BY tipo
+        """)}
     
-    total_deuda = sum(p.deuda for p in pacientes if p.deuda > 0)
-    total_saldo_favor = sum(abs(p.deuda) for p in pacientes if p.deuda < 0)
+    total_deuda = a_pesos(sum(deuda for deuda, _saldo in por_tipo.values()))
+    total_saldo_favor = a_pesos(sum(saldo for _deuda, saldo in por_tipo.values()))
     
     # Contar entidades
-    total_sesiones = sum(len(obtener_sesiones_paciente(p.id)) for p in pacientes)
-    total_pagos = sum(len(obtener_pagos_paciente(p.id)) for p in pacientes)
-    total_informes = sum(len(obtener_informes_paciente(p.id)) for p in pacientes)
+    totales = contar_registros()
+    total_pacientes = totales['pacientes']
+    total_sesiones = totales['sesiones']
+    total_pagos = totales['pagos']
+    total_informes = totales['informes']
     
     with open(ruta_archivo, 'w', newline='', encoding='utf-8') as csvfile:
         fieldnames = ['Métrica', 'Valor']
@@ -1043,7 +1810,7 @@ def exportar_resumen_csv(ruta_archivo: str):
         writer.writeheader()
         writer.writerow({'Métrica': 'Fecha de Exportación', 'Valor': dt.now().strftime("%d/%m/%Y %H:%M:%S")})
         writer.writerow({'Métrica': '', 'Valor': ''})
-        writer.writerow({'Métrica': 'Total Pacientes', 'Valor': len(pacientes)})
+        writer.writerow({'Métrica': 'Total Pacientes', 'Valor': total_pacientes})
         writer.writerow({'Métrica': 'Total Sesiones', 'Valor': total_sesiones})
         writer.writerow({'Métrica': 'Total Pagos', 'Valor': total_pagos})
         writer.writerow({'Métrica': 'Total Informes', 'Valor': total_informes})
@@ -1054,15 +1821,16 @@ def exportar_resumen_csv(ruta_archivo: str):
         
         # Por tipo de paciente
         for tipo in TipoPaciente:
-            pacientes_tipo = [p for p in pacientes if p.tipo == tipo]
-            if pacientes_tipo:
-                deuda_tipo = sum(p.deuda for p in pacientes_tipo if p.deuda > 0)
+            if tipo.name in por_tipo:
+                deuda_tipo = a_pesos(por_tipo[tipo.name][0])
                 writer.writerow({'Métrica': f'Deuda - {tipo.value}', 'Valor': f"${deuda_tipo:,.2f}"})
 
 
-def exportar_todo(directorio: str) -> dict:
+def exportar_todo(directorio: str, desde: Optional[date] = None, hasta: Optional[date] = None) -> dict:
     """
     Exporta todos los datos en múltiples archivos CSV.
+    Si se indica desde/hasta, las sesiones, pagos e informes se limitan a ese
+    período (hasta excluido); pacientes y resumen se exportan completos.
     Retorna un diccionario con las rutas de los archivos creados.
     """
     from pathlib import Path
@@ -1077,13 +1845,13 @@ def exportar_todo(directorio: str) -> dict:
     exportar_pacientes_csv(archivos['pacientes'])
     
     archivos['sesiones'] = str(ruta_dir / 'sesiones.csv')
-    exportar_sesiones_csv(archivos['sesiones'])
+    exportar_sesiones_csv(archivos['sesiones'], desde, hasta)
     
     archivos['pagos'] = str(ruta_dir / 'pagos.csv')
-    exportar_pagos_csv(archivos['pagos'])
+    exportar_pagos_csv(archivos['pagos'], desde, hasta)
     
     archivos['informes'] = str(ruta_dir / 'informes.csv')
-    exportar_informes_csv(archivos['informes'])
+    exportar_informes_csv(archivos['informes'], desde, hasta)
     
     archivos['resumen'] = str(ruta_dir / 'resumen.csv')
     exportar_resumen_csv(archivos['resumen'])
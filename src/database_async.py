@@ -0,0 +1,141 @@
+"""
+Acceso a la base de datos desde código asyncio.
+
+Versiones `async` de las funciones de database.py, para servicios sin
+ventana (una API local, procesos por lotes) que atienden muchos pedidos a
+la vez. Las funciones de database.py no cambian: se ejecutan en hilos
+aparte y el event loop sigue atendiendo otros pedidos mientras esperan.
+
+    sesiones = await obtener_sesiones_paciente_async(paciente_id)
+    sesiones, pagos, informes = await obtener_datos_paciente_async(paciente_id)
+
+- Las lecturas corren en varios hilos a la vez (cada hilo tiene su propia
+  conexión, ver conexion.py).
+- Las escrituras corren todas en un mismo hilo, de a una: SQLite permite
+  un solo escritor y así dos transacciones nunca se bloquean entre sí.
+- Como máximo MAX_PENDIENTES llamadas esperan o corren en los hilos al mismo
+  tiempo; las demás esperan su turno en el event loop sin ocupar memoria
+  en la cola de los hilos.
+"""
+import asyncio
+import functools
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional, Tuple
+
+import src.database as db
+from src.models import Sesion, Pago, Informe
+
+# Hilos para lecturas y cantidad máxima de llamadas en curso (por event loop)
+HILOS_LECTURA = 4
+MAX_PENDIENTES = 32
+
+_lock = threading.Lock()
+_hilos_lectura: Optional[ThreadPoolExecutor] = None
+_hilo_escritura: Optional[ThreadPoolExecutor] = None
+
+# Un semáforo por event loop (un asyncio.Semaphore solo sirve en su loop)
+_semaforos: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+
+
+# ========== EJECUCIÓN EN HILOS ==========
+
+def _ejecutores() -> Tuple[ThreadPoolExecutor, ThreadPoolExecutor]:
+    """Los hilos de lectura y de escritura (se crean la primera vez que se usan)"""
+    global _hilos_lectura, _hilo_escritura
+    with _lock:
+        if _hilos_lectura is None:
+            _hilos_lectura = ThreadPoolExecutor(max_workers=HILOS_LECTURA, thread_name_prefix="db-lectura")
+            _hilo_escritura = ThreadPoolExecutor(max_workers=1, thread_name_prefix="db-escritura")
+        return _hilos_lectura, _hilo_escritura
+
+
+def _semaforo() -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    semaforo = _semaforos.get(loop)
+    if semaforo is None:
+        semaforo = _semaforos[loop] = asyncio.Semaphore(MAX_PENDIENTES)
+    return semaforo
+
+
+async def ejecutar(funcion: Callable, *args, escribe: bool = False, **kwargs):
+    """
+    Ejecuta funcion(*args, **kwargs) en un hilo y espera su resultado sin
+    bloquear el event loop. escribe=True la ejecuta en el hilo de escrituras.
+    """
+    lectura, escritura = _ejecutores()
+    async with _semaforo():
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            escritura if escribe else lectura, functools.partial(funcion, *args, **kwargs)
+        )
+
+
+def cerrar():
+    """
+    Espera a que terminen las llamadas en curso y cierra los hilos.
+    Las próximas llamadas vuelven a crearlos.
+    """
+    global _hilos_lectura, _hilo_escritura
+    with _lock:
+        ejecutores = (_hilos_lectura, _hilo_escritura)
+        _hilos_lectura = _hilo_escritura = None
+    for ejecutor in ejecutores:
+        if ejecutor is not None:
+            ejecutor.shutdown(wait=True)
+
+
+def _asincronica(funcion: Callable, escribe: bool = False) -> Callable:
+    """Versión async de una función de database.py (mismos argumentos y resultado)"""
+    @functools.wraps(funcion)
+    async def envoltura(*args, **kwargs):
+        return await ejecutar(funcion, *args, escribe=escribe, **kwargs)
+    
+    envoltura.__name__ = envoltura.__qualname__ = f"{funcion.__name__}_async"
+    return envoltura
+
+
+# ========== LECTURAS ==========
+
+obtener_todos_pacientes_async = _asincronica(db.obtener_todos_pacientes)
+obtener_paciente_async = _asincronica(db.obtener_paciente)
+buscar_pacientes_async = _asincronica(db.buscar_pacientes)
+obtener_sesiones_paciente_async = _asincronica(db.obtener_sesiones_paciente)
+obtener_pagos_paciente_async = _asincronica(db.obtener_pagos_paciente)
+obtener_informes_paciente_async = _asincronica(db.obtener_informes_paciente)
+obtener_snapshot_paciente_async = _asincronica(db.obtener_snapshot_paciente)
+verificar_deuda_paciente_async = _asincronica(db.verificar_deuda_paciente)
+obtener_totales_por_mes_async = _asincronica(db.obtener_totales_por_mes)
+obtener_deuda_al_cierre_async = _asincronica(db.obtener_deuda_al_cierre)
+obtener_estadisticas_mensuales_async = _asincronica(db.obtener_estadisticas_mensuales)
+
+
+async def obtener_datos_paciente_async(paciente_id: int) -> Tuple[List[Sesion], List[Pago], List[Informe]]:
+    """
+    Sesiones, pagos e informes de un paciente, leídos a la vez en tres hilos.
+    Cada lista es consistente, pero si otro proceso escribe en el medio las
+    tres pueden no serlo entre sí: para eso usar obtener_snapshot_paciente_async.
+    """
+    sesiones, pagos, informes = await asyncio.gather(
+        obtener_sesiones_paciente_async(paciente_id),
+        obtener_pagos_paciente_async(paciente_id),
+        obtener_informes_paciente_async(paciente_id),
+    )
+    return sesiones, pagos, informes
+
+
+# ========== ESCRITURAS ==========
+
+guardar_paciente_async = _asincronica(db.guardar_paciente, escribe=True)
+registrar_sesion_async = _asincronica(db.registrar_sesion, escribe=True)
+modificar_sesion_async = _asincronica(db.modificar_sesion, escribe=True)
+registrar_pago_async = _asincronica(db.registrar_pago, escribe=True)
+aplicar_pago_automatico_async = _asincronica(db.aplicar_pago_automatico, escribe=True)
+registrar_informe_async = _asincronica(db.registrar_informe, escribe=True)
+modificar_informe_async = _asincronica(db.modificar_informe, escribe=True)
+eliminar_paciente_async = _asincronica(db.eliminar_paciente, escribe=True)
+eliminar_sesion_async = _asincronica(db.eliminar_sesion, escribe=True)
+eliminar_pago_async = _asincronica(db.eliminar_pago, escribe=True)
+eliminar_informe_async = _asincronica(db.eliminar_informe, escribe=True)
+cerrar_mes_async = _asincronica(db.cerrar_mes, escribe=True)
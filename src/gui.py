@@ -1,15 +1,59 @@
+import sqlite3
+import time
 import tkinter as tk
 from tkinter import ttk, messagebox, simpledialog
+from dataclasses import replace
 from datetime import datetime
-from typing import Optional
+from typing import Callable, List, Optional, Tuple
 
 import src.database as db
+from src import snapshot_pacientes
+from src.config import PRESUPUESTO_INICIO
+from src.busqueda import IndicePacientes
+from src.conexion import version_datos
+from src.tareas import EjecutorTareas
+from src.widgets import (
+    ListaVirtual, TarjetaSesion, TarjetaPago, TarjetaInforme, IndicadorOcupado,
+    configurar, mostrar_u_ocultar
+)
 from src.models import (
-    Paciente, Sesion, Pago, Informe,
+    Paciente, Sesion, Pago, Informe, PacienteSnapshot, Cambios,
     TipoPaciente, TipoSesion, EstadoSesion, ConceptoPago,
-    TipoInforme, EstadoInforme, EstadoPagoInforme
+    TipoInforme, EstadoInforme, EstadoPagoInforme, POR_VALOR, a_centavos
 )
 
+# Filas que se agregan por vez a la lista de pacientes: entre una tanda y la
+# siguiente Tk dibuja la ventana y atiende eventos (ver llenar_lista_pacientes)
+FILAS_POR_TANDA = 200
+
+
+def _leer_indice_pacientes() -> Tuple[int, IndicePacientes]:
+    """
+    Lee todos los pacientes y arma su índice (en el hilo de lecturas).
+    Retorna también la version_datos de antes de leer, para saber después si
+    la base cambió mientras tanto.
+    """
+    version = version_datos()
+    return version, IndicePacientes(db.obtener_todos_pacientes())
+
+
+def _leer_snapshot_paciente(paciente_id: int) -> Tuple[int, Optional[PacienteSnapshot]]:
+    """Como _leer_indice_pacientes, para los datos de un paciente (ver actualizar_pestañas)"""
+    version = version_datos()
+    return version, db.obtener_snapshot_paciente(paciente_id)
+
+
+def _guardar_datos_paciente(paciente: Paciente, deuda: float, motivo_ajuste: Optional[str]) -> Paciente:
+    """
+    Guarda los datos del paciente y, si hay motivo, el ajuste de su deuda:
+    todo o nada. Retorna el paciente como quedó en la base.
+    """
+    with db.transaccion():
+        db.guardar_paciente(paciente)
+        if motivo_ajuste is not None:
+            db.ajustar_deuda(paciente.id, deuda, motivo_ajuste)
+    return db.obtener_paciente(paciente.id)
+
 
 class AplicacionClinica:
     def __init__(self, root):
@@ -17,8 +61,20 @@ class AplicacionClinica:
         self.root.title("Gestión Clínica - Contabilidad")
         self.root.geometry("1200x700")
         
-        # Paciente actualmente seleccionado
+        # Todos los pacientes, para buscar por nombre sin consultar la base
+        self.indice_pacientes = IndicePacientes()
+        self.busqueda_programada = None  # after() pendiente de filtrar_pacientes
+        self.llenado_programado = None   # after() pendiente de llenar_lista_pacientes
+        self.busqueda_actual = 0         # número de la última búsqueda (ver mostrar_lista_pacientes)
+        self.carga_actual = 0            # número de la última lectura de la lista (ver cargar_lista_pacientes)
+        self.lectura_paciente = 0        # número de la última lectura del paciente (ver actualizar_pestañas)
+        
+        # Paciente actualmente seleccionado, y sus datos para las pestañas
         self.paciente_actual: Optional[Paciente] = None
+        self.snapshot: Optional[PacienteSnapshot] = None
+        
+        # Hilo para las operaciones largas (reportes, exportaciones, backups) y las escrituras
+        self.tareas = EjecutorTareas(root)
         
         # Inicializar base de datos
         db.inicializar_base_datos()
@@ -26,8 +82,9 @@ class AplicacionClinica:
         # Crear interfaz
         self.crear_interfaz()
         
-        # Cargar lista de pacientes
-        self.cargar_lista_pacientes()
+        # Cargar lista de pacientes (en segundo plano: la ventana se muestra ya,
+        # con la lista guardada al cerrar la última vez si sigue valiendo)
+        self.cargar_lista_pacientes(usar_guardada=True)
     
     def crear_interfaz(self):
         """Crea la estructura principal de la interfaz"""
@@ -147,10 +204,20 @@ class AplicacionClinica:
         
         self.listbox_pacientes.bind("<<ListboxSelect>>", self.seleccionar_paciente)
         
+        # Se muestra arriba de la lista mientras se leen los pacientes
+        self.indicador_pacientes = IndicadorOcupado(
+            frame_izquierdo, opciones_pack={"fill": tk.X, "padx": 10, "before": frame_lista}
+        )
+        
         # ===== PANEL DERECHO: DETALLES DEL PACIENTE =====
         self.frame_derecho = tk.Frame(contenedor_principal, bg="white")
         self.frame_derecho.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True)
         
+        # Se muestra abajo mientras se lee o se guarda algo del paciente
+        self.indicador_paciente = IndicadorOcupado(
+            self.frame_derecho, opciones_pack={"side": tk.BOTTOM, "fill": tk.X, "padx": 10, "pady": 5}
+        )
+        
         # Mensaje inicial (cuando no hay paciente seleccionado)
         self.label_sin_seleccion = tk.Label(
             self.frame_derecho,
@@ -175,27 +242,183 @@ class AplicacionClinica:
         self.notebook.add(self.tab_pagos, text="💰 Pagos")
         self.notebook.add(self.tab_informes, text="📄 Informes")
         self.notebook.add(self.tab_resumen, text="📊 Resumen")
+        
+        # Las pestañas se dibujan recién cuando se muestran: cada una tiene su
+        # función para dibujarla, y las que quedaron desactualizadas (por
+        # cambiar de paciente o por una modificación) esperan en este conjunto
+        self.funciones_pestañas = {
+            str(self.tab_datos): self.actualizar_tab_datos,
+            str(self.tab_sesiones): self.actualizar_tab_sesiones,
+            str(self.tab_pagos): self.actualizar_tab_pagos,
+            str(self.tab_informes): self.actualizar_tab_informes,
+            str(self.tab_resumen): self.actualizar_tab_resumen,
+        }
+        self.pestañas_pendientes = set()
+        
+        # Widgets de cada pestaña: se crean la primera vez que se muestra y
+        # después se reutilizan, cambiando solo los valores
+        self.vista_datos = None
+        self.vista_sesiones = None
+        self.vista_pagos = None
+        self.vista_informes = None
+        self.vista_resumen = None
+        self.notebook.bind("<<NotebookTabChanged>>", self.al_cambiar_pestaña)
     
     # ===== FUNCIONES DE LA LISTA DE PACIENTES =====
     
-    def cargar_lista_pacientes(self, filtro: str = ""):
-        """Carga la lista de pacientes en el Listbox"""
-        self.listbox_pacientes.delete(0, tk.END)
-        
-        pacientes = db.obtener_todos_pacientes()
+    def cargar_lista_pacientes(self, usar_guardada: bool = False):
+        """
+        Vuelve a leer todos los pacientes de la base y los muestra en el Listbox.
+        La lectura y el armado del índice se hacen en el hilo de tareas: la
+        ventana sigue respondiendo mientras tanto.
+        Con usar_guardada, mientras tanto muestra la lista guardada al cerrar
+        (ver snapshot_pacientes), si la base no cambió desde entonces.
+        Cada lectura lleva un número: si se pide otra antes de que llegue, la
+        anterior se descarta (ver pacientes_cargados).
+        """
+        if usar_guardada:
+            guardados = snapshot_pacientes.leer()
+            if guardados is not None:
+                self.indice_pacientes.cargar(guardados)
+                self.mostrar_lista_pacientes(self.texto_busqueda())
+        
+        self.carga_actual += 1
+        numero = self.carga_actual
+        self.indicador_pacientes.mostrar("Cargando pacientes...")
+        self.tareas.ejecutar(
+            _leer_indice_pacientes,
+            al_terminar=lambda leido: self.pacientes_cargados(numero, *leido),
+            al_fallar=self.error_carga_pacientes, lectura=True
+        )
+    
+    def pacientes_cargados(self, numero: int, version: int, indice: IndicePacientes):
+        """
+        Reemplaza el índice por el recién leído y muestra la lista (con lo que
+        se esté buscando).
+        Si mientras se leía se pidió otra lectura, se descarta: ya va a llegar
+        la nueva. Si la base cambió desde que empezó la lectura (por ejemplo se
+        guardó un paciente, que ya se agregó al índice actual), el índice leído
+        puede no tenerlo: se vuelve a leer.
+        """
+        if numero != self.carga_actual:
+            return
+        if version != version_datos():
+            self.cargar_lista_pacientes()
+            return
         
-        # Filtrar si hay texto de búsqueda
-        if filtro:
-            pacientes = [p for p in pacientes if filtro.lower() in p.nombre.lower()]
+        self.indicador_pacientes.ocultar()
+        self.indice_pacientes = indice
+        self.mostrar_lista_pacientes(self.texto_busqueda())
+    
+    def error_carga_pacientes(self, error: Exception):
+        self.indicador_pacientes.ocultar()
+        messagebox.showerror("Error", f"No se pudo leer la lista de pacientes:\n{error}")
+    
+    def mostrar_lista_pacientes(self, filtro: str = ""):
+        """
+        Muestra en el Listbox los pacientes que coinciden con filtro: primero
+        los que tienen filtro en el nombre (índice en memoria, por nombre) y
+        después los demás que encuentra la búsqueda de la base (por notas, o
+        con errores de tipeo), por relevancia.
+        La búsqueda en la base se hace en el hilo de tareas y sus resultados se
+        agregan al final cuando llegan (ver agregar_encontrados).
+        """
+        pacientes = self.indice_pacientes.buscar(filtro)
+        
+        # Una búsqueda nueva deja sin efecto los resultados de las anteriores
+        self.busqueda_actual += 1
+        if filtro.strip():
+            numero = self.busqueda_actual
+            self.tareas.ejecutar(
+                db.buscar_pacientes, filtro,
+                al_terminar=lambda encontrados: self.agregar_encontrados(numero, encontrados),
+                lectura=True
+            )
         
         # Guardar referencia para acceder después
         self.pacientes_lista = pacientes
         
-        for paciente in pacientes:
-            # Formato: "Nombre (Tipo) - $deuda"
-            deuda_str = f"${paciente.deuda:,.0f}" if paciente.deuda >= 0 else f"-${abs(paciente.deuda):,.0f}"
-            texto = f"{paciente.nombre} ({paciente.tipo.value[:3]}) - {deuda_str}"
-            self.listbox_pacientes.insert(tk.END, texto)
+        if self.llenado_programado is not None:
+            self.root.after_cancel(self.llenado_programado)
+            self.llenado_programado = None
+        self.listbox_pacientes.delete(0, tk.END)
+        self.llenar_lista_pacientes(0)
+    
+    def agregar_encontrados(self, numero: int, encontrados: List[Paciente]):
+        """
+        Agrega al final de la lista los pacientes que encontró la búsqueda en
+        la base y que no estaban. Si desde entonces se buscó otra cosa (o se
+        volvió a mostrar la lista), el resultado ya no corresponde y se descarta.
+        """
+        if numero != self.busqueda_actual:
+            return
+        
+        en_lista = {p.id for p in self.pacientes_lista}
+        nuevos = []
+        for paciente in encontrados:
+            # Usar el objeto del índice: es el que se mantiene al día
+            paciente = self.indice_pacientes.obtener(paciente.id)
+            if paciente is not None and paciente.id not in en_lista:
+                en_lista.add(paciente.id)
+                nuevos.append(paciente)
+        if not nuevos:
+            return
+        
+        self.pacientes_lista.extend(nuevos)
+        if self.llenado_programado is None:
+            # El llenado ya terminó: agregar solo las filas nuevas
+            self.llenar_lista_pacientes(self.listbox_pacientes.size())
+    
+    def llenar_lista_pacientes(self, desde: int):
+        """
+        Agrega al Listbox las filas de pacientes_lista a partir de desde, de a
+        FILAS_POR_TANDA (una sola llamada a Tk por tanda); las siguientes tandas
+        se agregan con after(), así la primera se ve enseguida aunque haya
+        muchos pacientes.
+        """
+        self.llenado_programado = None
+        hasta = desde + FILAS_POR_TANDA
+        tanda = self.pacientes_lista[desde:hasta]
+        self.listbox_pacientes.insert(tk.END, *[self.texto_fila_paciente(p) for p in tanda])
+        
+        # Volver a marcar el paciente seleccionado si quedó en la lista
+        if self.paciente_actual is not None:
+            for indice, paciente in enumerate(tanda, desde):
+                if paciente.id == self.paciente_actual.id:
+                    self.listbox_pacientes.selection_set(indice)
+                    break
+        
+        if hasta < len(self.pacientes_lista):
+            self.llenado_programado = self.root.after(1, self.llenar_lista_pacientes, hasta)
+    
+    def texto_fila_paciente(self, paciente: Paciente) -> str:
+        """Texto de un paciente en la lista, con el formato: Nombre (Tipo) - $deuda"""
+        deuda_str = f"${paciente.deuda:,.0f}" if paciente.deuda >= 0 else f"-${abs(paciente.deuda):,.0f}"
+        return f"{paciente.nombre} ({paciente.tipo.value[:3]}) - {deuda_str}"
+    
+    def actualizar_fila_paciente(self, paciente: Paciente):
+        """Actualiza solo la fila de un paciente en la lista (si está en la lista)"""
+        for indice, anterior in enumerate(self.pacientes_lista):
+            if anterior.id == paciente.id:
+                break
+        else:
+            return
+        
+        self.pacientes_lista[indice] = paciente
+        self.indice_pacientes.guardar(paciente)
+        if indice >= self.listbox_pacientes.size():
+            # La fila todavía no se agregó: llenar_lista_pacientes ya la va a mostrar así
+            return
+        
+        texto = self.texto_fila_paciente(paciente)
+        if self.listbox_pacientes.get(indice) == texto:
+            return
+        
+        seleccionado = indice in self.listbox_pacientes.curselection()
+        self.listbox_pacientes.delete(indice)
+        self.listbox_pacientes.insert(indice, texto)
+        if seleccionado:
+            self.listbox_pacientes.selection_set(indice)
     
     def limpiar_placeholder_busqueda(self, event):
         """Limpia el placeholder del campo de búsqueda"""
@@ -203,10 +426,26 @@ class AplicacionClinica:
             self.entry_busqueda.delete(0, tk.END)
     
     def filtrar_pacientes(self, event):
-        """Filtra la lista de pacientes según el texto de búsqueda"""
+        """
+        Filtra la lista de pacientes según el texto de búsqueda.
+        Espera a que se deje de escribir un momento (150 ms) para no filtrar
+        con cada tecla.
+        """
+        if self.busqueda_programada is not None:
+            self.root.after_cancel(self.busqueda_programada)
+        self.busqueda_programada = self.root.after(150, self.aplicar_filtro_pacientes)
+    
+    def aplicar_filtro_pacientes(self):
+        """Muestra los pacientes que coinciden con el texto de búsqueda actual"""
+        self.busqueda_programada = None
+        self.mostrar_lista_pacientes(self.texto_busqueda())
+    
+    def texto_busqueda(self) -> str:
+        """Texto escrito en el campo de búsqueda ("" si todavía muestra el placeholder)"""
         filtro = self.entry_busqueda.get()
-        if filtro != "🔍 Buscar paciente...":
-            self.cargar_lista_pacientes(filtro)
+        if filtro == "🔍 Buscar paciente...":
+            return ""
+        return filtro
     
     def seleccionar_paciente(self, event):
         """Se ejecuta cuando se selecciona un paciente de la lista"""
@@ -225,44 +464,154 @@ class AplicacionClinica:
         self.actualizar_pestañas()
     
     def actualizar_pestañas(self):
-        """Actualiza el contenido de todas las pestañas con los datos del paciente actual"""
-        self.actualizar_tab_datos()
-        self.actualizar_tab_sesiones()
-        self.actualizar_tab_pagos()
-        self.actualizar_tab_informes()
-        self.actualizar_tab_resumen()
+        """
+        Vuelve a leer los datos del paciente actual y actualiza las pestañas.
+        La lectura se hace en el hilo de lecturas (ver paciente_leido): la
+        ventana sigue respondiendo mientras tanto. Cada lectura lleva un
+        número, como las de la lista: si se elige otro paciente antes de que
+        llegue, se descarta.
+        """
+        self.snapshot = None
+        self.lectura_paciente += 1
+        if self.paciente_actual is None:
+            return
+        
+        # Leer una sola vez todo lo que muestran las pestañas
+        numero = self.lectura_paciente
+        self.indicador_paciente.mostrar("Cargando paciente...")
+        self.tareas.ejecutar(
+            _leer_snapshot_paciente, self.paciente_actual.id,
+            al_terminar=lambda leido: self.paciente_leido(numero, *leido),
+            al_fallar=self.error_lectura_paciente, lectura=True
+        )
     
-    def actualizar_tab_datos(self):
-        """Actualiza la pestaña de datos del paciente"""
-        # Limpiar pestaña
-        for widget in self.tab_datos.winfo_children():
-            widget.destroy()
+    def paciente_leido(self, numero: int, version: int, snapshot: Optional[PacienteSnapshot]):
+        """
+        Muestra los datos recién leídos del paciente. Solo se dibuja la
+        pestaña visible: las demás quedan marcadas como pendientes y se
+        dibujan cuando se las selecciona.
+        Si la base cambió mientras se leía, se vuelve a leer (como en
+        pacientes_cargados).
+        """
+        if numero != self.lectura_paciente:
+            return
+        if version != version_datos():
+            self.actualizar_pestañas()
+            return
         
-        if self.paciente_actual is None:
+        self.indicador_paciente.ocultar()
+        self.snapshot = snapshot
+        if snapshot is not None:
+            self.paciente_actual = snapshot.paciente
+        
+        self.pestañas_pendientes = set(self.funciones_pestañas)
+        self.dibujar_pestaña_visible()
+    
+    def error_lectura_paciente(self, error: Exception):
+        self.indicador_paciente.ocultar()
+        messagebox.showerror("Error", f"No se pudieron leer los datos del paciente:\n{error}")
+    
+    def al_cambiar_pestaña(self, event):
+        """Se ejecuta al seleccionar otra pestaña del notebook"""
+        self.dibujar_pestaña_visible()
+    
+    def dibujar_pestaña_visible(self):
+        """Dibuja la pestaña seleccionada si está pendiente de actualizar"""
+        pestaña = self.notebook.select()
+        if pestaña in self.pestañas_pendientes:
+            self.pestañas_pendientes.discard(pestaña)
+            self.funciones_pestañas[pestaña]()
+    
+    def aplicar_cambios(self, cambios: Optional[Cambios]):
+        """
+        Actualiza la vista después de una modificación con los Cambios que
+        retornó database: arma el snapshot nuevo sin volver a leer el paciente,
+        y solo se redibujan la fila del paciente en la lista y lo que cambió
+        en la pestaña visible.
+        """
+        if cambios is None or cambios.paciente is None:
+            # El registro o el paciente ya no existían: recargar todo
+            self.actualizar_pestañas()
+            self.cargar_lista_pacientes()
             return
         
-        p = self.paciente_actual
+        self.actualizar_fila_paciente(cambios.paciente)
+        if self.paciente_actual is None or self.paciente_actual.id != cambios.paciente.id:
+            # Mientras se guardaba se eligió otro paciente
+            return
+        if self.snapshot is None:
+            # Todavía se está leyendo el paciente: leerlo de nuevo, ya con el cambio
+            self.actualizar_pestañas()
+            return
+        
+        self.snapshot = db.aplicar_cambios_al_snapshot(self.snapshot, cambios)
+        self.paciente_actual = self.snapshot.paciente
+        
+        self.pestañas_pendientes = set(self.funciones_pestañas)
+        self.dibujar_pestaña_visible()
+    
+    def guardar(self, funcion: Callable, *args, al_terminar: Callable,
+                indicador: Optional[IndicadorOcupado] = None):
+        """
+        Ejecuta una escritura (funcion(*args), de database) en el hilo de
+        tareas y llama a al_terminar(resultado) en el hilo de Tk: la ventana
+        no se congela mientras se guarda. Las escrituras corren en el orden en
+        que se pidieron, después de las tareas que ya estaban esperando.
+        Mientras tanto se muestra indicador (el de un diálogo, que deshabilita
+        su botón de guardar) o, si no se indica, el del panel del paciente.
+        Si falla se muestra el error y el diálogo queda abierto para corregir.
+        """
+        indicador = indicador or self.indicador_paciente
+        indicador.mostrar("Guardando...")
+        
+        def ocultar():
+            # Un diálogo se puede cerrar mientras se guarda
+            if indicador.winfo_exists():
+                indicador.ocultar()
+        
+        def guardado(resultado):
+            ocultar()
+            al_terminar(resultado)
+        
+        def error(e):
+            ocultar()
+            ventana = indicador.winfo_toplevel() if indicador.winfo_exists() else self.root
+            if isinstance(e, db.PeriodoCerradoError):
+                messagebox.showerror("Mes cerrado", str(e), parent=ventana)
+            elif isinstance(e, (ValueError, sqlite3.Error)):
+                messagebox.showerror("Error", f"No se pudo guardar: {e}", parent=ventana)
+            else:
+                raise e
+        
+        self.tareas.ejecutar(funcion, *args, al_terminar=guardado, al_fallar=error)
+    
+    def construir_tab_datos(self):
+        """
+        Crea los widgets de la pestaña de datos. Se hace una sola vez: después
+        actualizar_tab_datos solo les cambia los valores.
+        """
+        v = self.vista_datos = {}
         
         # Título
-        tk.Label(
+        v["nombre"] = tk.Label(
             self.tab_datos,
-            text=p.nombre,
             font=("Tahoma", 18, "bold"),
             bg="white"
-        ).pack(pady=15)
+        )
+        v["nombre"].pack(pady=15)
         
         # Frame con información principal
         info_frame = tk.Frame(self.tab_datos, bg="#ecf0f1", relief=tk.SOLID, borderwidth=1)
         info_frame.pack(pady=10, padx=30, fill=tk.X)
         
         campos = [
-            ("Tipo de paciente:", p.tipo.value),
-            ("Costo por sesión:", f"${p.costo_sesion:,.0f}"),
-            ("Arancel social:", "✓ Sí" if p.arancel_social else "✗ No"),
-            ("Fecha de registro:", p.fecha_creacion.strftime("%d/%m/%Y")),
+            ("tipo", "Tipo de paciente:"),
+            ("costo", "Costo por sesión:"),
+            ("arancel", "Arancel social:"),
+            ("fecha", "Fecha de registro:"),
         ]
         
-        for i, (label, valor) in enumerate(campos):
+        for clave, label in campos:
             frame_fila = tk.Frame(info_frame, bg="#ecf0f1")
             frame_fila.pack(fill=tk.X, padx=15, pady=8)
             
@@ -276,104 +625,84 @@ class AplicacionClinica:
                 width=25
             ).pack(side=tk.LEFT)
             
-            tk.Label(
+            v[clave] = tk.Label(
                 frame_fila,
-                text=valor,
                 font=("Tahoma", 14),
                 bg="#ecf0f1",
                 fg="#34495e"
-            ).pack(side=tk.RIGHT, padx=10)
+            )
+            v[clave].pack(side=tk.RIGHT, padx=10)
         
         # Frame con deuda (más destacado)
-        deuda_color = "#e74c3c" if p.deuda > 0 else "#27ae60"
-        deuda_frame = tk.Frame(self.tab_datos, bg=deuda_color, relief=tk.SOLID, borderwidth=2)
-        deuda_frame.pack(pady=15, padx=30, fill=tk.X)
+        v["deuda_frame"] = tk.Frame(self.tab_datos, relief=tk.SOLID, borderwidth=2)
+        v["deuda_frame"].pack(pady=15, padx=30, fill=tk.X)
         
-        tk.Label(
-            deuda_frame,
+        v["deuda_titulo"] = tk.Label(
+            v["deuda_frame"],
             text="DEUDA ACTUAL",
             font=("Tahoma", 15, "bold"),
-            bg=deuda_color,
             fg="white"
-        ).pack(pady=(5, 0))
+        )
+        v["deuda_titulo"].pack(pady=(5, 0))
         
-        deuda_texto = f"${p.deuda:,.0f}" if p.deuda >= 0 else f"${abs(p.deuda):,.0f} (Saldo a favor)"
-        tk.Label(
-            deuda_frame,
-            text=deuda_texto,
+        v["deuda"] = tk.Label(
+            v["deuda_frame"],
             font=("Tahoma", 18, "bold"),
-            bg=deuda_color,
             fg="white"
-        ).pack(pady=(0, 10))
-        
-        # Resumen de sesiones, pagos e informes
-        sesiones = db.obtener_sesiones_paciente(p.id)
-        pagos = db.obtener_pagos_paciente(p.id)
-        informes = db.obtener_informes_paciente(p.id)
-        
-        sesiones_paga = len([s for s in sesiones if s.estado == EstadoSesion.PAGA])
-        sesiones_pendiente = len([s for s in sesiones if s.estado == EstadoSesion.PENDIENTE])
-        informes_pagados = len([i for i in informes if i.estado_pago == EstadoPagoInforme.PAGADO])
+        )
+        v["deuda"].pack(pady=(0, 10))
         
-        # Frame con estadísticas
+        # Frame con estadísticas de sesiones, pagos e informes
         stats_frame = tk.Frame(self.tab_datos, bg="white")
         stats_frame.pack(pady=10, padx=30, fill=tk.X)
         
-        stats = [
-            (f"Sesiones: {len(sesiones)}", f"✓ {sesiones_paga} | ⏳ {sesiones_pendiente}"),
-            (f"Pagos registrados: {len(pagos)}", f"Total: ${sum(p.monto for p in pagos):,.0f}"),
-            (f"Informes: {len(informes)}", f"✓ {informes_pagados} | ⏳ {len(informes) - informes_pagados}"),
-        ]
-        
-        for label, valor in stats:
+        for clave in ("sesiones", "pagos", "informes"):
             frame_stat = tk.Frame(stats_frame, bg="white")
             frame_stat.pack(fill=tk.X, pady=5)
             
-            tk.Label(
+            v[f"{clave}_label"] = tk.Label(
                 frame_stat,
-                text=label,
                 font=("Tahoma", 14),
                 bg="white",
                 fg="#7f8c8d",
                 anchor="w"
-            ).pack(side=tk.LEFT)
+            )
+            v[f"{clave}_label"].pack(side=tk.LEFT)
             
-            tk.Label(
+            v[f"{clave}_valor"] = tk.Label(
                 frame_stat,
-                text=valor,
                 font=("Tahoma", 16, "bold"),
                 bg="white",
                 fg="#2c3e50"
-            ).pack(side=tk.RIGHT)
+            )
+            v[f"{clave}_valor"].pack(side=tk.RIGHT)
         
-        # Notas (si existen)
-        if p.notas:
-            tk.Label(
-                self.tab_datos,
-                text="Notas:",
-                font=("Tahoma", 14, "bold"),
-                bg="white"
-            ).pack(pady=(15, 5), anchor="w", padx=30)
-            
-            notas_frame = tk.Frame(self.tab_datos, bg="#fffacd", relief=tk.SOLID, borderwidth=1)
-            notas_frame.pack(padx=30, pady=(0, 15), fill=tk.BOTH, expand=False)
-            
-            tk.Label(
-                notas_frame,
-                text=p.notas,
-                font=("Tahoma", 14),
-                bg="#fffacd",
-                fg="#2c3e50",
-                wraplength=600,
-                justify=tk.LEFT
-            ).pack(padx=10, pady=10)
+        # Notas (se muestran solo si existen)
+        v["notas_titulo"] = tk.Label(
+            self.tab_datos,
+            text="Notas:",
+            font=("Tahoma", 14, "bold"),
+            bg="white"
+        )
+        
+        v["notas_frame"] = tk.Frame(self.tab_datos, bg="#fffacd", relief=tk.SOLID, borderwidth=1)
+        
+        v["notas"] = tk.Label(
+            v["notas_frame"],
+            font=("Tahoma", 14),
+            bg="#fffacd",
+            fg="#2c3e50",
+            wraplength=600,
+            justify=tk.LEFT
+        )
+        v["notas"].pack(padx=10, pady=10)
         
         # Botones de acción
-        frame_botones = tk.Frame(self.tab_datos, bg="white")
-        frame_botones.pack(pady=20)
+        v["botones"] = tk.Frame(self.tab_datos, bg="white")
+        v["botones"].pack(pady=20)
         
         tk.Button(
-            frame_botones,
+            v["botones"],
             text="✏️ Editar",
             command=self.editar_paciente_actual,
             bg="#3498db",
@@ -384,7 +713,7 @@ class AplicacionClinica:
         ).pack(side=tk.LEFT, padx=5)
         
         tk.Button(
-            frame_botones,
+            v["botones"],
             text="🗑️ Eliminar",
             command=self.eliminar_paciente_actual,
             bg="#e74c3c",
@@ -394,6 +723,45 @@ class AplicacionClinica:
             pady=5
         ).pack(side=tk.LEFT, padx=5)
     
+    def actualizar_tab_datos(self):
+        """Actualiza la pestaña de datos del paciente (solo cambia los widgets cuyo valor cambió)"""
+        if self.snapshot is None:
+            return
+        
+        if self.vista_datos is None:
+            self.construir_tab_datos()
+        
+        v = self.vista_datos
+        p = self.paciente_actual
+        snapshot = self.snapshot
+        
+        configurar(v["nombre"], text=p.nombre)
+        configurar(v["tipo"], text=p.tipo.value)
+        configurar(v["costo"], text=f"${p.costo_sesion:,.0f}")
+        configurar(v["arancel"], text="✓ Sí" if p.arancel_social else "✗ No")
+        configurar(v["fecha"], text=p.fecha_creacion.strftime("%d/%m/%Y"))
+        
+        # Deuda
+        deuda_color = "#e74c3c" if p.deuda > 0 else "#27ae60"
+        deuda_texto = f"${p.deuda:,.0f}" if p.deuda >= 0 else f"${abs(p.deuda):,.0f} (Saldo a favor)"
+        configurar(v["deuda_frame"], bg=deuda_color)
+        configurar(v["deuda_titulo"], bg=deuda_color)
+        configurar(v["deuda"], text=deuda_texto, bg=deuda_color)
+        
+        # Resumen de sesiones, pagos e informes
+        informes_pendientes = len(snapshot.informes) - snapshot.informes_pagados
+        configurar(v["sesiones_label"], text=f"Sesiones: {len(snapshot.sesiones)}")
+        configurar(v["sesiones_valor"], text=f"✓ {snapshot.sesiones_pagas} | ⏳ {snapshot.sesiones_pendientes}")
+        configurar(v["pagos_label"], text=f"Pagos registrados: {len(snapshot.pagos)}")
+        configurar(v["pagos_valor"], text=f"Total: ${snapshot.monto_pagado:,.0f}")
+        configurar(v["informes_label"], text=f"Informes: {len(snapshot.informes)}")
+        configurar(v["informes_valor"], text=f"✓ {snapshot.informes_pagados} | ⏳ {informes_pendientes}")
+        
+        # Notas (si existen)
+        configurar(v["notas"], text=p.notas)
+        mostrar_u_ocultar(v["notas_titulo"], bool(p.notas), pady=(15, 5), anchor="w", padx=30, before=v["botones"])
+        mostrar_u_ocultar(v["notas_frame"], bool(p.notas), padx=30, pady=(0, 15), fill=tk.BOTH, expand=False, before=v["botones"])
+    
     # ===== DIÁLOGOS Y ACCIONES =====
     
     def abrir_dialogo_nuevo_paciente(self):
@@ -501,11 +869,7 @@ class AplicacionClinica:
                         return
                 
                 # Mapear el tipo de paciente
-                tipo_map = {
-                    "Estándar": TipoPaciente.ESTANDAR,
-                    "Mensual": TipoPaciente.MENSUAL,
-                    "Diagnóstico": TipoPaciente.DIAGNOSTICO
-                }
+                tipo_map = POR_VALOR[TipoPaciente]
                 tipo_paciente = tipo_map[tipo_paciente_str]
                 
                 # Crear paciente
@@ -520,22 +884,23 @@ class AplicacionClinica:
                     fecha_creacion=datetime.now()
                 )
                 
-                # Guardar en BD
-                db.guardar_paciente(paciente)
-                
-                # Recargar lista
-                self.cargar_lista_pacientes()
-                
-                # Mostrar mensaje de éxito
-                messagebox.showinfo("Éxito", f"Paciente {nombre} creado correctamente")
+                def guardado(_paciente_id):
+                    # Agregarlo a la lista (guardar_paciente ya le puso el id)
+                    self.indice_pacientes.guardar(paciente)
+                    self.mostrar_lista_pacientes(self.texto_busqueda())
+                    
+                    # Mostrar mensaje de éxito y cerrar el diálogo
+                    messagebox.showinfo("Éxito", f"Paciente {nombre} creado correctamente")
+                    if dialogo.winfo_exists():
+                        dialogo.destroy()
                 
-                # Cerrar diálogo
-                dialogo.destroy()
+                # Guardar en BD
+                self.guardar(db.guardar_paciente, paciente, al_terminar=guardado, indicador=indicador)
                 
             except Exception as e:
                 messagebox.showerror("Error", f"Error al guardar paciente: {e}")
         
-        tk.Button(
+        btn_guardar = tk.Button(
             frame_botones,
             text="✓ Guardar",
             command=guardar_paciente,
@@ -544,7 +909,8 @@ class AplicacionClinica:
             font=("Tahoma", 14, "bold"),
             padx=20,
             pady=5
-        ).pack(side=tk.LEFT, padx=5)
+        )
+        btn_guardar.pack(side=tk.LEFT, padx=5)
         
         tk.Button(
             frame_botones,
@@ -556,6 +922,9 @@ class AplicacionClinica:
             padx=20,
             pady=5
         ).pack(side=tk.LEFT, padx=5)
+        
+        # Se muestra mientras se guarda (ver guardar)
+        indicador = IndicadorOcupado(frame_botones, botones=[btn_guardar])
     
     def editar_paciente_actual(self):
         """Edita el paciente seleccionado"""
@@ -615,7 +984,7 @@ class AplicacionClinica:
         )
         check_arancel.grid(row=3, column=1, sticky="w", pady=10)
         
-        # Deuda actual (editable)
+        # Deuda actual (si se cambia se pide el motivo, ver db.ajustar_deuda)
         tk.Label(frame_campos, text="Deuda:", font=("Tahoma", 14, "bold")).grid(row=4, column=0, sticky="w", pady=10)
         entry_deuda = tk.Entry(frame_campos, width=15, font=("Tahoma", 14))
         entry_deuda.insert(0, str(p.deuda))
@@ -660,39 +1029,57 @@ class AplicacionClinica:
                     messagebox.showerror("Error", "La deuda debe ser un número válido")
                     return
                 
+                # La deuda la mantienen los triggers: cambiarla es un ajuste
+                # manual, que queda registrado con su motivo
+                motivo_ajuste = None
+                if a_centavos(deuda) != a_centavos(self.paciente_actual.deuda):
+                    motivo_ajuste = simpledialog.askstring(
+                        "Ajuste de deuda",
+                        f"La deuda cambia de ${self.paciente_actual.deuda:,.2f} a ${deuda:,.2f}.\n"
+                        "¿Por qué se ajusta?",
+                        parent=dialogo
+                    )
+                    if not motivo_ajuste or not motivo_ajuste.strip():
+                        messagebox.showerror("Error", "Para cambiar la deuda hay que indicar el motivo", parent=dialogo)
+                        return
+                
                 # Mapear el tipo de paciente
-                tipo_map = {
-                    "Estándar": TipoPaciente.ESTANDAR,
-                    "Mensual": TipoPaciente.MENSUAL,
-                    "Diagnóstico": TipoPaciente.DIAGNOSTICO
-                }
+                tipo_map = POR_VALOR[TipoPaciente]
                 tipo_paciente = tipo_map[tipo_paciente_str]
                 
-                # Actualizar paciente
-                self.paciente_actual.nombre = nombre
-                self.paciente_actual.tipo = tipo_paciente
-                self.paciente_actual.costo_sesion = costo
-                self.paciente_actual.deuda = deuda
-                self.paciente_actual.arancel_social = var_arancel.get()
-                self.paciente_actual.notas = text_notas.get("1.0", tk.END).strip()
-                
-                # Guardar en BD
-                db.guardar_paciente(self.paciente_actual)
-                
-                # Recargar lista y actualizar vista
-                self.cargar_lista_pacientes()
-                self.actualizar_pestañas()
-                
-                # Mostrar mensaje de éxito
-                messagebox.showinfo("Éxito", f"Paciente {nombre} actualizado correctamente")
+                # Guardar una copia: paciente_actual es el del snapshot en caché
+                # y no se modifica (si falla el guardado queda como estaba)
+                paciente = replace(
+                    self.paciente_actual,
+                    nombre=nombre,
+                    tipo=tipo_paciente,
+                    costo_sesion=costo,
+                    arancel_social=var_arancel.get(),
+                    notas=text_notas.get("1.0", tk.END).strip()
+                )
                 
-                # Cerrar diálogo
-                dialogo.destroy()
+                def guardado(actualizado: Paciente):
+                    # Actualizar lista (el nombre pudo cambiar de lugar) y vista
+                    self.indice_pacientes.guardar(actualizado)
+                    self.mostrar_lista_pacientes(self.texto_busqueda())
+                    if self.paciente_actual is not None and self.paciente_actual.id == actualizado.id:
+                        self.actualizar_pestañas()
+                    
+                    # Mostrar mensaje de éxito y cerrar el diálogo
+                    messagebox.showinfo("Éxito", f"Paciente {nombre} actualizado correctamente")
+                    if dialogo.winfo_exists():
+                        dialogo.destroy()
+                
+                # Guardar en BD (los datos y el ajuste, todo o nada)
+                self.guardar(
+                    _guardar_datos_paciente, paciente, deuda, motivo_ajuste,
+                    al_terminar=guardado, indicador=indicador
+                )
                 
             except Exception as e:
                 messagebox.showerror("Error", f"Error al guardar cambios: {e}")
         
-        tk.Button(
+        btn_guardar = tk.Button(
             frame_botones,
             text="✓ Guardar",
             command=guardar_cambios,
@@ -701,7 +1088,8 @@ class AplicacionClinica:
             font=("Tahoma", 14, "bold"),
             padx=20,
             pady=5
-        ).pack(side=tk.LEFT, padx=5)
+        )
+        btn_guardar.pack(side=tk.LEFT, padx=5)
         
         tk.Button(
             frame_botones,
@@ -713,6 +1101,9 @@ class AplicacionClinica:
             padx=20,
             pady=5
         ).pack(side=tk.LEFT, padx=5)
+        
+        # Se muestra mientras se guarda (ver guardar)
+        indicador = IndicadorOcupado(frame_botones, botones=[btn_guardar])
     
     def eliminar_paciente_actual(self):
         """Elimina el paciente seleccionado con confirmación"""
@@ -729,15 +1120,24 @@ class AplicacionClinica:
             "Esta acción NO se puede deshacer."
         )
         
-        if respuesta:
-            db.eliminar_paciente(self.paciente_actual.id)
-            messagebox.showinfo("Eliminado", f"{self.paciente_actual.nombre} fue eliminado correctamente")
+        if not respuesta:
+            return
+        
+        paciente = self.paciente_actual
+        
+        def eliminado(_resultado):
+            messagebox.showinfo("Eliminado", f"{paciente.nombre} fue eliminado correctamente")
             
-            # Limpiar selección y recargar lista
-            self.paciente_actual = None
-            self.notebook.pack_forget()
-            self.label_sin_seleccion.pack(expand=True)
-            self.cargar_lista_pacientes()
+            # Sacarlo de la lista y, si sigue seleccionado, limpiar la selección
+            self.indice_pacientes.quitar(paciente.id)
+            if self.paciente_actual is not None and self.paciente_actual.id == paciente.id:
+                self.paciente_actual = None
+                self.snapshot = None
+                self.notebook.pack_forget()
+                self.label_sin_seleccion.pack(expand=True)
+            self.mostrar_lista_pacientes(self.texto_busqueda())
+        
+        self.guardar(db.eliminar_paciente, paciente.id, al_terminar=eliminado)
     
     def mostrar_reporte_mensual(self):
         """Muestra el reporte mensual mejorado con desglose por tipo de paciente"""
@@ -746,7 +1146,7 @@ class AplicacionClinica:
         # Crear ventana de reporte
         ventana_reporte = tk.Toplevel(self.root)
         ventana_reporte.title("Reporte Mensual")
-        ventana_reporte.geometry("900x750")
+        ventana_reporte.geometry("1100x750")
         
         # Título
         tk.Label(
@@ -800,16 +1200,37 @@ class AplicacionClinica:
         combo_año.pack(side=tk.LEFT, padx=5)
         
         def actualizar_reporte():
-            """Actualiza el reporte con el mes/año seleccionado"""
+            """Calcula en segundo plano el reporte del mes/año seleccionado"""
             mes = combo_mes.current() + 1
             año = int(combo_año.get())
             
+            indicador.mostrar("Calculando...")
+            self.tareas.ejecutar(
+                db.obtener_estadisticas_mensuales, mes, año,
+                al_terminar=mostrar_reporte, al_fallar=error_reporte, ventana=ventana_reporte
+            )
+        
+        def error_reporte(error):
+            indicador.ocultar()
+            messagebox.showerror("Error", f"Error al calcular el reporte:\n{error}", parent=ventana_reporte)
+        
+        def mostrar_reporte(stats):
+            """Dibuja el reporte con las estadísticas calculadas"""
+            indicador.ocultar()
+            
             # Limpiar frame_reporte
             for widget in frame_reporte.winfo_children():
                 widget.destroy()
             
-            # Obtener estadísticas del mes seleccionado
-            stats = db.obtener_estadisticas_mensuales(mes, año)
+            if stats["fecha_cierre"] is not None:
+                tk.Label(
+                    frame_reporte,
+                    text=f"🔒 Mes cerrado el {stats['fecha_cierre'].strftime('%d/%m/%Y')} "
+                         "(la deuda es la que había al cerrar)",
+                    font=("Tahoma", 13),
+                    bg="#f8f9fa",
+                    fg="#7f8c8d"
+                ).pack(pady=(10, 0), anchor="w", padx=20)
             
             # ===== SECCIÓN 1: INGRESOS DEL MES =====
             tk.Label(
@@ -986,7 +1407,7 @@ class AplicacionClinica:
             actualizar_reporte.stats_actual = stats
         
         # Botón para actualizar
-        tk.Button(
+        btn_actualizar = tk.Button(
             frame_selector,
             text="🔄 Actualizar",
             command=actualizar_reporte,
@@ -994,7 +1415,8 @@ class AplicacionClinica:
             fg="white",
             font=("Tahoma", 14),
             padx=15
-        ).pack(side=tk.LEFT, padx=20)
+        )
+        btn_actualizar.pack(side=tk.LEFT, padx=20)
         
         # Botón para exportar PDF
         def exportar_pdf():
@@ -1011,16 +1433,26 @@ class AplicacionClinica:
                 initialfile=f"Reporte_{combo_mes.get()}_{combo_año.get()}.pdf"
             )
             
-            if ruta:
-                try:
-                    mes = combo_mes.current() + 1
-                    año = int(combo_año.get())
-                    db.exportar_reporte_pdf(actualizar_reporte.stats_actual, mes, año, ruta)
-                    messagebox.showinfo("Éxito", f"PDF exportado a:\n{ruta}")
-                except Exception as e:
-                    messagebox.showerror("Error", f"Error al exportar PDF:\n{e}")
+            if not ruta:
+                return
+            
+            def exportado(_resultado):
+                indicador.ocultar()
+                messagebox.showinfo("Éxito", f"PDF exportado a:\n{ruta}", parent=ventana_reporte)
+            
+            def error(e):
+                indicador.ocultar()
+                messagebox.showerror("Error", f"Error al exportar PDF:\n{e}", parent=ventana_reporte)
+            
+            mes = combo_mes.current() + 1
+            año = int(combo_año.get())
+            indicador.mostrar("Exportando PDF...")
+            self.tareas.ejecutar(
+                db.exportar_reporte_pdf, actualizar_reporte.stats_actual, mes, año, ruta,
+                al_terminar=exportado, al_fallar=error, ventana=ventana_reporte
+            )
         
-        tk.Button(
+        btn_exportar = tk.Button(
             frame_selector,
             text="📄 Exportar PDF",
             command=exportar_pdf,
@@ -1028,7 +1460,61 @@ class AplicacionClinica:
             fg="white",
             font=("Tahoma", 14),
             padx=15
-        ).pack(side=tk.LEFT, padx=5)
+        )
+        btn_exportar.pack(side=tk.LEFT, padx=5)
+        
+        # Botón para cerrar el mes (congela el reporte y bloquea cambios en ese mes)
+        def cerrar_mes():
+            """Cierra el mes seleccionado después de confirmar"""
+            mes = combo_mes.current() + 1
+            año = int(combo_año.get())
+            
+            respuesta = messagebox.askyesno(
+                "Cerrar mes",
+                f"¿Cerrar {combo_mes.get()} {año}?\n\n"
+                "Se guardará el reporte tal como está ahora y ya no se podrán\n"
+                "agregar, eliminar ni cambiar montos o fechas de sesiones,\n"
+                "pagos e informes de ese mes.\n\n"
+                "Esta acción NO se puede deshacer."
+            )
+            if not respuesta:
+                return
+            
+            def cerrado(_stats):
+                indicador.ocultar()
+                messagebox.showinfo("Mes cerrado", f"{nombre_mes} {año} fue cerrado correctamente",
+                                    parent=ventana_reporte)
+                actualizar_reporte()
+            
+            def error(e):
+                indicador.ocultar()
+                if isinstance(e, ValueError):
+                    messagebox.showerror("Error", str(e), parent=ventana_reporte)
+                elif isinstance(e, sqlite3.Error):
+                    messagebox.showerror("Error", f"No se pudo cerrar el mes: {e}", parent=ventana_reporte)
+                else:
+                    raise e
+            
+            nombre_mes = combo_mes.get()
+            indicador.mostrar("Cerrando mes...")
+            self.tareas.ejecutar(
+                db.cerrar_mes, mes, año,
+                al_terminar=cerrado, al_fallar=error, ventana=ventana_reporte
+            )
+        
+        btn_cerrar_mes = tk.Button(
+            frame_selector,
+            text="🔒 Cerrar mes",
+            command=cerrar_mes,
+            bg="#7f8c8d",
+            fg="white",
+            font=("Tahoma", 14),
+            padx=15
+        )
+        btn_cerrar_mes.pack(side=tk.LEFT, padx=5)
+        
+        # Se muestra mientras se calcula, se exporta o se cierra el mes
+        indicador = IndicadorOcupado(frame_selector, botones=[btn_actualizar, btn_exportar, btn_cerrar_mes])
         
         # Frame con scroll para el reporte
         frame_scroll = tk.Frame(ventana_reporte)
@@ -1051,347 +1537,95 @@ class AplicacionClinica:
         
         # Cargar reporte inicial
         actualizar_reporte()
+    
+    # ===== PESTAÑAS CON LISTAS (SESIONES, PAGOS, INFORMES) =====
+    
+    def construir_tab_lista(self, tab, titulo: str, texto_boton: str, comando_boton,
+                            texto_vacio: str, crear_tarjeta, obtener_items) -> dict:
+        """
+        Crea (una sola vez) los widgets de una pestaña con lista de tarjetas:
+        el encabezado con el botón para agregar, el mensaje de lista vacía y la
+        lista. obtener_items() retorna la lista de objetos a mostrar.
+        """
+        v = {"paciente_id": None}
+        
+        # Frame superior con botón para agregar
+        frame_superior = tk.Frame(tab, bg="white")
+        frame_superior.pack(fill=tk.X, padx=20, pady=10)
         
-        # ===== SECCIÓN 1: INGRESOS DEL MES =====
         tk.Label(
-            frame_reporte,
-            text="💰 INGRESOS DEL MES",
-            font=("Tahoma", 16, "bold"),
-            bg="#f8f9fa",
-            fg="#27ae60"
-        ).pack(pady=(15, 10), anchor="w", padx=20)
-        
-        # Frame de ingresos
-        frame_ingresos = tk.Frame(frame_reporte, bg="white", relief=tk.SOLID, borderwidth=1)
-        frame_ingresos.pack(fill=tk.X, padx=20, pady=5)
-        
-        ingresos_data = [
-            ("Total cobrado:", f"${stats['total_cobrado']:,.2f}", "#27ae60"),
-            ("  └─ Pacientes Estándar:", f"${stats['cobrado_estandar']:,.2f}", "#3498db"),
-            ("  └─ Pacientes Mensuales:", f"${stats['cobrado_mensual']:,.2f}", "#9b59b6"),
-            ("  └─ Diagnósticos:", f"${stats['cobrado_diagnostico']:,.2f}", "#e74c3c"),
-            ("Informes (por cobrar):", f"${stats['informes_total']:,.2f}", "#f39c12"),
-        ]
+            frame_superior,
+            text=titulo,
+            font=("Tahoma", 18, "bold"),
+            bg="white"
+        ).pack(side=tk.LEFT)
         
-        for label, valor, color in ingresos_data:
-            frame_fila = tk.Frame(frame_ingresos, bg="white")
-            frame_fila.pack(fill=tk.X, padx=15, pady=5)
-            
-            tk.Label(
-                frame_fila,
-                text=label,
-                font=("Tahoma", 14),
-                bg="white",
-                fg="#2c3e50",
-                anchor="w",
-                width=35
-            ).pack(side=tk.LEFT)
-            
-            tk.Label(
-                frame_fila,
-                text=valor,
-                font=("Tahoma", 14, "bold"),
-                bg="white",
-                fg=color
-            ).pack(side=tk.RIGHT, padx=10)
+        tk.Button(
+            frame_superior,
+            text=texto_boton,
+            command=comando_boton,
+            bg="#27ae60",
+            fg="white",
+            font=("Tahoma", 14, "bold"),
+            padx=15,
+            pady=5
+        ).pack(side=tk.RIGHT)
         
-        # Separador
-        ttk.Separator(frame_reporte, orient='horizontal').pack(fill=tk.X, pady=15, padx=20)
+        v["vacio"] = tk.Label(
+            tab,
+            text=texto_vacio,
+            font=("Tahoma", 16),
+            fg="#95a5a6",
+            bg="white"
+        )
         
-        # ===== SECCIÓN 2: DEUDA ACUMULADA =====
-        tk.Label(
-            frame_reporte,
-            text="📊 DEUDA ACUMULADA",
-            font=("Tahoma", 16, "bold"),
-            bg="#f8f9fa",
-            fg="#e74c3c"
-        ).pack(pady=(15, 10), anchor="w", padx=20)
-        
-        # Frame de deuda
-        frame_deuda = tk.Frame(frame_reporte, bg="white", relief=tk.SOLID, borderwidth=1)
-        frame_deuda.pack(fill=tk.X, padx=20, pady=5)
-        
-        deuda_data = [
-            ("Total deuda:", f"${stats['deuda_total']:,.2f}", "#e74c3c"),
-            ("  └─ Pacientes Estándar:", f"${stats['deuda_estandar']:,.2f}", "#3498db"),
-            ("  └─ Pacientes Mensuales:", f"${stats['deuda_mensual']:,.2f}", "#9b59b6"),
-            ("  └─ Diagnósticos:", f"${stats['deuda_diagnostico']:,.2f}", "#e74c3c"),
-        ]
+        # Lista con scroll: solo se crean las tarjetas que se ven
+        v["lista"] = ListaVirtual(
+            tab,
+            crear_tarjeta=crear_tarjeta,
+            cargar=lambda desde, cantidad: obtener_items()[desde:desde + cantidad],
+            total=0
+        )
+        return v
+    
+    def actualizar_tab_lista(self, v: dict, total: int):
+        """Muestra la lista (o el mensaje de lista vacía) con los datos actuales"""
+        # Con otro paciente se vuelve al principio de la lista
+        otro_paciente = v["paciente_id"] != self.paciente_actual.id
+        v["paciente_id"] = self.paciente_actual.id
+        
+        v["lista"].actualizar(total, al_principio=otro_paciente)
+        mostrar_u_ocultar(v["vacio"], total == 0, expand=True)
+        mostrar_u_ocultar(v["lista"], total > 0, fill=tk.BOTH, expand=True, padx=20, pady=10)
+    
+    # ===== PESTAÑA DE SESIONES =====
+    
+    def actualizar_tab_sesiones(self):
+        """Actualiza la pestaña de sesiones del paciente"""
+        if self.snapshot is None:
+            return
         
-        for label, valor, color in deuda_data:
-            frame_fila = tk.Frame(frame_deuda, bg="white")
-            frame_fila.pack(fill=tk.X, padx=15, pady=5)
-            
-            tk.Label(
-                frame_fila,
-                text=label,
-                font=("Tahoma", 14),
-                bg="white",
-                fg="#2c3e50",
-                anchor="w",
-                width=35
-            ).pack(side=tk.LEFT)
-            
-            tk.Label(
-                frame_fila,
-                text=valor,
-                font=("Tahoma", 14, "bold"),
-                bg="white",
-                fg=color
-            ).pack(side=tk.RIGHT, padx=10)
-        
-        # Separador
-        ttk.Separator(frame_reporte, orient='horizontal').pack(fill=tk.X, pady=15, padx=20)
-        
-        # ===== SECCIÓN 3: RESUMEN POR PACIENTE =====
-        if stats["detalle_pacientes"]:
-            tk.Label(
-                frame_reporte,
-                text="👥 RESUMEN POR PACIENTE",
-                font=("Tahoma", 16, "bold"),
-                bg="#f8f9fa",
-                fg="#2c3e50"
-            ).pack(pady=(15, 10), anchor="w", padx=20)
-            
-            for pac in stats["detalle_pacientes"]:
-                frame_pac = tk.Frame(frame_reporte, bg="#ecf0f1", relief=tk.SOLID, borderwidth=1)
-                frame_pac.pack(fill=tk.X, pady=5, padx=20)
-                
-                # Nombre y tipo
-                frame_header = tk.Frame(frame_pac, bg="#ecf0f1")
-                frame_header.pack(fill=tk.X, padx=10, pady=(8, 0))
-                
-                tk.Label(
-                    frame_header,
-                    text=pac["nombre"],
-                    font=("Tahoma", 14, "bold"),
-                    bg="#ecf0f1",
-                    fg="#2c3e50"
-                ).pack(side=tk.LEFT)
-                
-                tipo_color = {
-                    "Estándar": "#3498db",
-                    "Mensual": "#9b59b6",
-                    "Diagnóstico": "#e74c3c"
-                }.get(pac["tipo"], "#95a5a6")
-                
-                tk.Label(
-                    frame_header,
-                    text=f"({pac['tipo']})",
-                    font=("Tahoma", 13),
-                    bg="#ecf0f1",
-                    fg=tipo_color
-                ).pack(side=tk.LEFT, padx=5)
-                
-                if pac["arancel_social"]:
-                    tk.Label(
-                        frame_header,
-                        text="🏥 Arancel Social",
-                        font=("Tahoma", 12),
-                        bg="#ecf0f1",
-                        fg="#f39c12"
-                    ).pack(side=tk.LEFT, padx=5)
-                
-                # Cobrado y deuda
-                frame_datos = tk.Frame(frame_pac, bg="#ecf0f1")
-                frame_datos.pack(fill=tk.X, padx=20, pady=5)
-                
-                tk.Label(
-                    frame_datos,
-                    text=f"Cobrado: ${pac['cobrado']:,.2f}",
-                    font=("Tahoma", 13),
-                    bg="#ecf0f1",
-                    fg="#27ae60"
-                ).pack(side=tk.LEFT)
-                
-                tk.Label(
-                    frame_datos,
-                    text=f"Deuda: ${pac['deuda']:,.2f}",
-                    font=("Tahoma", 13),
-                    bg="#ecf0f1",
-                    fg="#e74c3c"
-                ).pack(side=tk.RIGHT, padx=10)
-                
-                tk.Label(frame_pac, bg="#ecf0f1").pack(pady=3)
-    
-    # ===== PESTAÑA DE SESIONES =====
-    
-    def actualizar_tab_sesiones(self):
-        """Actualiza la pestaña de sesiones del paciente"""
-        # Limpiar pestaña
-        for widget in self.tab_sesiones.winfo_children():
-            widget.destroy()
-        
-        if self.paciente_actual is None:
-            return
-        
-        # Frame superior con botón de nueva sesión
-        frame_superior = tk.Frame(self.tab_sesiones, bg="white")
-        frame_superior.pack(fill=tk.X, padx=20, pady=10)
-        
-        tk.Label(
-            frame_superior,
-            text="Sesiones",
-            font=("Tahoma", 18, "bold"),
-            bg="white"
-        ).pack(side=tk.LEFT)
-        
-        tk.Button(
-            frame_superior,
-            text="➕ Nueva Sesión",
-            command=self.abrir_dialogo_nueva_sesion,
-            bg="#27ae60",
-            fg="white",
-            font=("Tahoma", 14, "bold"),
-            padx=15,
-            pady=5
-        ).pack(side=tk.RIGHT)
-        
-        # Obtener sesiones del paciente
-        sesiones = db.obtener_sesiones_paciente(self.paciente_actual.id)
-        
-        if not sesiones:
-            tk.Label(
+        if self.vista_sesiones is None:
+            self.vista_sesiones = self.construir_tab_lista(
                 self.tab_sesiones,
-                text="No hay sesiones registradas",
-                font=("Tahoma", 16),
-                fg="#95a5a6",
-                bg="white"
-            ).pack(expand=True)
-            return
-        
-        # Frame con scroll para la lista de sesiones
-        frame_scroll = tk.Frame(self.tab_sesiones, bg="white")
-        frame_scroll.pack(fill=tk.BOTH, expand=True, padx=20, pady=10)
-        
-        canvas = tk.Canvas(frame_scroll, bg="white")
-        scrollbar = tk.Scrollbar(frame_scroll, orient="vertical", command=canvas.yview)
-        frame_sesiones = tk.Frame(canvas, bg="white")
-        
-        frame_sesiones.bind(
-            "<Configure>",
-            lambda e: canvas.configure(scrollregion=canvas.bbox("all"))
-        )
-        
-        canvas.create_window((0, 0), window=frame_sesiones, anchor="nw")
-        canvas.configure(yscrollcommand=scrollbar.set)
-        
-        canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+                titulo="Sesiones",
+                texto_boton="➕ Nueva Sesión",
+                comando_boton=self.abrir_dialogo_nueva_sesion,
+                texto_vacio="No hay sesiones registradas",
+                crear_tarjeta=self.crear_tarjeta_sesion,
+                obtener_items=lambda: self.snapshot.sesiones
+            )
         
-        # Mostrar cada sesión como una tarjeta
-        for sesion in sesiones:
-            self.crear_tarjeta_sesion(frame_sesiones, sesion)
+        self.actualizar_tab_lista(self.vista_sesiones, len(self.snapshot.sesiones))
     
-    def crear_tarjeta_sesion(self, parent, sesion: Sesion):
-        """Crea una tarjeta visual para una sesión"""
-        # Frame de la tarjeta
-        color_borde = "#27ae60" if sesion.estado == EstadoSesion.PAGA else "#e74c3c"
-        
-        frame_tarjeta = tk.Frame(
+    def crear_tarjeta_sesion(self, parent) -> TarjetaSesion:
+        """Crea una tarjeta (vacía) para la lista de sesiones"""
+        return TarjetaSesion(
             parent,
-            bg="white",
-            relief=tk.SOLID,
-            borderwidth=2,
-            highlightbackground=color_borde,
-            highlightthickness=2
+            marcar_paga=self.marcar_sesion_paga,
+            editar=self.editar_sesion,
+            eliminar=self.eliminar_sesion
         )
-        frame_tarjeta.pack(fill=tk.X, pady=5, padx=5)
-        
-        # Contenido de la tarjeta
-        frame_contenido = tk.Frame(frame_tarjeta, bg="white")
-        frame_contenido.pack(fill=tk.BOTH, expand=True, padx=15, pady=10)
-        
-        # Primera fila: Fecha y estado
-        frame_fila1 = tk.Frame(frame_contenido, bg="white")
-        frame_fila1.pack(fill=tk.X)
-        
-        tk.Label(
-            frame_fila1,
-            text=sesion.fecha.strftime("%d/%m/%Y"),
-            font=("Tahoma", 16, "bold"),
-            bg="white"
-        ).pack(side=tk.LEFT)
-        
-        estado_texto = "✓ PAGA" if sesion.estado == EstadoSesion.PAGA else "⏳ PENDIENTE"
-        estado_color = "#27ae60" if sesion.estado == EstadoSesion.PAGA else "#e74c3c"
-        
-        tk.Label(
-            frame_fila1,
-            text=estado_texto,
-            font=("Tahoma", 14, "bold"),
-            bg="white",
-            fg=estado_color
-        ).pack(side=tk.RIGHT)
-        
-        # Segunda fila: Tipo y precio
-        frame_fila2 = tk.Frame(frame_contenido, bg="white")
-        frame_fila2.pack(fill=tk.X, pady=5)
-        
-        tk.Label(
-            frame_fila2,
-            text=f"Tipo: {sesion.tipo.value}",
-            font=("Tahoma", 14),
-            bg="white",
-            fg="#7f8c8d"
-        ).pack(side=tk.LEFT)
-        
-        tk.Label(
-            frame_fila2,
-            text=f"${sesion.precio:,.0f}",
-            font=("Tahoma", 15, "bold"),
-            bg="white"
-        ).pack(side=tk.RIGHT)
-        
-        # Tercera fila: Notas (si hay)
-        if sesion.notas:
-            tk.Label(
-                frame_contenido,
-                text=f"Notas: {sesion.notas}",
-                font=("Tahoma", 13),
-                bg="white",
-                fg="#95a5a6",
-                wraplength=600,
-                justify=tk.LEFT
-            ).pack(anchor=tk.W, pady=(5, 0))
-        
-        # Botones de acción
-        frame_botones = tk.Frame(frame_contenido, bg="white")
-        frame_botones.pack(fill=tk.X, pady=(10, 0))
-        
-        if sesion.estado == EstadoSesion.PENDIENTE:
-            tk.Button(
-                frame_botones,
-                text="✓ Marcar como Paga",
-                command=lambda s=sesion: self.marcar_sesion_paga(s),
-                bg="#27ae60",
-                fg="white",
-                font=("Tahoma", 13),
-                padx=10,
-                pady=3
-            ).pack(side=tk.LEFT, padx=(0, 5))
-        
-        tk.Button(
-            frame_botones,
-            text="✏️ Editar",
-            command=lambda s=sesion: self.editar_sesion(s),
-            bg="#3498db",
-            fg="white",
-            font=("Tahoma", 13),
-            padx=10,
-            pady=3
-        ).pack(side=tk.LEFT, padx=5)
-        
-        tk.Button(
-            frame_botones,
-            text="🗑️ Eliminar",
-            command=lambda s=sesion: self.eliminar_sesion(s),
-            bg="#e74c3c",
-            fg="white",
-            font=("Tahoma", 13),
-            padx=10,
-            pady=3
-        ).pack(side=tk.LEFT, padx=5)
     
     def marcar_sesion_paga(self, sesion: Sesion):
         """Marca una sesión como paga manualmente"""
@@ -1401,16 +1635,12 @@ class AplicacionClinica:
         )
         
         if respuesta:
-            sesion.estado = EstadoSesion.PAGA
-            db.guardar_sesion(sesion)
-            
-            # Actualizar deuda del paciente
-            db.actualizar_deuda_paciente(self.paciente_actual.id)
-            
-            # Recargar paciente y actualizar vista
-            self.paciente_actual = db.obtener_paciente(self.paciente_actual.id)
-            self.actualizar_pestañas()
-            self.cargar_lista_pacientes()
+            # Se guarda una copia: la sesión mostrada no cambia si falla.
+            # Después se actualiza solo lo que cambió
+            self.guardar(
+                db.modificar_sesion, replace(sesion, estado=EstadoSesion.PAGA),
+                al_terminar=self.aplicar_cambios
+            )
     
     def eliminar_sesion(self, sesion: Sesion):
         """Elimina una sesión con confirmación"""
@@ -1423,15 +1653,8 @@ class AplicacionClinica:
         )
         
         if respuesta:
-            db.eliminar_sesion(sesion.id)
-            
-            # Actualizar deuda del paciente
-            db.actualizar_deuda_paciente(self.paciente_actual.id)
-            
-            # Recargar y actualizar
-            self.paciente_actual = db.obtener_paciente(self.paciente_actual.id)
-            self.actualizar_pestañas()
-            self.cargar_lista_pacientes()
+            # Después se actualiza solo lo que cambió
+            self.guardar(db.eliminar_sesion, sesion.id, al_terminar=self.aplicar_cambios)
     
     def eliminar_pago(self, pago: Pago):
         """Elimina un pago con confirmación"""
@@ -1444,15 +1667,9 @@ class AplicacionClinica:
         )
         
         if respuesta:
-            db.eliminar_pago(pago.id)
-            
-            # Actualizar deuda del paciente
-            db.actualizar_deuda_paciente(self.paciente_actual.id)
-            
-            # Recargar y actualizar
-            self.paciente_actual = db.obtener_paciente(self.paciente_actual.id)
-            self.actualizar_pestañas()
-            self.cargar_lista_pacientes()
+            # También recalcula la deuda (los pagos no pasan por los triggers).
+            # Después se actualiza solo lo que cambió
+            self.guardar(db.eliminar_pago, pago.id, al_terminar=self.aplicar_cambios)
     
     def editar_sesion(self, sesion: Sesion):
         """Edita una sesión existente"""
@@ -1537,45 +1754,35 @@ class AplicacionClinica:
                 año = int(entry_año.get())
                 fecha = datetime(año, mes, dia)
                 
-                # Mapeo para tipos y estados
-                tipo_map = {
-                    "Estándar": TipoSesion.ESTANDAR,
-                    "Tratamiento de trauma": TipoSesion.TRAUMA,
-                    "Pareja": TipoSesion.PAREJA,
-                    "Familiar": TipoSesion.FAMILIAR,
-                    "Diagnóstico": TipoSesion.DIAGNOSTICO
-                }
+                # Texto del combo -> enum
+                tipo_map = POR_VALOR[TipoSesion]
+                estado_map = POR_VALOR[EstadoSesion]
                 
-                estado_map = {
-                    "Paga": EstadoSesion.PAGA,
-                    "Pendiente": EstadoSesion.PENDIENTE
-                }
+                # Sesión modificada (una copia: la mostrada no cambia si falla al guardar)
+                sesion_editada = replace(
+                    sesion,
+                    fecha=fecha,
+                    precio=float(entry_precio.get()),
+                    tipo=tipo_map[combo_tipo.get()],
+                    estado=estado_map[combo_estado.get()],
+                    notas=text_notas.get("1.0", tk.END).strip()
+                )
                 
-                # Actualizar sesión
-                sesion.fecha = fecha
-                sesion.precio = float(entry_precio.get())
-                sesion.tipo = tipo_map[combo_tipo.get()]
-                sesion.estado = estado_map[combo_estado.get()]
-                sesion.notas = text_notas.get("1.0", tk.END).strip()
+                def guardado(cambios: Cambios):
+                    # Actualizar solo lo que cambió
+                    self.aplicar_cambios(cambios)
+                    
+                    messagebox.showinfo("Éxito", "Sesión actualizada correctamente")
+                    if dialogo.winfo_exists():
+                        dialogo.destroy()
                 
                 # Guardar en BD
-                db.guardar_sesion(sesion)
-                
-                # Actualizar deuda
-                db.actualizar_deuda_paciente(self.paciente_actual.id)
-                
-                # Recargar y actualizar
-                self.paciente_actual = db.obtener_paciente(self.paciente_actual.id)
-                self.actualizar_pestañas()
-                self.cargar_lista_pacientes()
-                
-                messagebox.showinfo("Éxito", "Sesión actualizada correctamente")
-                dialogo.destroy()
+                self.guardar(db.modificar_sesion, sesion_editada, al_terminar=guardado, indicador=indicador)
                 
             except ValueError as e:
                 messagebox.showerror("Error", f"Datos inválidos: {e}")
         
-        tk.Button(
+        btn_guardar = tk.Button(
             frame_botones,
             text="✓ Guardar",
             command=guardar_cambios,
@@ -1584,7 +1791,8 @@ class AplicacionClinica:
             font=("Tahoma", 14, "bold"),
             padx=20,
             pady=5
-        ).pack(side=tk.LEFT, padx=5)
+        )
+        btn_guardar.pack(side=tk.LEFT, padx=5)
         
         tk.Button(
             frame_botones,
@@ -1596,6 +1804,9 @@ class AplicacionClinica:
             padx=20,
             pady=5
         ).pack(side=tk.LEFT, padx=5)
+        
+        # Se muestra mientras se guarda (ver guardar)
+        indicador = IndicadorOcupado(frame_botones, botones=[btn_guardar])
     
     def abrir_dialogo_nueva_sesion(self):
         """Abre un diálogo para crear una nueva sesión"""
@@ -1680,18 +1891,8 @@ class AplicacionClinica:
                 fecha = datetime(año, mes, dia)
                 
                 # Mapeo correcto para tipos con nombres largos
-                tipo_map = {
-                    "Estándar": TipoSesion.ESTANDAR,
-                    "Tratamiento de trauma": TipoSesion.TRAUMA,
-                    "Pareja": TipoSesion.PAREJA,
-                    "Familiar": TipoSesion.FAMILIAR,
-                    "Diagnóstico": TipoSesion.DIAGNOSTICO
-                }
-                
-                estado_map = {
-                    "Paga": EstadoSesion.PAGA,
-                    "Pendiente": EstadoSesion.PENDIENTE
-                }
+                tipo_map = POR_VALOR[TipoSesion]
+                estado_map = POR_VALOR[EstadoSesion]
                 
                 # Crear sesión
                 sesion = Sesion(
@@ -1704,29 +1905,23 @@ class AplicacionClinica:
                     notas=text_notas.get("1.0", tk.END).strip()
                 )
                 
-                # Guardar en BD
-                db.guardar_sesion(sesion)
-                
-                # Aplicar saldo a favor si existe
-                db.aplicar_saldo_a_favor_a_nueva_sesion(self.paciente_actual.id, sesion)
-                
-                # Actualizar deuda
-                db.actualizar_deuda_paciente(self.paciente_actual.id)
-                
-                # Recargar y cerrar
-                self.paciente_actual = db.obtener_paciente(self.paciente_actual.id)
-                self.actualizar_pestañas()
-                self.cargar_lista_pacientes()
-                dialogo.destroy()
+                def guardado(cambios: Cambios):
+                    # Actualizar solo lo que cambió y cerrar
+                    self.aplicar_cambios(cambios)
+                    if dialogo.winfo_exists():
+                        dialogo.destroy()
+                    
+                    messagebox.showinfo("Éxito", "Sesión registrada correctamente")
                 
-                messagebox.showinfo("Éxito", "Sesión registrada correctamente")
+                # Guardar en BD (aplica el saldo a favor si existe)
+                self.guardar(db.registrar_sesion, sesion, al_terminar=guardado, indicador=indicador)
                 
             except ValueError as e:
                 messagebox.showerror("Error", f"Datos inválidos: {e}")
             except Exception as e:
                 messagebox.showerror("Error", f"Error al guardar sesión: {e}")
         
-        tk.Button(
+        btn_guardar = tk.Button(
             frame_botones,
             text="✓ Guardar",
             command=guardar_sesion,
@@ -1735,7 +1930,8 @@ class AplicacionClinica:
             font=("Tahoma", 14, "bold"),
             padx=20,
             pady=5
-        ).pack(side=tk.LEFT, padx=5)
+        )
+        btn_guardar.pack(side=tk.LEFT, padx=5)
         
         tk.Button(
             frame_botones,
@@ -1747,319 +1943,64 @@ class AplicacionClinica:
             padx=20,
             pady=5
         ).pack(side=tk.LEFT, padx=5)
+        
+        # Se muestra mientras se guarda (ver guardar)
+        indicador = IndicadorOcupado(frame_botones, botones=[btn_guardar])
 
 # ===== PESTAÑA DE PAGOS =====
 
     def actualizar_tab_pagos(self):
         """Actualiza la pestaña de pagos del paciente"""
-        # Limpiar pestaña
-        for widget in self.tab_pagos.winfo_children():
-            widget.destroy()
-        
-        if self.paciente_actual is None:
+        if self.snapshot is None:
             return
         
-        # Frame superior con botón de nuevo pago
-        frame_superior = tk.Frame(self.tab_pagos, bg="white")
-        frame_superior.pack(fill=tk.X, padx=20, pady=10)
-        
-        tk.Label(
-            frame_superior,
-            text="Pagos",
-            font=("Tahoma", 18, "bold"),
-            bg="white"
-        ).pack(side=tk.LEFT)
-        
-        tk.Button(
-            frame_superior,
-            text="➕ Nuevo Pago",
-            command=self.abrir_dialogo_nuevo_pago,
-            bg="#27ae60",
-            fg="white",
-            font=("Tahoma", 14, "bold"),
-            padx=15,
-            pady=5
-        ).pack(side=tk.RIGHT)
-        
-        # Obtener pagos del paciente
-        pagos = db.obtener_pagos_paciente(self.paciente_actual.id)
-        
-        if not pagos:
-            tk.Label(
+        if self.vista_pagos is None:
+            self.vista_pagos = self.construir_tab_lista(
                 self.tab_pagos,
-                text="No hay pagos registrados",
-                font=("Tahoma", 16),
-                fg="#95a5a6",
-                bg="white"
-            ).pack(expand=True)
-            return
-        
-        # Frame con scroll para la lista de pagos
-        frame_scroll = tk.Frame(self.tab_pagos, bg="white")
-        frame_scroll.pack(fill=tk.BOTH, expand=True, padx=20, pady=10)
-        
-        canvas = tk.Canvas(frame_scroll, bg="white")
-        scrollbar = tk.Scrollbar(frame_scroll, orient="vertical", command=canvas.yview)
-        frame_pagos = tk.Frame(canvas, bg="white")
-        
-        frame_pagos.bind(
-            "<Configure>",
-            lambda e: canvas.configure(scrollregion=canvas.bbox("all"))
-        )
-        
-        canvas.create_window((0, 0), window=frame_pagos, anchor="nw")
-        canvas.configure(yscrollcommand=scrollbar.set)
-        
-        canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        
-        # Mostrar cada pago como una tarjeta
-        for pago in pagos:
-            self.crear_tarjeta_pago(frame_pagos, pago)
-    def crear_tarjeta_pago(self, parent, pago: Pago):
-        """Crea una tarjeta visual para un pago"""
-        # Frame de la tarjeta
-        frame_tarjeta = tk.Frame(
-            parent,
-            bg="white",
-            relief=tk.SOLID,
-            borderwidth=2,
-            highlightbackground="#2980b9",
-            highlightthickness=2
-        )
-        frame_tarjeta.pack(fill=tk.X, pady=5, padx=5)
-        
-        # Contenido de la tarjeta
-        frame_contenido = tk.Frame(frame_tarjeta, bg="white")
-        frame_contenido.pack(fill=tk.BOTH, expand=True, padx=15, pady=10)
-        
-        # Primera fila: Fecha y monto
-        frame_fila1 = tk.Frame(frame_contenido, bg="white")
-        frame_fila1.pack(fill=tk.X)
-        
-        tk.Label(
-            frame_fila1,
-            text=pago.fecha.strftime("%d/%m/%Y"),
-            font=("Tahoma", 16, "bold"),
-            bg="white"
-        ).pack(side=tk.LEFT)
-        
-        tk.Label(
-            frame_fila1,
-            text=f"${pago.monto:,.0f}",
-            font=("Tahoma", 15, "bold"),
-            bg="white"
-        ).pack(side=tk.RIGHT)
-        
-        # Segunda fila: Concepto
-        tk.Label(
-            frame_contenido,
-            text=f"Concepto: {pago.concepto.value}",
-            font=("Tahoma", 14),
-            bg="white",
-            fg="#7f8c8d"
-        ).pack(anchor=tk.W, pady=(5, 0))
-        
-        # Tercera fila: Notas (si hay)
-        if pago.notas:
-            tk.Label(
-                frame_contenido,
-                text=f"Notas: {pago.notas}",
-                font=("Tahoma", 13),
-                bg="white",
-                fg="#95a5a6",
-                wraplength=600,
-                justify=tk.LEFT
-            ).pack(anchor=tk.W, pady=(5, 0))
-        
-        # Botones de acción
-        frame_botones = tk.Frame(frame_contenido, bg="white")
-        frame_botones.pack(fill=tk.X, pady=(10, 0))
+                titulo="Pagos",
+                texto_boton="➕ Nuevo Pago",
+                comando_boton=self.abrir_dialogo_nuevo_pago,
+                texto_vacio="No hay pagos registrados",
+                crear_tarjeta=self.crear_tarjeta_pago,
+                obtener_items=lambda: self.snapshot.pagos
+            )
         
-        tk.Button(
-            frame_botones,
-            text="🗑️ Eliminar",
-            command=lambda p=pago: self.eliminar_pago(p),
-            bg="#e74c3c",
-            fg="white",
-            font=("Tahoma", 13),
-            padx=10,
-            pady=3
-        ).pack(side=tk.LEFT, padx=(0, 5))
+        self.actualizar_tab_lista(self.vista_pagos, len(self.snapshot.pagos))
+    
+    def crear_tarjeta_pago(self, parent) -> TarjetaPago:
+        """Crea una tarjeta (vacía) para la lista de pagos"""
+        return TarjetaPago(parent, eliminar=self.eliminar_pago)
 
 
 # ===== PESTAÑA DE INFORMES =====
     
     def actualizar_tab_informes(self):
         """Actualiza la pestaña de informes del paciente"""
-        # Limpiar pestaña
-        for widget in self.tab_informes.winfo_children():
-            widget.destroy()
-        
-        if self.paciente_actual is None:
+        if self.snapshot is None:
             return
         
-        # Frame superior con botón de nuevo informe
-        frame_superior = tk.Frame(self.tab_informes, bg="white")
-        frame_superior.pack(fill=tk.X, padx=20, pady=10)
-        
-        tk.Label(
-            frame_superior,
-            text="Informes",
-            font=("Tahoma", 18, "bold"),
-            bg="white"
-        ).pack(side=tk.LEFT)
-        
-        tk.Button(
-            frame_superior,
-            text="➕ Nuevo Informe",
-            command=self.abrir_dialogo_nuevo_informe,
-            bg="#27ae60",
-            fg="white",
-            font=("Tahoma", 14, "bold"),
-            padx=15,
-            pady=5
-        ).pack(side=tk.RIGHT)
-        
-        # Obtener informes del paciente
-        informes = db.obtener_informes_paciente(self.paciente_actual.id)
-        
-        if not informes:
-            tk.Label(
+        if self.vista_informes is None:
+            self.vista_informes = self.construir_tab_lista(
                 self.tab_informes,
-                text="No hay informes registrados",
-                font=("Tahoma", 16),
-                fg="#95a5a6",
-                bg="white"
-            ).pack(expand=True)
-            return
-        
-        # Frame con scroll para la lista de informes
-        frame_scroll = tk.Frame(self.tab_informes, bg="white")
-        frame_scroll.pack(fill=tk.BOTH, expand=True, padx=20, pady=10)
-        
-        canvas = tk.Canvas(frame_scroll, bg="white")
-        scrollbar = tk.Scrollbar(frame_scroll, orient="vertical", command=canvas.yview)
-        frame_informes = tk.Frame(canvas, bg="white")
-        
-        frame_informes.bind(
-            "<Configure>",
-            lambda e: canvas.configure(scrollregion=canvas.bbox("all"))
-        )
-        
-        canvas.create_window((0, 0), window=frame_informes, anchor="nw")
-        canvas.configure(yscrollcommand=scrollbar.set)
-        
-        canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        
-        # Mostrar cada informe como una tarjeta
-        for informe in informes:
-            self.crear_tarjeta_informe(frame_informes, informe)
-    def crear_tarjeta_informe(self, parent, informe: Informe):
-        """Crea una tarjeta visual para un informe"""
-        # Frame de la tarjeta
-        color_borde = "#27ae60" if informe.estado_pago == EstadoPagoInforme.PAGADO else "#e74c3c"
+                titulo="Informes",
+                texto_boton="➕ Nuevo Informe",
+                comando_boton=self.abrir_dialogo_nuevo_informe,
+                texto_vacio="No hay informes registrados",
+                crear_tarjeta=self.crear_tarjeta_informe,
+                obtener_items=lambda: self.snapshot.informes
+            )
         
-        frame_tarjeta = tk.Frame(
+        self.actualizar_tab_lista(self.vista_informes, len(self.snapshot.informes))
+    
+    def crear_tarjeta_informe(self, parent) -> TarjetaInforme:
+        """Crea una tarjeta (vacía) para la lista de informes"""
+        return TarjetaInforme(
             parent,
-            bg="white",
-            relief=tk.SOLID,
-            borderwidth=2,
-            highlightbackground=color_borde,
-            highlightthickness=2
+            marcar_pagado=self.marcar_informe_pagado,
+            editar=self.editar_informe,
+            eliminar=self.eliminar_informe
         )
-        frame_tarjeta.pack(fill=tk.X, pady=5, padx=5)
-        
-        # Contenido de la tarjeta
-        frame_contenido = tk.Frame(frame_tarjeta, bg="white")
-        frame_contenido.pack(fill=tk.BOTH, expand=True, padx=15, pady=10)
-        
-        # Primera fila: Tipo y estado
-        frame_fila1 = tk.Frame(frame_contenido, bg="white")
-        frame_fila1.pack(fill=tk.X)
-        
-        tk.Label(
-            frame_fila1,
-            text=informe.tipo.value,
-            font=("Tahoma", 16, "bold"),
-            bg="white"
-        ).pack(side=tk.LEFT)
-        
-        estado_texto = f"Estado: {informe.estado.value}"
-        
-        tk.Label(
-            frame_fila1,
-            text=estado_texto,
-            font=("Tahoma", 14, "bold"),
-            bg="white",
-            fg="#7f8c8d"
-        ).pack(side=tk.RIGHT)
-        
-        # Segunda fila: Precio y monto pagado
-        frame_fila2 = tk.Frame(frame_contenido, bg="white")
-        frame_fila2.pack(fill=tk.X, pady=5)
-        
-        tk.Label(
-            frame_fila2,
-            text=f"Precio: ${informe.precio:,.0f}",
-            font=("Tahoma", 15),
-            bg="white"
-        ).pack(side=tk.LEFT)
-        
-        tk.Label(
-            frame_fila2,
-            text=f"Pagado: ${informe.monto_pagado:,.0f}",
-            font=("Tahoma", 15),
-            bg="white"
-        ).pack(side=tk.RIGHT)
-        
-        # Tercera fila: Notas (si hay)
-        if informe.notas:
-            tk.Label(
-                frame_contenido,
-                text=f"Notas: {informe.notas}",
-                font=("Tahoma", 13),
-                bg="white",
-                fg  ="#95a5a6",
-                wraplength=600,
-                justify=tk.LEFT
-            ).pack(anchor=tk.W, pady=(5, 0))
-
-        # Botones de acción
-        frame_botones = tk.Frame(frame_contenido, bg="white")
-        frame_botones.pack(fill=tk.X, pady=(10, 0))
-        if informe.estado_pago != EstadoPagoInforme.PAGADO:
-            tk.Button(
-                frame_botones,
-                text="✓ Marcar como Pagado",
-                command=lambda i=informe: self.marcar_informe_pagado(i),
-                bg="#27ae60",
-                fg="white",
-                font=("Tahoma", 13),
-                padx=10,
-                pady=3
-            ).pack(side=tk.LEFT, padx=(0, 5))
-        tk.Button(
-            frame_botones,
-            text="✏️ Editar",
-            command=lambda i=informe: self.editar_informe(i),
-            bg="#3498db",
-            fg="white",
-            font=("Tahoma", 13),
-            padx=10,
-            pady=3
-        ).pack(side=tk.LEFT, padx=5)
-        tk.Button(
-            frame_botones,
-            text="🗑️ Eliminar",
-            command=lambda i=informe: self.eliminar_informe(i),
-            bg="#e74c3c",
-            fg="white",
-            font=("Tahoma", 13),
-            padx=10,
-            pady=3
-        ).pack(side=tk.LEFT, padx=5)
+    
     def marcar_informe_pagado(self, informe: Informe):
         """Marca un informe como pagado manualmente"""
         respuesta = messagebox.askyesno(
@@ -2068,16 +2009,12 @@ class AplicacionClinica:
         )
         
         if respuesta:
-            informe.estado_pago = EstadoPagoInforme.PAGADO
-            db.guardar_informe(informe)
-            
-            # Actualizar deuda del paciente
-            db.actualizar_deuda_paciente(self.paciente_actual.id)
-            
-            # Recargar paciente y actualizar vista
-            self.paciente_actual = db.obtener_paciente(self.paciente_actual.id)
-            self.actualizar_pestañas()
-            self.cargar_lista_pacientes()
+            # Se guarda una copia: el informe mostrado no cambia si falla.
+            # Después se actualiza solo lo que cambió
+            self.guardar(
+                db.modificar_informe, replace(informe, estado_pago=EstadoPagoInforme.PAGADO),
+                al_terminar=self.aplicar_cambios
+            )
     def eliminar_informe(self, informe: Informe):
         """Elimina un informe con confirmación"""
         respuesta = messagebox.askyesno(
@@ -2088,15 +2025,8 @@ class AplicacionClinica:
         )
         
         if respuesta:
-            db.eliminar_informe(informe.id)
-            
-            # Actualizar deuda del paciente
-            db.actualizar_deuda_paciente(self.paciente_actual.id)
-            
-            # Recargar y actualizar
-            self.paciente_actual = db.obtener_paciente(self.paciente_actual.id)
-            self.actualizar_pestañas()
-            self.cargar_lista_pacientes()
+            # Después se actualiza solo lo que cambió
+            self.guardar(db.eliminar_informe, informe.id, al_terminar=self.aplicar_cambios)
     def editar_informe(self, informe: Informe):
         """Edita un informe existente"""
         if self.paciente_actual is None:
@@ -2169,52 +2099,36 @@ class AplicacionClinica:
         def guardar_cambios():
             try:
                 # Mapeo para tipos
-                tipo_map = {
-                    "Carta - Instituciones, psiquiatras, trabajo, etc.": TipoInforme.CARTA,
-                    "Comprobante de tratamiento": TipoInforme.COMPROBANTE,
-                    "Psicodiagnóstico": TipoInforme.PSICODIAGNOSTICO,
-                    "Reunión (colegios, etc.)": TipoInforme.REUNION
-                }
-                
-                estado_map = {
-                    "Pendiente": EstadoInforme.PENDIENTE,
-                    "Falta aplicar pruebas": EstadoInforme.FALTA_PRUEBAS,
-                    "Terminado": EstadoInforme.TERMINADO,
-                    "Entregado": EstadoInforme.ENTREGADO
-                }
+                tipo_map = POR_VALOR[TipoInforme]
+                estado_map = POR_VALOR[EstadoInforme]
+                estado_pago_map = POR_VALOR[EstadoPagoInforme]
                 
-                estado_pago_map = {
-                    "Pendiente": EstadoPagoInforme.PENDIENTE,
-                    "Pago parcial": EstadoPagoInforme.PAGO_PARCIAL,
-                    "Pagado": EstadoPagoInforme.PAGADO
-                }
+                # Informe modificado (una copia: el mostrado no cambia si falla al guardar)
+                informe_editado = replace(
+                    informe,
+                    tipo=tipo_map[combo_tipo.get()],
+                    estado=estado_map[combo_estado.get()],
+                    precio=float(entry_precio.get()),
+                    monto_pagado=float(entry_pagado.get()),
+                    estado_pago=estado_pago_map[combo_estado_pago.get()],
+                    notas=text_notas.get("1.0", tk.END).strip()
+                )
                 
-                # Actualizar informe
-                informe.tipo = tipo_map[combo_tipo.get()]
-                informe.estado = estado_map[combo_estado.get()]
-                informe.precio = float(entry_precio.get())
-                informe.monto_pagado = float(entry_pagado.get())
-                informe.estado_pago = estado_pago_map[combo_estado_pago.get()]
-                informe.notas = text_notas.get("1.0", tk.END).strip()
+                def guardado(cambios: Cambios):
+                    # Actualizar solo lo que cambió
+                    self.aplicar_cambios(cambios)
+                    
+                    messagebox.showinfo("Éxito", "Informe actualizado correctamente")
+                    if dialogo.winfo_exists():
+                        dialogo.destroy()
                 
                 # Guardar en BD
-                db.guardar_informe(informe)
-                
-                # Actualizar deuda
-                db.actualizar_deuda_paciente(self.paciente_actual.id)
-                
-                # Recargar y actualizar
-                self.paciente_actual = db.obtener_paciente(self.paciente_actual.id)
-                self.actualizar_pestañas()
-                self.cargar_lista_pacientes()
-                
-                messagebox.showinfo("Éxito", "Informe actualizado correctamente")
-                dialogo.destroy()
+                self.guardar(db.modificar_informe, informe_editado, al_terminar=guardado, indicador=indicador)
                 
             except ValueError as e:
                 messagebox.showerror("Error", f"Datos inválidos: {e}")
         
-        tk.Button(
+        btn_guardar = tk.Button(
             frame_botones,
             text="✓ Guardar",
             command=guardar_cambios,
@@ -2223,7 +2137,8 @@ class AplicacionClinica:
             font=("Tahoma", 14, "bold"),
             padx=20,
             pady=5
-        ).pack(side=tk.LEFT, padx=5)
+        )
+        btn_guardar.pack(side=tk.LEFT, padx=5)
         
         tk.Button(
             frame_botones,
@@ -2235,6 +2150,9 @@ class AplicacionClinica:
             padx=20,
             pady=5
         ).pack(side=tk.LEFT, padx=5)
+        
+        # Se muestra mientras se guarda (ver guardar)
+        indicador = IndicadorOcupado(frame_botones, botones=[btn_guardar])
     
     def abrir_dialogo_nuevo_informe(self):
         """Abre un diálogo para crear un nuevo informe"""
@@ -2307,25 +2225,9 @@ class AplicacionClinica:
         def guardar_informe():
             try:
                 # Mapeo para tipos
-                tipo_map = {
-                    "Carta - Instituciones, psiquiatras, trabajo, etc.": TipoInforme.CARTA,
-                    "Comprobante de tratamiento": TipoInforme.COMPROBANTE,
-                    "Psicodiagnóstico": TipoInforme.PSICODIAGNOSTICO,
-                    "Reunión (colegios, etc.)": TipoInforme.REUNION
-                }
-                
-                estado_map = {
-                    "Pendiente": EstadoInforme.PENDIENTE,
-                    "Falta aplicar pruebas": EstadoInforme.FALTA_PRUEBAS,
-                    "Terminado": EstadoInforme.TERMINADO,
-                    "Entregado": EstadoInforme.ENTREGADO
-                }
-                
-                estado_pago_map = {
-                    "Pendiente": EstadoPagoInforme.PENDIENTE,
-                    "Pago parcial": EstadoPagoInforme.PAGO_PARCIAL,
-                    "Pagado": EstadoPagoInforme.PAGADO
-                }
+                tipo_map = POR_VALOR[TipoInforme]
+                estado_map = POR_VALOR[EstadoInforme]
+                estado_pago_map = POR_VALOR[EstadoPagoInforme]
                 
                 # Crear informe
                 informe = Informe(
@@ -2340,26 +2242,23 @@ class AplicacionClinica:
                     fecha_creacion=datetime.now()
                 )
                 
-                # Guardar en BD
-                db.guardar_informe(informe)
-                
-                # Actualizar deuda
-                db.actualizar_deuda_paciente(self.paciente_actual.id)
-                
-                # Recargar y actualizar
-                self.paciente_actual = db.obtener_paciente(self.paciente_actual.id)
-                self.actualizar_pestañas()
-                self.cargar_lista_pacientes()
+                def guardado(cambios: Cambios):
+                    # Actualizar solo lo que cambió
+                    self.aplicar_cambios(cambios)
+                    
+                    messagebox.showinfo("Éxito", f"Informe creado correctamente")
+                    if dialogo.winfo_exists():
+                        dialogo.destroy()
                 
-                messagebox.showinfo("Éxito", f"Informe creado correctamente")
-                dialogo.destroy()
+                # Guardar en BD
+                self.guardar(db.registrar_informe, informe, al_terminar=guardado, indicador=indicador)
                 
             except ValueError as e:
                 messagebox.showerror("Error", f"Datos inválidos: {e}")
             except Exception as e:
                 messagebox.showerror("Error", f"Error al guardar informe: {e}")
         
-        tk.Button(
+        btn_guardar = tk.Button(
             frame_botones,
             text="✓ Guardar",
             command=guardar_informe,
@@ -2368,7 +2267,8 @@ class AplicacionClinica:
             font=("Tahoma", 14, "bold"),
             padx=20,
             pady=5
-        ).pack(side=tk.LEFT, padx=5)
+        )
+        btn_guardar.pack(side=tk.LEFT, padx=5)
         
         tk.Button(
             frame_botones,
@@ -2380,19 +2280,15 @@ class AplicacionClinica:
             padx=20,
             pady=5
         ).pack(side=tk.LEFT, padx=5)
+        
+        # Se muestra mientras se guarda (ver guardar)
+        indicador = IndicadorOcupado(frame_botones, botones=[btn_guardar])
     
     # ===== PESTAÑA DE RESUMEN/DEUDA =====
     
-    def actualizar_tab_resumen(self):
-        """Actualiza la pestaña de resumen/deuda del paciente"""
-        # Limpiar pestaña
-        for widget in self.tab_resumen.winfo_children():
-            widget.destroy()
-        
-        if self.paciente_actual is None:
-            return
-        
-        p = self.paciente_actual
+    def construir_tab_resumen(self):
+        """Crea (una sola vez) los widgets de la pestaña de resumen"""
+        v = self.vista_resumen = {}
         
         # Título
         tk.Label(
@@ -2407,9 +2303,6 @@ class AplicacionClinica:
         frame_resumen.pack(pady=10, padx=30, fill=tk.BOTH, expand=True)
         
         # Deuda total
-        deuda_color = "#e74c3c" if p.deuda > 0 else "#27ae60"
-        deuda_texto = f"${p.deuda:,.0f}" if p.deuda >= 0 else f"-${abs(p.deuda):,.0f}"
-        
         tk.Label(
             frame_resumen,
             text="Deuda Total",
@@ -2417,30 +2310,22 @@ class AplicacionClinica:
             bg="white"
         ).pack(pady=(20, 0))
         
-        tk.Label(
+        v["deuda"] = tk.Label(
             frame_resumen,
-            text=deuda_texto,
             font=("Tahoma", 32, "bold"),
-            bg="white",
-            fg=deuda_color
-        ).pack(pady=(0, 20))
+            bg="white"
+        )
+        v["deuda"].pack(pady=(0, 20))
         
         # Estadísticas
-        sesiones_total = db.obtener_sesiones_paciente(p.id)
-        sesiones_pagadas = [s for s in sesiones_total if s.estado == EstadoSesion.PAGA]
-        sesiones_pendientes = [s for s in sesiones_total if s.estado == EstadoSesion.PENDIENTE]
-        
-        pagos_total = db.obtener_pagos_paciente(p.id)
-        monto_pagado = sum(pago.monto for pago in pagos_total)
-        
         estadisticas = [
-            ("Total de sesiones:", len(sesiones_total)),
-            ("Sesiones pagadas:", len(sesiones_pagadas)),
-            ("Sesiones pendientes:", len(sesiones_pendientes)),
-            ("Monto total pagado:", f"${monto_pagado:,.0f}"),
+            ("sesiones", "Total de sesiones:"),
+            ("pagadas", "Sesiones pagadas:"),
+            ("pendientes", "Sesiones pendientes:"),
+            ("pagado", "Monto total pagado:"),
         ]
         
-        for label, valor in estadisticas:
+        for clave, label in estadisticas:
             tk.Label(
                 frame_resumen,
                 text=label,
@@ -2448,13 +2333,36 @@ class AplicacionClinica:
                 bg="white"
             ).pack(pady=(10, 0), anchor="w")
             
-            tk.Label(
+            v[clave] = tk.Label(
                 frame_resumen,
-                text=str(valor),
                 font=("Tahoma", 15),
                 bg="white",
                 fg="#7f8c8d"
-            ).pack(anchor="w", padx=(20, 0))
+            )
+            v[clave].pack(anchor="w", padx=(20, 0))
+    
+    def actualizar_tab_resumen(self):
+        """Actualiza la pestaña de resumen/deuda del paciente"""
+        if self.snapshot is None:
+            return
+        
+        if self.vista_resumen is None:
+            self.construir_tab_resumen()
+        
+        v = self.vista_resumen
+        p = self.paciente_actual
+        snapshot = self.snapshot
+        
+        # Deuda total
+        deuda_color = "#e74c3c" if p.deuda > 0 else "#27ae60"
+        deuda_texto = f"${p.deuda:,.0f}" if p.deuda >= 0 else f"-${abs(p.deuda):,.0f}"
+        configurar(v["deuda"], text=deuda_texto, fg=deuda_color)
+        
+        # Estadísticas
+        configurar(v["sesiones"], text=str(len(snapshot.sesiones)))
+        configurar(v["pagadas"], text=str(snapshot.sesiones_pagas))
+        configurar(v["pendientes"], text=str(snapshot.sesiones_pendientes))
+        configurar(v["pagado"], text=f"${snapshot.monto_pagado:,.0f}")
     
     def abrir_dialogo_nuevo_pago(self):
         """Abre un diálogo para crear un nuevo pago"""
@@ -2543,12 +2451,7 @@ class AplicacionClinica:
                     return
                 
                 # Mapeo para conceptos
-                concepto_map = {
-                    "Sesión": ConceptoPago.SESION,
-                    "Mensual": ConceptoPago.MENSUAL,
-                    "Diagnóstico": ConceptoPago.DIAGNOSTICO,
-                    "Informe": ConceptoPago.INFORME
-                }
+                concepto_map = POR_VALOR[ConceptoPago]
                 
                 # Crear pago
                 pago = Pago(
@@ -2560,53 +2463,50 @@ class AplicacionClinica:
                     notas=text_notas.get("1.0", tk.END).strip()
                 )
                 
-                # Guardar pago en BD
-                db.guardar_pago(pago)
-                
-                # APLICAR EL PAGO AUTOMÁTICAMENTE
-                resultado = db.aplicar_pago_automatico(self.paciente_actual.id, monto)
-                
-                # Construir mensaje de éxito con detalles
-                mensaje_detalle = f"Pago de ${monto:,.2f} registrado y aplicado:\n\n"
-                
-                # Sesiones pagadas
-                if resultado["sesiones_pagadas"]:
-                    mensaje_detalle += f"✓ Sesiones pagadas: {len(resultado['sesiones_pagadas'])}\n"
-                    for sesion in resultado["sesiones_pagadas"]:
-                        mensaje_detalle += f"  • {sesion['tipo']} ({sesion['fecha']}) - ${sesion['precio']:,.2f}\n"
-                    mensaje_detalle += "\n"
-                
-                # Informes actualizados
-                if resultado["informes_actualizados"]:
-                    mensaje_detalle += f"✓ Informes actualizados: {len(resultado['informes_actualizados'])}\n"
-                    for informe in resultado["informes_actualizados"]:
-                        mensaje_detalle += f"  • {informe['tipo']} - ${informe['monto_aplicado']:,.2f} ({informe['nuevo_estado']})\n"
-                    mensaje_detalle += "\n"
-                
-                # Saldo a favor
-                if resultado["saldo_a_favor"] > 0.01:
-                    mensaje_detalle += f"✓ Saldo a favor: ${resultado['saldo_a_favor']:,.2f}\n\n"
-                
-                # Deuda actualizada
-                deuda_anterior = resultado["deuda_anterior"]
-                deuda_nueva = resultado["deuda_nueva"]
-                mensaje_detalle += f"Deuda: ${deuda_anterior:,.2f} → ${deuda_nueva:,.2f}"
-                
-                messagebox.showinfo("Pago Registrado", mensaje_detalle)
-                
-                # Recargar y actualizar
-                self.paciente_actual = db.obtener_paciente(self.paciente_actual.id)
-                self.actualizar_pestañas()
-                self.cargar_lista_pacientes()
+                def registrado(resultado: dict):
+                    # Construir mensaje de éxito con detalles
+                    mensaje_detalle = f"Pago de ${monto:,.2f} registrado y aplicado:\n\n"
+                    
+                    # Sesiones pagadas
+                    if resultado["sesiones_pagadas"]:
+                        mensaje_detalle += f"✓ Sesiones pagadas: {len(resultado['sesiones_pagadas'])}\n"
+                        for sesion in resultado["sesiones_pagadas"]:
+                            mensaje_detalle += f"  • {sesion['tipo']} ({sesion['fecha']}) - ${sesion['precio']:,.2f}\n"
+                        mensaje_detalle += "\n"
+                    
+                    # Informes actualizados
+                    if resultado["informes_actualizados"]:
+                        mensaje_detalle += f"✓ Informes actualizados: {len(resultado['informes_actualizados'])}\n"
+                        for informe in resultado["informes_actualizados"]:
+                            mensaje_detalle += f"  • {informe['tipo']} - ${informe['monto_aplicado']:,.2f} ({informe['nuevo_estado']})\n"
+                        mensaje_detalle += "\n"
+                    
+                    # Saldo a favor
+                    if resultado["saldo_a_favor"] > 0:
+                        mensaje_detalle += f"✓ Saldo a favor: ${resultado['saldo_a_favor']:,.2f}\n\n"
+                    
+                    # Deuda actualizada
+                    deuda_anterior = resultado["deuda_anterior"]
+                    deuda_nueva = resultado["deuda_nueva"]
+                    mensaje_detalle += f"Deuda: ${deuda_anterior:,.2f} → ${deuda_nueva:,.2f}"
+                    
+                    messagebox.showinfo("Pago Registrado", mensaje_detalle)
+                    
+                    # Actualizar solo lo que cambió
+                    self.aplicar_cambios(resultado["cambios"])
+                    
+                    if dialogo.winfo_exists():
+                        dialogo.destroy()
                 
-                dialogo.destroy()
+                # Guardar el pago y APLICARLO AUTOMÁTICAMENTE (en una sola transacción)
+                self.guardar(db.registrar_pago, pago, al_terminar=registrado, indicador=indicador)
                 
             except ValueError as e:
                 messagebox.showerror("Error", f"Datos inválidos: {e}")
             except Exception as e:
                 messagebox.showerror("Error", f"Error al guardar pago: {e}")
         
-        tk.Button(
+        btn_guardar = tk.Button(
             frame_botones,
             text="✓ Guardar",
             command=guardar_pago,
@@ -2615,7 +2515,8 @@ class AplicacionClinica:
             font=("Tahoma", 14, "bold"),
             padx=20,
             pady=5
-        ).pack(side=tk.LEFT, padx=5)
+        )
+        btn_guardar.pack(side=tk.LEFT, padx=5)
         
         tk.Button(
             frame_botones,
@@ -2627,6 +2528,9 @@ class AplicacionClinica:
             padx=20,
             pady=5
         ).pack(side=tk.LEFT, padx=5)
+        
+        # Se muestra mientras se guarda (ver guardar)
+        indicador = IndicadorOcupado(frame_botones, botones=[btn_guardar])
     
     def mostrar_ventana_exportar(self):
         """Muestra la ventana para exportar datos a CSV"""
@@ -2699,83 +2603,98 @@ class AplicacionClinica:
             if not directorio:
                 return
             
-            try:
-                # Crear lista de opciones seleccionadas
-                opciones_export = []
-                if var_pacientes.get():
-                    opciones_export.append('pacientes')
-                if var_sesiones.get():
-                    opciones_export.append('sesiones')
-                if var_pagos.get():
-                    opciones_export.append('pagos')
-                if var_informes.get():
-                    opciones_export.append('informes')
-                if var_resumen.get():
-                    opciones_export.append('resumen')
-                
-                if not opciones_export:
-                    messagebox.showwarning("Advertencia", "Debes seleccionar al menos una opción")
-                    return
-                
-                # Crear carpeta para la exportación
-                from datetime import datetime as dt
-                timestamp = dt.now().strftime("%Y-%m-%d_%H-%M-%S")
-                carpeta_export = Path(directorio) / f"exportacion_{timestamp}"
-                carpeta_export.mkdir(parents=True, exist_ok=True)
-                
-                # Exportar archivos seleccionados
-                archivos_creados = []
-                
-                if 'pacientes' in opciones_export:
-                    db.exportar_pacientes_csv(str(carpeta_export / 'pacientes.csv'))
-                    archivos_creados.append('pacientes.csv')
-                
-                if 'sesiones' in opciones_export:
-                    db.exportar_sesiones_csv(str(carpeta_export / 'sesiones.csv'))
-                    archivos_creados.append('sesiones.csv')
-                
-                if 'pagos' in opciones_export:
-                    db.exportar_pagos_csv(str(carpeta_export / 'pagos.csv'))
-                    archivos_creados.append('pagos.csv')
-                
-                if 'informes' in opciones_export:
-                    db.exportar_informes_csv(str(carpeta_export / 'informes.csv'))
-                    archivos_creados.append('informes.csv')
-                
-                if 'resumen' in opciones_export:
-                    db.exportar_resumen_csv(str(carpeta_export / 'resumen.csv'))
-                    archivos_creados.append('resumen.csv')
-                
-                # Mostrar mensaje de éxito
-                mensaje = f"✅ Exportación completada\n\n"
-                mensaje += f"Archivos creados ({len(archivos_creados)}):\n"
-                for archivo in archivos_creados:
-                    mensaje += f"  • {archivo}\n"
-                mensaje += f"\nCarpeta: {carpeta_export.name}\n\n"
-                mensaje += "Puedes abrir estos archivos en:\n"
-                mensaje += "✓ Excel\n✓ Google Sheets\n✓ Cualquier editor de texto"
-                
-                if messagebox.showinfo("Éxito", mensaje):
-                    pass
-                
-                # Preguntar si abrir la carpeta
-                if messagebox.askyesno("Abrir carpeta", "¿Deseas abrir la carpeta con los archivos?"):
-                    import subprocess
-                    import platform
-                    
-                    if platform.system() == 'Windows':
-                        os.startfile(str(carpeta_export))
-                    elif platform.system() == 'Darwin':  # macOS
-                        subprocess.Popen(['open', str(carpeta_export)])
-                    else:  # Linux
-                        subprocess.Popen(['xdg-open', str(carpeta_export)])
-                
-                ventana_exportar.destroy()
-                
-            except Exception as e:
-                messagebox.showerror("Error", f"Error durante la exportación:\n{e}")
+            # Crear lista de opciones seleccionadas
+            opciones_export = []
+            if var_pacientes.get():
+                opciones_export.append('pacientes')
+            if var_sesiones.get():
+                opciones_export.append('sesiones')
+            if var_pagos.get():
+                opciones_export.append('pagos')
+            if var_informes.get():
+                opciones_export.append('informes')
+            if var_resumen.get():
+                opciones_export.append('resumen')
+            
+            if not opciones_export:
+                messagebox.showwarning("Advertencia", "Debes seleccionar al menos una opción")
+                return
+            
+            # Crear carpeta para la exportación
+            from datetime import datetime as dt
+            timestamp = dt.now().strftime("%Y-%m-%d_%H-%M-%S")
+            carpeta_export = Path(directorio) / f"exportacion_{timestamp}"
+            
+            indicador.mostrar("Exportando...")
+            self.tareas.ejecutar(
+                exportar_archivos, carpeta_export, opciones_export,
+                al_terminar=lambda archivos: exportacion_terminada(carpeta_export, archivos),
+                al_fallar=error_exportacion, ventana=ventana_exportar
+            )
         
-        tk.Button(
+        def exportar_archivos(carpeta_export, opciones_export):
+            """Escribe los CSV seleccionados (corre en el hilo de tareas)"""
+            carpeta_export.mkdir(parents=True, exist_ok=True)
+            
+            # Exportar archivos seleccionados
+            archivos_creados = []
+            
+            if 'pacientes' in opciones_export:
+                db.exportar_pacientes_csv(str(carpeta_export / 'pacientes.csv'))
+                archivos_creados.append('pacientes.csv')
+            
+            if 'sesiones' in opciones_export:
+                db.exportar_sesiones_csv(str(carpeta_export / 'sesiones.csv'))
+                archivos_creados.append('sesiones.csv')
+            
+            if 'pagos' in opciones_export:
+                db.exportar_pagos_csv(str(carpeta_export / 'pagos.csv'))
+                archivos_creados.append('pagos.csv')
+            
+            if 'informes' in opciones_export:
+                db.exportar_informes_csv(str(carpeta_export / 'informes.csv'))
+                archivos_creados.append('informes.csv')
+            
+            if 'resumen' in opciones_export:
+                db.exportar_resumen_csv(str(carpeta_export / 'resumen.csv'))
+                archivos_creados.append('resumen.csv')
+            
+            return archivos_creados
+        
+        def error_exportacion(e):
+            indicador.ocultar()
+            messagebox.showerror("Error", f"Error durante la exportación:\n{e}", parent=ventana_exportar)
+        
+        def exportacion_terminada(carpeta_export, archivos_creados):
+            indicador.ocultar()
+            
+            # Mostrar mensaje de éxito
+            mensaje = f"✅ Exportación completada\n\n"
+            mensaje += f"Archivos creados ({len(archivos_creados)}):\n"
+            for archivo in archivos_creados:
+                mensaje += f"  • {archivo}\n"
+            mensaje += f"\nCarpeta: {carpeta_export.name}\n\n"
+            mensaje += "Puedes abrir estos archivos en:\n"
+            mensaje += "✓ Excel\n✓ Google Sheets\n✓ Cualquier editor de texto"
+            
+            if messagebox.showinfo("Éxito", mensaje):
+                pass
+            
+            # Preguntar si abrir la carpeta
+            if messagebox.askyesno("Abrir carpeta", "¿Deseas abrir la carpeta con los archivos?"):
+                import subprocess
+                import platform
+                
+                if platform.system() == 'Windows':
+                    os.startfile(str(carpeta_export))
+                elif platform.system() == 'Darwin':  # macOS
+                    subprocess.Popen(['open', str(carpeta_export)])
+                else:  # Linux
+                    subprocess.Popen(['xdg-open', str(carpeta_export)])
+            
+            ventana_exportar.destroy()
+        
+        btn_exportar = tk.Button(
             frame_botones,
             text="✓ Exportar",
             command=exportar,
@@ -2786,7 +2705,8 @@ class AplicacionClinica:
             pady=8,
             relief=tk.FLAT,
             cursor="hand2"
-        ).pack(side=tk.LEFT, padx=10)
+        )
+        btn_exportar.pack(side=tk.LEFT, padx=10)
         
         tk.Button(
             frame_botones,
@@ -2801,6 +2721,9 @@ class AplicacionClinica:
             cursor="hand2"
         ).pack(side=tk.LEFT, padx=10)
         
+        # Se muestra mientras se escriben los archivos
+        indicador = IndicadorOcupado(frame_botones, botones=[btn_exportar])
+        
         # Información adicional
         frame_info = tk.Frame(ventana_exportar, bg="#e8f8f5", relief=tk.SOLID, borderwidth=1)
         frame_info.pack(fill=tk.BOTH, padx=20, pady=10)
@@ -2847,15 +2770,20 @@ class AplicacionClinica:
         frame_botones_top.pack(fill=tk.X, padx=20, pady=10)
         
         def crear_backup_manual():
-            """Crea un backup manual"""
-            try:
-                ruta = db.crear_backup()
-                messagebox.showinfo("Éxito", f"Backup creado:\n{ruta}")
+            """Crea un backup manual (la copia se hace en el hilo de tareas)"""
+            def creado(ruta):
+                indicador.ocultar()
+                messagebox.showinfo("Éxito", f"Backup creado:\n{ruta}", parent=ventana_backups)
                 actualizar_lista_backups()
-            except Exception as e:
-                messagebox.showerror("Error", f"Error al crear backup:\n{e}")
+            
+            def error(e):
+                indicador.ocultar()
+                messagebox.showerror("Error", f"Error al crear backup:\n{e}", parent=ventana_backups)
+            
+            indicador.mostrar("Creando backup...")
+            self.tareas.ejecutar(db.crear_backup, al_terminar=creado, al_fallar=error, ventana=ventana_backups)
         
-        tk.Button(
+        btn_crear = tk.Button(
             frame_botones_top,
             text="💾 Crear Backup Ahora",
             command=crear_backup_manual,
@@ -2866,7 +2794,11 @@ class AplicacionClinica:
             pady=8,
             relief=tk.FLAT,
             cursor="hand2"
-        ).pack(side=tk.LEFT, padx=5)
+        )
+        btn_crear.pack(side=tk.LEFT, padx=5)
+        
+        # Se muestra mientras se crea o se restaura un backup
+        indicador = IndicadorOcupado(frame_botones_top, botones=[btn_crear])
         
         tk.Label(
             frame_botones_top,
@@ -2895,6 +2827,20 @@ class AplicacionClinica:
         canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         
+        def restaurado(_resultado):
+            ventana_backups.grab_release()
+            indicador.ocultar()
+            messagebox.showinfo(
+                "Éxito", "Backup restaurado correctamente.\nPor favor, reinicia la aplicación.",
+                parent=ventana_backups
+            )
+            actualizar_lista_backups()
+        
+        def error_restaurar(e):
+            ventana_backups.grab_release()
+            indicador.ocultar()
+            messagebox.showerror("Error", f"Error al restaurar:\n{e}", parent=ventana_backups)
+        
         def actualizar_lista_backups():
             """Actualiza la lista de backups"""
             for widget in frame_lista.winfo_children():
@@ -2948,12 +2894,14 @@ class AplicacionClinica:
                         f"¿Restaurar backup de {backup['fecha']}?\n\n"
                         "Se creará un backup de la versión actual antes de restaurar."
                     ):
-                        try:
-                            db.restaurar_backup(ruta_backup)
-                            messagebox.showinfo("Éxito", "Backup restaurado correctamente.\nPor favor, reinicia la aplicación.")
-                            actualizar_lista_backups()
-                        except Exception as e:
-                            messagebox.showerror("Error", f"Error al restaurar:\n{e}")
+                        # Mientras se reemplaza el archivo de la base no se
+                        # puede usar el resto de la aplicación
+                        ventana_backups.grab_set()
+                        indicador.mostrar("Restaurando...")
+                        self.tareas.ejecutar(
+                            db.restaurar_backup, ruta_backup,
+                            al_terminar=restaurado, al_fallar=error_restaurar, ventana=ventana_backups
+                        )
                 
                 tk.Button(
                     frame_buttons,
@@ -2998,11 +2946,42 @@ class AplicacionClinica:
 
 def iniciar_aplicacion():
     """Función para iniciar la aplicación"""
+    inicio = time.perf_counter()
     root = tk.Tk()
     app = AplicacionClinica(root)
     
+    def ventana_lista():
+        """Avisa (en la consola) si la ventana tardó más que el presupuesto en responder"""
+        duracion = time.perf_counter() - inicio
+        if duracion > PRESUPUESTO_INICIO:
+            print(f"Inicio lento: la ventana tardó {duracion:.2f} s en responder "
+                  f"(presupuesto: {PRESUPUESTO_INICIO:.2f} s)")
+    
+    # Se ejecuta cuando el mainloop ya dibujó la ventana y no tiene nada pendiente
+    root.after_idle(ventana_lista)
+    
     def al_cerrar():
         """Función que se ejecuta al cerrar la aplicación"""
+        # Esperar a que termine la tarea en curso (ej: un backup a medio copiar)
+        app.tareas.cerrar()
+        
+        # Lista de pacientes para mostrarla al volver a abrir (se guarda con
+        # la base ya cerrada, ver snapshot_pacientes.guardar)
+        try:
+            pacientes = db.obtener_todos_pacientes()
+        except Exception as e:
+            pacientes = None
+            print(f"Error al leer la lista de pacientes: {e}")
+        
+        # Cerrar las conexiones a la base antes de copiarla
+        db.cerrar_conexiones()
+        
+        if pacientes is not None:
+            try:
+                snapshot_pacientes.guardar(pacientes)
+            except OSError as e:
+                print(f"Error al guardar la lista de pacientes: {e}")
+
         try:
             # Crear un backup automático antes de cerrar
             db.crear_backup()
@@ -0,0 +1,127 @@
+"""
+Herramientas de mantenimiento de la base de datos, para usar desde la consola
+(en la carpeta de la aplicación, donde está data/clinica.db):
+
+    python -m src.herramientas reconstruir-resumen
+    python -m src.herramientas tiempo-inicio
+"""
+import argparse
+import subprocess
+import sys
+import time
+from typing import List, Tuple
+
+import src.database as db
+from src.busqueda import IndicePacientes
+from src.config import PRESUPUESTO_INICIO
+
+
+def _reconstruir_resumen(_args) -> int:
+    """Recalcula la tabla resumen_mensual desde cero"""
+    db.reconstruir_resumen_mensual()
+    print("Resumen mensual reconstruido.")
+    return 0
+
+
+def _leer_importtime(salida: str) -> Tuple[int, List[Tuple[int, str]]]:
+    """
+    Interpreta la salida de python -X importtime: retorna el tiempo total (en
+    microsegundos, la suma de los módulos importados directamente) y la lista
+    de (tiempo propio, módulo) de todos los módulos.
+    """
+    total = 0
+    modulos = []
+    for linea in salida.splitlines():
+        if not linea.startswith("import time:") or "self [us]" in linea:
+            continue
+        propio, acumulado, nombre = linea[len("import time:"):].split("|")
+        modulos.append((int(propio), nombre.strip()))
+        # Los módulos importados por otro están indentados bajo él
+        if not nombre.startswith("  "):
+            total += int(acumulado)
+    return total, modulos
+
+
+def _tiempo_inicio(args) -> int:
+    """
+    Mide las partes del inicio de la aplicación que se ejecutan antes de que
+    la ventana responda (sin abrirla) y las compara con PRESUPUESTO_INICIO.
+    Retorna 1 si se pasa del presupuesto.
+    """
+    # Las importaciones se miden en un proceso nuevo: en este ya están hechas
+    proceso = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import src.gui"],
+        capture_output=True, text=True
+    )
+    if proceso.returncode != 0:
+        print(proceso.stderr)
+        return 1
+    total_importaciones, modulos = _leer_importtime(proceso.stderr)
+    
+    print(f"Módulos más lentos de importar (de {len(modulos)}):")
+    for propio, nombre in sorted(modulos, reverse=True)[:args.cantidad]:
+        print(f"  {propio / 1000:8.1f} ms  {nombre}")
+    
+    # Como al abrir la aplicación: incluye abrir la primera conexión y, con el
+    # esquema al día (el caso normal), solo consultar user_version
+    inicio = time.perf_counter()
+    db.inicializar_base_datos()
+    inicializacion = time.perf_counter() - inicio
+    
+    # La lista de pacientes se carga en segundo plano: no cuenta para el
+    # presupuesto, pero conviene ver cuánto tarda en aparecer
+    inicio = time.perf_counter()
+    indice = IndicePacientes(db.obtener_todos_pacientes())
+    lista = time.perf_counter() - inicio
+    
+    antes_de_la_ventana = total_importaciones / 1_000_000 + inicializacion
+    print()
+    print(f"Importaciones:            {total_importaciones / 1000:8.1f} ms")
+    print(f"Inicializar la base:      {inicializacion * 1000:8.1f} ms")
+    print(f"Total antes de la ventana:{antes_de_la_ventana * 1000:8.1f} ms "
+          f"(presupuesto: {PRESUPUESTO_INICIO * 1000:.0f} ms)")
+    print(f"Lista de pacientes ({len(indice)}, en segundo plano): {lista * 1000:.1f} ms")
+    
+    if antes_de_la_ventana > PRESUPUESTO_INICIO:
+        print("Se pasa del presupuesto de inicio.")
+        return 1
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m src.herramientas",
+        description="Herramientas de mantenimiento de la base de datos de la clínica"
+    )
+    comandos = parser.add_subparsers(dest="comando", required=True)
+    
+    comandos.add_parser(
+        "reconstruir-resumen",
+        help="Recalcula la tabla resumen_mensual a partir de sesiones, pagos e informes"
+    ).set_defaults(funcion=_reconstruir_resumen)
+    
+    tiempo_inicio = comandos.add_parser(
+        "tiempo-inicio",
+        help="Mide cuánto tarda en iniciar la aplicación (importaciones, base de datos) "
+             "y lo compara con el presupuesto de inicio"
+    )
+    tiempo_inicio.add_argument(
+        "--cantidad", type=int, default=15,
+        help="Cantidad de módulos más lentos que se muestran (por defecto 15)"
+    )
+    tiempo_inicio.set_defaults(funcion=_tiempo_inicio)
+    
+    args = parser.parse_args(argv)
+    
+    # Asegura que el esquema esté actualizado antes de tocar nada
+    # (tiempo-inicio lo hace dentro de lo que mide, como la aplicación)
+    if args.comando != "tiempo-inicio":
+        db.inicializar_base_datos()
+    try:
+        return args.funcion(args)
+    finally:
+        db.cerrar_conexiones()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,857 @@
+import sqlite3
+from typing import Callable, List, Tuple, Union
+
+# Cada migración es (versión, descripción, pasos).
+# Un paso es una sentencia SQL o una función que recibe la conexión.
+# La versión aplicada se guarda en PRAGMA user_version: NUNCA modificar una
+# migración ya publicada, siempre agregar una nueva al final de la lista.
+Paso = Union[str, Callable[[sqlite3.Connection], None]]
+
+
+# ========== PASOS DE MIGRACIÓN EN PYTHON ==========
+
+# Tablas con columnas de dinero: (tabla, definición nueva, SELECT que copia los
+# datos). SQLite no permite cambiar el tipo de una columna: hay que rehacer la tabla.
+_TABLAS_EN_CENTAVOS = [
+    ("pacientes", """
+        CREATE TABLE pacientes (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            nombre TEXT NOT NULL,
+            tipo TEXT NOT NULL,
+            costo_sesion INTEGER NOT NULL,
+            deuda INTEGER NOT NULL,
+            arancel_social INTEGER NOT NULL,
+            notas TEXT,
+            fecha_creacion TEXT NOT NULL
+        )
+    """, """
+        SELECT id, nombre, tipo,
+               CAST(ROUND(costo_sesion * 100) AS INTEGER),
+               CAST(ROUND(deuda * 100) AS INTEGER),
+               arancel_social, notas, fecha_creacion
+        FROM pacientes_anterior
+    """),
+    ("sesiones", """
+        CREATE TABLE sesiones (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            paciente_id INTEGER NOT NULL,
+            fecha TEXT NOT NULL,
+            precio INTEGER NOT NULL,
+            estado TEXT NOT NULL,
+            tipo TEXT NOT NULL,
+            notas TEXT,
+            FOREIGN KEY (paciente_id) REFERENCES pacientes(id)
+        )
+    """, """
+        SELECT id, paciente_id, fecha,
+               CAST(ROUND(precio * 100) AS INTEGER),
+               estado, tipo, notas
+        FROM sesiones_anterior
+    """),
+    ("pagos", """
+        CREATE TABLE pagos (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            paciente_id INTEGER NOT NULL,
+            fecha TEXT NOT NULL,
+            monto INTEGER NOT NULL,
+            concepto TEXT NOT NULL,
+            notas TEXT,
+            FOREIGN KEY (paciente_id) REFERENCES pacientes(id)
+        )
+    """, """
+        SELECT id, paciente_id, fecha,
+               CAST(ROUND(monto * 100) AS INTEGER),
+               concepto, notas
+        FROM pagos_anterior
+    """),
+    ("informes", """
+        CREATE TABLE informes (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            paciente_id INTEGER NOT NULL,
+            tipo TEXT NOT NULL,
+            estado TEXT NOT NULL,
+            estado_pago TEXT NOT NULL,
+            precio INTEGER NOT NULL,
+            monto_pagado INTEGER NOT NULL,
+            notas TEXT,
+            fecha_creacion TEXT NOT NULL,
+            FOREIGN KEY (paciente_id) REFERENCES pacientes(id)
+        )
+    """, """
+        SELECT id, paciente_id, tipo, estado, estado_pago,
+               CAST(ROUND(precio * 100) AS INTEGER),
+               CAST(ROUND(monto_pagado * 100) AS INTEGER),
+               notas, fecha_creacion
+        FROM informes_anterior
+    """),
+]
+
+
+def _montos_a_centavos(conn: sqlite3.Connection):
+    """
+    Rehace las tablas con los montos en centavos enteros.
+    Primero renombra las tablas viejas (SQLite actualiza las FOREIGN KEY que
+    las apuntan), así se pueden borrar al final sin desactivar las foreign keys.
+    Los índices y triggers se guardan antes y se vuelven a crear sobre las
+    tablas nuevas (los triggers de deuda sirven igual para centavos).
+    """
+    tablas = [tabla for tabla, _crear, _copiar in _TABLAS_EN_CENTAVOS]
+    marcas = ",".join("?" * len(tablas))
+    indices_y_triggers = [sql for (sql,) in conn.execute(f"""
+        SELECT sql FROM sqlite_master
+        WHERE type IN ('index', 'trigger') AND tbl_name IN ({marcas}) AND sql IS NOT NULL
+        ORDER BY type, name
+    """, tablas)]
+    # Último id usado por AUTOINCREMENT, para no reutilizar ids borrados
+    secuencias = conn.execute(
+        f"SELECT name, seq FROM sqlite_sequence WHERE name IN ({marcas})", tablas
+    ).fetchall()
+    
+    for tabla, crear, copiar in _TABLAS_EN_CENTAVOS:
+        conn.execute(f"ALTER TABLE {tabla} RENAME TO {tabla}_anterior")
+        conn.execute(crear)
+        conn.execute(f"INSERT INTO {tabla} {copiar}")
+    
+    # Primero las tablas que apuntan a pacientes, después pacientes
+    for tabla in reversed(tablas):
+        conn.execute(f"DROP TABLE {tabla}_anterior")
+    
+    for sql in indices_y_triggers:
+        conn.execute(sql)
+    
+    conn.executemany(
+        "UPDATE sqlite_sequence SET seq = MAX(seq, ?) WHERE name = ?",
+        [(seq, nombre) for nombre, seq in secuencias]
+    )
+
+
+# ========== RESUMEN MENSUAL ==========
+
+def _sumar_al_resumen(fila: str, mes: str, facturado="0", cobrado="0", informes="0") -> str:
+    """
+    Arma el UPSERT que suma los montos dados (expresiones SQL) al renglón
+    (paciente_id, mes) de resumen_mensual, creándolo si no existe.
+    fila es NEW u OLD; para restar se pasan los montos con signo negativo.
+    """
+    return f"""
+    INSERT INTO resumen_mensual (paciente_id, mes, facturado, cobrado, informes)
+    VALUES ({fila}.paciente_id, substr({mes}, 1, 7), {facturado}, {cobrado}, {informes})
+    ON CONFLICT (paciente_id, mes) DO UPDATE SET
+        facturado = facturado + excluded.facturado,
+        cobrado = cobrado + excluded.cobrado,
+        informes = informes + excluded.informes;
+"""
+
+
+def _montos_sesion(fila: str, signo: str) -> dict:
+    return {"facturado": f"{signo}{fila}.precio"}
+
+
+def _montos_pago(fila: str, signo: str) -> dict:
+    return {"cobrado": f"{signo}{fila}.monto"}
+
+
+def _montos_informe(fila: str, signo: str) -> dict:
+    return {"informes": f"{signo}{fila}.precio"}
+
+
+# (tabla, columna de fecha, columnas que afectan los montos, montos del renglón)
+_TABLAS_RESUMEN = [
+    ("sesiones", "fecha", "paciente_id, fecha, precio", _montos_sesion),
+    ("pagos", "fecha", "paciente_id, fecha, monto", _montos_pago),
+    ("informes", "fecha_creacion", "paciente_id, fecha_creacion, precio", _montos_informe),
+]
+
+
+def _triggers_resumen() -> List[str]:
+    """
+    Triggers que mantienen resumen_mensual: al insertar se suma el renglón
+    nuevo, al borrar se resta el viejo, y al modificar se hacen las dos cosas
+    (el registro puede haber cambiado de paciente o de mes).
+    """
+    triggers = []
+    for tabla, fecha, columnas, montos in _TABLAS_RESUMEN:
+        cambio = " OR ".join(f"OLD.{c} IS NOT NEW.{c}" for c in columnas.split(", "))
+        for evento, condicion, cuerpo in (
+            ("INSERT", "", _sumar_al_resumen("NEW", f"NEW.{fecha}", **montos("NEW", ""))),
+            ("DELETE", "", _sumar_al_resumen("OLD", f"OLD.{fecha}", **montos("OLD", "-"))),
+            (f"UPDATE OF {columnas}", f"WHEN {cambio}",
+             _sumar_al_resumen("OLD", f"OLD.{fecha}", **montos("OLD", "-"))
+             + _sumar_al_resumen("NEW", f"NEW.{fecha}", **montos("NEW", ""))),
+        ):
+            nombre = f"trg_resumen_{tabla}_{evento.split()[0].lower()}"
+            triggers.append(
+                f"CREATE TRIGGER IF NOT EXISTS {nombre} AFTER {evento} ON {tabla} {condicion}\n"
+                f"BEGIN{cuerpo}END"
+            )
+    return triggers
+
+
+# Llenan facturado, cobrado e informes de resumen_mensual a partir de
+# sesiones, pagos e informes (tabla vacía)
+_SQL_LLENAR_RESUMEN = [
+    """
+    INSERT INTO resumen_mensual (paciente_id, mes, facturado)
+    SELECT paciente_id, substr(fecha, 1, 7), SUM(precio)
+    FROM sesiones
+    GROUP BY paciente_id, substr(fecha, 1, 7)
+    """,
+    """
+    INSERT INTO resumen_mensual (paciente_id, mes, cobrado)
+    SELECT paciente_id, substr(fecha, 1, 7), SUM(monto)
+    FROM pagos
+    WHERE true
+    GROUP BY paciente_id, substr(fecha, 1, 7)
+    ON CONFLICT (paciente_id, mes) DO UPDATE SET cobrado = excluded.cobrado
+    """,
+    """
+    INSERT INTO resumen_mensual (paciente_id, mes, informes)
+    SELECT paciente_id, substr(fecha_creacion, 1, 7), SUM(precio)
+    FROM informes
+    WHERE true
+    GROUP BY paciente_id, substr(fecha_creacion, 1, 7)
+    ON CONFLICT (paciente_id, mes) DO UPDATE SET informes = excluded.informes
+    """,
+]
+
+
+def _llenar_montos_resumen(conn: sqlite3.Connection):
+    """Llena resumen_mensual (vacía) con lo facturado, cobrado e informes de cada mes"""
+    for sql in _SQL_LLENAR_RESUMEN:
+        conn.execute(sql)
+
+
+def llenar_resumen_mensual(conn: sqlite3.Connection):
+    """Recalcula resumen_mensual desde cero con los datos actuales (también la deuda al cierre)"""
+    conn.execute("DELETE FROM resumen_mensual")
+    _llenar_montos_resumen(conn)
+    llenar_deuda_al_cierre(conn)
+
+
+# ========== DEUDA AL CIERRE DE CADA MES ==========
+
+# resumen_mensual.deuda_cierre es la deuda del paciente al terminar el mes (lo
+# mismo que pacientes.deuda en ese momento, con saldo a favor y ajustes) e
+# informes_cierre la parte que faltaba cobrar de informes. Cada cambio de la
+# deuda es un movimiento con fecha que se suma al renglón de su mes y a los
+# de los meses siguientes: un mes sin renglón tiene la deuda del último
+# renglón anterior. Un renglón nuevo arranca con la deuda del anterior.
+#
+# Fecha de cada movimiento:
+# - sesión: su precio en su fecha y, si ya no está pendiente, el pago en
+#   fecha_pago (o en la fecha de la sesión, si se pagó antes)
+# - informe: su precio en fecha_creacion y lo pagado en fecha_pago, que es la
+#   del último cambio del pago (los pagos parciales sucesivos se suman cada
+#   uno en su fecha, ver _triggers_deuda_al_cierre)
+# - saldo a favor, ajustes y demás cambios directos de pacientes.deuda: los
+#   hace database._mover_deuda, con la fecha que corresponde
+
+def _mover_deuda_al_cierre(paciente: str, fecha: str, deuda: str, informes: str = "0") -> List[str]:
+    """
+    Sentencias que suman deuda e informes (expresiones SQL, en centavos) a la
+    deuda al cierre del paciente desde el mes de fecha en adelante.
+    """
+    mes = f"substr({fecha}, 1, 7)"
+    return [
+        f"INSERT INTO resumen_mensual (paciente_id, mes) VALUES ({paciente}, {mes})\n"
+        f"ON CONFLICT (paciente_id, mes) DO NOTHING",
+        f"UPDATE resumen_mensual\n"
+        f"SET deuda_cierre = deuda_cierre + {deuda}, informes_cierre = informes_cierre + {informes}\n"
+        f"WHERE paciente_id = {paciente} AND mes >= {mes}",
+    ]
+
+
+# Para database._mover_deuda (parámetros :paciente_id, :fecha y :deuda)
+MOVER_DEUDA_AL_CIERRE = _mover_deuda_al_cierre(":paciente_id", ":fecha", ":deuda")
+
+
+def _fecha_efectiva(fila: str, fecha: str) -> str:
+    """Fecha del pago de la fila: fecha_pago, pero nunca antes que la fecha del registro"""
+    return f"MAX({fila}.{fecha}, COALESCE({fila}.fecha_pago, {fila}.{fecha}))"
+
+
+def _movimientos_sesion(fila: str) -> List[Tuple[str, str, str]]:
+    """Movimientos de deuda de una sesión: [(fecha, deuda, informes)] (expresiones SQL)"""
+    return [
+        (f"{fila}.fecha", f"{fila}.precio", "0"),
+        (_fecha_efectiva(fila, "fecha"),
+         f"(CASE WHEN {fila}.estado != 'PENDIENTE' THEN -{fila}.precio ELSE 0 END)", "0"),
+    ]
+
+
+def _pagado_informe(fila: str) -> str:
+    return f"(CASE WHEN {fila}.estado_pago = 'PAGADO' THEN {fila}.precio ELSE {fila}.monto_pagado END)"
+
+
+def _movimientos_informe(fila: str) -> List[Tuple[str, str, str]]:
+    """Movimientos de deuda de un informe: [(fecha, deuda, informes)] (expresiones SQL)"""
+    pagado = _pagado_informe(fila)
+    return [
+        (f"{fila}.fecha_creacion", f"{fila}.precio", f"{fila}.precio"),
+        (_fecha_efectiva(fila, "fecha_creacion"), f"-{pagado}", f"-{pagado}"),
+    ]
+
+
+def _sql_movimientos(fila: str, movimientos, signo: str = "") -> str:
+    """Cuerpo de trigger que aplica los movimientos de la fila (con signo - para deshacerlos)"""
+    return "".join(
+        f"{sql};\n"
+        for fecha, deuda, informes in movimientos(fila)
+        for sql in _mover_deuda_al_cierre(f"{fila}.paciente_id", fecha, f"{signo}({deuda})", f"{signo}({informes})")
+    )
+
+
+def _triggers_deuda_al_cierre() -> List[str]:
+    """
+    Triggers que mantienen deuda_cierre e informes_cierre de resumen_mensual.
+    Como los de _triggers_resumen, al modificar una sesión se deshacen sus
+    movimientos viejos y se aplican los nuevos. En un informe, si solo cambió
+    el pago, la diferencia de lo pagado se suma en la nueva fecha_pago: así
+    cada pago parcial queda en su mes. Al eliminar o cambiar de mes un informe
+    pagado en partes se deshace todo lo pagado en su última fecha_pago.
+    """
+    triggers = [
+        # Un renglón nuevo arranca con la deuda al cierre del último renglón anterior
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_resumen_mensual_insert AFTER INSERT ON resumen_mensual
+        BEGIN
+            UPDATE resumen_mensual
+            SET (deuda_cierre, informes_cierre) = (
+                SELECT deuda_cierre, informes_cierre FROM resumen_mensual
+                WHERE paciente_id = NEW.paciente_id AND mes < NEW.mes
+                ORDER BY mes DESC LIMIT 1
+            )
+            WHERE paciente_id = NEW.paciente_id AND mes = NEW.mes
+              AND EXISTS (SELECT 1 FROM resumen_mensual
+                          WHERE paciente_id = NEW.paciente_id AND mes < NEW.mes);
+        END
+        """,
+    ]
+    
+    for tabla, columnas, movimientos in (
+        ("sesiones", "paciente_id, fecha, precio, estado, fecha_pago", _movimientos_sesion),
+        ("informes", "paciente_id, fecha_creacion, precio", _movimientos_informe),
+    ):
+        cambio = " OR ".join(f"OLD.{c} IS NOT NEW.{c}" for c in columnas.split(", "))
+        for evento, condicion, cuerpo in (
+            ("INSERT", "", _sql_movimientos("NEW", movimientos)),
+            ("DELETE", "", _sql_movimientos("OLD", movimientos, "-")),
+            ("UPDATE", f"WHEN {cambio}",
+             _sql_movimientos("OLD", movimientos, "-") + _sql_movimientos("NEW", movimientos)),
+        ):
+            nombre = f"trg_deuda_cierre_{tabla}_{evento.lower()}"
+            triggers.append(
+                f"CREATE TRIGGER IF NOT EXISTS {nombre} AFTER {evento} ON {tabla} {condicion}\n"
+                f"BEGIN\n{cuerpo}END"
+            )
+    
+    # Informe al que solo le cambió el pago (pago automático o marcado a mano)
+    diferencia = f"({_pagado_informe('OLD')} - {_pagado_informe('NEW')})"
+    cuerpo = "".join(
+        f"{sql};\n"
+        for sql in _mover_deuda_al_cierre(
+            "NEW.paciente_id", _fecha_efectiva("NEW", "fecha_creacion"), diferencia, diferencia
+        )
+    )
+    triggers.append(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_deuda_cierre_informes_pago
+        AFTER UPDATE OF monto_pagado, estado_pago ON informes
+        WHEN OLD.paciente_id IS NEW.paciente_id AND OLD.fecha_creacion IS NEW.fecha_creacion
+         AND OLD.precio IS NEW.precio AND {_pagado_informe('OLD')} IS NOT {_pagado_informe('NEW')}
+        BEGIN
+        {cuerpo}END
+    """)
+    return triggers
+
+
+def llenar_deuda_al_cierre(conn: sqlite3.Connection):
+    """
+    Calcula desde cero deuda_cierre e informes_cierre de resumen_mensual.
+    Lo que la deuda actual de cada paciente tiene de más o de menos respecto
+    de sus movimientos (saldo a favor usado en sesiones, deuda cargada al
+    crear el paciente, reparaciones de la deuda) se toma como del mes en que
+    se creó el paciente. De un informe pagado en partes se toma todo lo
+    pagado en su fecha_pago.
+    """
+    movimientos = [
+        f"SELECT paciente_id, substr({fecha}, 1, 7), {deuda}, {informes} FROM {tabla}"
+        for tabla, movimientos_fila in (("sesiones", _movimientos_sesion), ("informes", _movimientos_informe))
+        for fecha, deuda, informes in movimientos_fila(tabla)
+    ] + [
+        "SELECT paciente_id, substr(fecha, 1, 7), -saldo_a_favor, 0 FROM pagos WHERE saldo_a_favor != 0",
+        "SELECT paciente_id, substr(fecha, 1, 7), deuda_nueva - deuda_anterior, 0 FROM ajustes_deuda",
+    ]
+    
+    conn.execute("DROP TABLE IF EXISTS temp.movimientos_deuda")
+    conn.execute("CREATE TEMP TABLE movimientos_deuda (paciente_id, mes, deuda, informes)")
+    conn.execute(f"INSERT INTO temp.movimientos_deuda {' UNION ALL '.join(movimientos)}")
+    conn.execute("""
+        INSERT INTO temp.movimientos_deuda
+        SELECT p.id, substr(p.fecha_creacion, 1, 7), p.deuda - COALESCE(SUM(m.deuda), 0), 0
+        FROM pacientes p
+        LEFT JOIN temp.movimientos_deuda m ON m.paciente_id = p.id
+        GROUP BY p.id
+        HAVING p.deuda != COALESCE(SUM(m.deuda), 0)
+    """)
+    # Primero se crean los renglones que faltan y después se les pone la suma
+    # acumulada de los movimientos, mes a mes
+    conn.execute("""
+        INSERT INTO resumen_mensual (paciente_id, mes)
+        SELECT DISTINCT paciente_id, mes FROM temp.movimientos_deuda
+        WHERE true
+        ON CONFLICT (paciente_id, mes) DO NOTHING
+    """)
+    conn.execute("""
+        INSERT INTO resumen_mensual (paciente_id, mes, deuda_cierre, informes_cierre)
+        SELECT paciente_id, mes, SUM(SUM(deuda)) OVER por_mes, SUM(SUM(informes)) OVER por_mes
+        FROM (
+            SELECT paciente_id, mes, deuda, informes FROM temp.movimientos_deuda
+            UNION ALL
+            SELECT paciente_id, mes, 0, 0 FROM resumen_mensual
+        )
+        WHERE true
+        GROUP BY paciente_id, mes
+        WINDOW por_mes AS (PARTITION BY paciente_id ORDER BY mes)
+        ON CONFLICT (paciente_id, mes) DO UPDATE SET
+            deuda_cierre = excluded.deuda_cierre,
+            informes_cierre = excluded.informes_cierre
+    """)
+    conn.execute("DROP TABLE temp.movimientos_deuda")
+
+
+# ========== CIERRE DE MES ==========
+
+# Prefijo de los errores de los triggers de meses cerrados (database.py lo
+# usa para reconocerlos y convertirlos en PeriodoCerradoError)
+MARCA_MES_CERRADO = "Mes cerrado"
+
+# (tabla, columna de fecha, columnas que no pueden cambiar en un mes cerrado, qué son)
+# Los cambios de estado (sesión paga, informe pagado) se permiten: el cierre ya
+# guardó la deuda que había al terminar el mes.
+_TABLAS_PROTEGIDAS = [
+    ("sesiones", "fecha", "paciente_id, fecha, precio", "sesiones"),
+    ("pagos", "fecha", "paciente_id, fecha, monto", "pagos"),
+    ("informes", "fecha_creacion", "paciente_id, fecha_creacion, precio", "informes"),
+]
+
+
+def _triggers_mes_cerrado() -> List[str]:
+    """
+    Triggers que impiden agregar, borrar o cambiar montos y fechas de
+    registros de un mes cerrado, y que impiden modificar los cierres.
+    """
+    def en_mes_cerrado(*fechas):
+        meses = ", ".join(f"substr({fecha}, 1, 7)" for fecha in fechas)
+        return f"EXISTS (SELECT 1 FROM cierres_mensuales WHERE mes IN ({meses}))"
+    
+    def abortar(mensaje):
+        return f"BEGIN SELECT RAISE(ABORT, '{MARCA_MES_CERRADO}: {mensaje}'); END"
+    
+    triggers = []
+    for tabla, fecha, columnas, nombre in _TABLAS_PROTEGIDAS:
+        cambio = " OR ".join(f"OLD.{c} IS NOT NEW.{c}" for c in columnas.split(", "))
+        triggers += [
+            f"CREATE TRIGGER IF NOT EXISTS trg_cierre_{tabla}_insert BEFORE INSERT ON {tabla}\n"
+            f"WHEN {en_mes_cerrado(f'NEW.{fecha}')}\n"
+            + abortar(f"no se pueden agregar {nombre} a un mes ya cerrado"),
+            f"CREATE TRIGGER IF NOT EXISTS trg_cierre_{tabla}_delete BEFORE DELETE ON {tabla}\n"
+            f"WHEN {en_mes_cerrado(f'OLD.{fecha}')}\n"
+            + abortar(f"no se pueden eliminar {nombre} de un mes ya cerrado"),
+            f"CREATE TRIGGER IF NOT EXISTS trg_cierre_{tabla}_update BEFORE UPDATE OF {columnas} ON {tabla}\n"
+            f"WHEN ({cambio}) AND {en_mes_cerrado(f'OLD.{fecha}', f'NEW.{fecha}')}\n"
+            + abortar(f"no se pueden cambiar {nombre} de un mes ya cerrado"),
+        ]
+    
+    for tabla in ("cierres_mensuales", "cierres_mensuales_pacientes"):
+        for evento in ("UPDATE", "DELETE"):
+            triggers.append(
+                f"CREATE TRIGGER IF NOT EXISTS trg_{tabla}_{evento.lower()} BEFORE {evento} ON {tabla}\n"
+                + abortar("los cierres no se pueden modificar")
+            )
+    return triggers
+
+
+# ========== BÚSQUEDA DE PACIENTES ==========
+
+# Índice de texto completo (FTS5) sobre nombre y notas de los pacientes.
+# - Es de "contenido externo": no duplica los textos, los lee de pacientes.
+# - remove_diacritics: "Jose" encuentra a "José" (y al revés).
+# - pacientes_fts_vocab lista las palabras indexadas (para corregir errores
+#   de tipeo comparando contra palabras que existen, ver database.buscar_pacientes)
+_TABLAS_BUSQUEDA = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS pacientes_fts USING fts5(
+        nombre, notas,
+        content='pacientes', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    "CREATE VIRTUAL TABLE IF NOT EXISTS pacientes_fts_vocab USING fts5vocab(pacientes_fts, 'row')",
+]
+
+# Con contenido externo el índice no se entera solo de los cambios: para
+# sacar un texto hay que pasarle los valores viejos (comando 'delete')
+_TRIGGERS_BUSQUEDA = [
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_pacientes_fts_insert AFTER INSERT ON pacientes
+    BEGIN
+        INSERT INTO pacientes_fts (rowid, nombre, notas) VALUES (NEW.id, NEW.nombre, NEW.notas);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_pacientes_fts_delete AFTER DELETE ON pacientes
+    BEGIN
+        INSERT INTO pacientes_fts (pacientes_fts, rowid, nombre, notas)
+        VALUES ('delete', OLD.id, OLD.nombre, OLD.notas);
+    END
+    """,
+    # Solo nombre y notas: los cambios de deuda (muy frecuentes) no tocan el índice
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_pacientes_fts_update AFTER UPDATE OF nombre, notas ON pacientes
+    BEGIN
+        INSERT INTO pacientes_fts (pacientes_fts, rowid, nombre, notas)
+        VALUES ('delete', OLD.id, OLD.nombre, OLD.notas);
+        INSERT INTO pacientes_fts (rowid, nombre, notas) VALUES (NEW.id, NEW.nombre, NEW.notas);
+    END
+    """,
+]
+
+
+def crear_busqueda_pacientes(conn: sqlite3.Connection):
+    """
+    Crea el índice de búsqueda de pacientes, sus triggers, y lo llena con los
+    pacientes que ya existen.
+    Si el SQLite instalado no tiene FTS5 no hace nada: la búsqueda sigue
+    funcionando sin el índice (ver database.busqueda_disponible).
+    """
+    try:
+        conn.execute(_TABLAS_BUSQUEDA[0])
+    except sqlite3.OperationalError as e:
+        if "fts5" in str(e):
+            return
+        raise
+    
+    for sql in _TABLAS_BUSQUEDA[1:] + _TRIGGERS_BUSQUEDA:
+        conn.execute(sql)
+    conn.execute("INSERT INTO pacientes_fts (pacientes_fts) VALUES ('rebuild')")
+
+
+# ========== MIGRACIONES ==========
+
+MIGRACIONES: List[Tuple[int, str, List[Paso]]] = [
+    (1, "Esquema inicial", [
+        """
+        CREATE TABLE IF NOT EXISTS pacientes (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            nombre TEXT NOT NULL,
+            tipo TEXT NOT NULL,
+            costo_sesion REAL NOT NULL,
+            deuda REAL NOT NULL,
+            arancel_social INTEGER NOT NULL,
+            notas TEXT,
+            fecha_creacion TEXT NOT NULL
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS sesiones (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            paciente_id INTEGER NOT NULL,
+            fecha TEXT NOT NULL,
+            precio REAL NOT NULL,
+            estado TEXT NOT NULL,
+            tipo TEXT NOT NULL,
+            notas TEXT,
+            FOREIGN KEY (paciente_id) REFERENCES pacientes(id)
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS pagos (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            paciente_id INTEGER NOT NULL,
+            fecha TEXT NOT NULL,
+            monto REAL NOT NULL,
+            concepto TEXT NOT NULL,
+            notas TEXT,
+            FOREIGN KEY (paciente_id) REFERENCES pacientes(id)
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS informes (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            paciente_id INTEGER NOT NULL,
+            tipo TEXT NOT NULL,
+            estado TEXT NOT NULL,
+            estado_pago TEXT NOT NULL,
+            precio REAL NOT NULL,
+            monto_pagado REAL NOT NULL,
+            notas TEXT,
+            fecha_creacion TEXT NOT NULL,
+            FOREIGN KEY (paciente_id) REFERENCES pacientes(id)
+        )
+        """,
+    ]),
+
+    (2, "Índices para consultas por paciente, fecha y estado", [
+        # Historial de un paciente ordenado por fecha
+        "CREATE INDEX IF NOT EXISTS idx_sesiones_paciente_fecha ON sesiones (paciente_id, fecha)",
+        "CREATE INDEX IF NOT EXISTS idx_pagos_paciente_fecha ON pagos (paciente_id, fecha)",
+        "CREATE INDEX IF NOT EXISTS idx_informes_paciente_fecha ON informes (paciente_id, fecha_creacion)",
+        # Deuda: sesiones pendientes e informes sin pagar de cada paciente
+        "CREATE INDEX IF NOT EXISTS idx_sesiones_estado_paciente ON sesiones (estado, paciente_id)",
+        "CREATE INDEX IF NOT EXISTS idx_informes_estado_pago_paciente ON informes (estado_pago, paciente_id)",
+        # Pagos de un mes (reporte mensual)
+        "CREATE INDEX IF NOT EXISTS idx_pagos_fecha ON pagos (fecha)",
+        # Lista de pacientes ordenada por nombre
+        "CREATE INDEX IF NOT EXISTS idx_pacientes_nombre ON pacientes (nombre)",
+        "ANALYZE",
+    ]),
+
+    (3, "Triggers que mantienen pacientes.deuda al día", [
+        # Cada sesión PENDIENTE suma su precio a la deuda del paciente y cada
+        # informe no PAGADO suma lo que falta pagar. Los triggers aplican solo
+        # la diferencia de cada cambio, sin recalcular todo el historial.
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_deuda_sesion_insert
+        AFTER INSERT ON sesiones
+        WHEN NEW.estado = 'PENDIENTE'
+        BEGIN
+            UPDATE pacientes SET deuda = deuda + NEW.precio WHERE id = NEW.paciente_id;
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_deuda_sesion_delete
+        AFTER DELETE ON sesiones
+        WHEN OLD.estado = 'PENDIENTE'
+        BEGIN
+            UPDATE pacientes SET deuda = deuda - OLD.precio WHERE id = OLD.paciente_id;
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_deuda_sesion_update
+        AFTER UPDATE OF paciente_id, precio, estado ON sesiones
+        WHEN OLD.paciente_id IS NOT NEW.paciente_id
+          OR OLD.precio IS NOT NEW.precio
+          OR OLD.estado IS NOT NEW.estado
+        BEGIN
+            UPDATE pacientes
+            SET deuda = deuda - (CASE WHEN OLD.estado = 'PENDIENTE' THEN OLD.precio ELSE 0 END)
+            WHERE id = OLD.paciente_id;
+            UPDATE pacientes
+            SET deuda = deuda + (CASE WHEN NEW.estado = 'PENDIENTE' THEN NEW.precio ELSE 0 END)
+            WHERE id = NEW.paciente_id;
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_deuda_informe_insert
+        AFTER INSERT ON informes
+        WHEN NEW.estado_pago != 'PAGADO'
+        BEGIN
+            UPDATE pacientes SET deuda = deuda + (NEW.precio - NEW.monto_pagado)
+            WHERE id = NEW.paciente_id;
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_deuda_informe_delete
+        AFTER DELETE ON informes
+        WHEN OLD.estado_pago != 'PAGADO'
+        BEGIN
+            UPDATE pacientes SET deuda = deuda - (OLD.precio - OLD.monto_pagado)
+            WHERE id = OLD.paciente_id;
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_deuda_informe_update
+        AFTER UPDATE OF paciente_id, precio, monto_pagado, estado_pago ON informes
+        WHEN OLD.paciente_id IS NOT NEW.paciente_id
+          OR OLD.precio IS NOT NEW.precio
+          OR OLD.monto_pagado IS NOT NEW.monto_pagado
+          OR OLD.estado_pago IS NOT NEW.estado_pago
+        BEGIN
+            UPDATE pacientes
+            SET deuda = deuda - (CASE WHEN OLD.estado_pago != 'PAGADO'
+                                      THEN OLD.precio - OLD.monto_pagado ELSE 0 END)
+            WHERE id = OLD.paciente_id;
+            UPDATE pacientes
+            SET deuda = deuda + (CASE WHEN NEW.estado_pago != 'PAGADO'
+                                      THEN NEW.precio - NEW.monto_pagado ELSE 0 END)
+            WHERE id = NEW.paciente_id;
+        END
+        """,
+    ]),
+    
+    (4, "Montos en centavos enteros (INTEGER) en vez de REAL", [
+        _montos_a_centavos,
+        "ANALYZE",
+    ]),
+    
+    (5, "Fechas en texto ISO de largo fijo e índices por fecha", [
+        # Todas las fechas quedan como 'YYYY-MM-DDTHH:MM:SS' (sin microsegundos
+        # ni variantes): así el orden del texto es el orden cronológico y los
+        # filtros "fecha >= ? AND fecha < ?" son búsquedas por rango en el índice
+        *[
+            f"""
+            UPDATE {tabla} SET {columna} = strftime('%Y-%m-%dT%H:%M:%S', {columna})
+            WHERE strftime('%Y-%m-%dT%H:%M:%S', {columna}) IS NOT NULL
+              AND {columna} != strftime('%Y-%m-%dT%H:%M:%S', {columna})
+            """
+            for tabla, columna in (
+                ("pacientes", "fecha_creacion"),
+                ("sesiones", "fecha"),
+                ("pagos", "fecha"),
+                ("informes", "fecha_creacion"),
+            )
+        ],
+        # Sesiones e informes de un período, de todos los pacientes
+        # (pagos ya tiene idx_pagos_fecha)
+        "CREATE INDEX IF NOT EXISTS idx_sesiones_fecha ON sesiones (fecha)",
+        "CREATE INDEX IF NOT EXISTS idx_informes_fecha ON informes (fecha_creacion)",
+        "ANALYZE",
+    ]),
+    
+    (6, "Tabla resumen_mensual por paciente y mes, mantenida por triggers", [
+        # Un renglón por paciente y mes ('YYYY-MM'), montos en centavos:
+        # - facturado: precio de las sesiones del mes
+        # - cobrado: pagos del mes
+        # - informes: precio de los informes creados en el mes
+        # La deuda al cierre de cada mes se agrega en la migración 11
+        """
+        CREATE TABLE IF NOT EXISTS resumen_mensual (
+            paciente_id INTEGER NOT NULL,
+            mes TEXT NOT NULL,
+            facturado INTEGER NOT NULL DEFAULT 0,
+            cobrado INTEGER NOT NULL DEFAULT 0,
+            informes INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (paciente_id, mes),
+            FOREIGN KEY (paciente_id) REFERENCES pacientes(id) ON DELETE CASCADE
+        ) WITHOUT ROWID
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_resumen_mensual_mes ON resumen_mensual (mes)",
+        *_triggers_resumen(),
+        _llenar_montos_resumen,
+    ]),
+    
+    (7, "Cierres de mes: totales y detalle por paciente congelados", [
+        # Montos en centavos, con las mismas claves que obtener_estadisticas_mensuales
+        """
+        CREATE TABLE IF NOT EXISTS cierres_mensuales (
+            mes TEXT PRIMARY KEY,
+            fecha_cierre TEXT NOT NULL,
+            total_cobrado INTEGER NOT NULL,
+            cobrado_estandar INTEGER NOT NULL,
+            cobrado_mensual INTEGER NOT NULL,
+            cobrado_diagnostico INTEGER NOT NULL,
+            informes_total INTEGER NOT NULL,
+            deuda_total INTEGER NOT NULL,
+            deuda_estandar INTEGER NOT NULL,
+            deuda_mensual INTEGER NOT NULL,
+            deuda_diagnostico INTEGER NOT NULL
+        ) WITHOUT ROWID
+        """,
+        # Sin FOREIGN KEY a pacientes: el cierre conserva el nombre y el tipo
+        # que tenía el paciente, aunque después se modifique o se elimine
+        """
+        CREATE TABLE IF NOT EXISTS cierres_mensuales_pacientes (
+            mes TEXT NOT NULL,
+            posicion INTEGER NOT NULL,
+            paciente_id INTEGER NOT NULL,
+            nombre TEXT NOT NULL,
+            tipo TEXT NOT NULL,
+            arancel_social INTEGER NOT NULL,
+            cobrado INTEGER NOT NULL,
+            deuda INTEGER NOT NULL,
+            PRIMARY KEY (mes, posicion),
+            FOREIGN KEY (mes) REFERENCES cierres_mensuales(mes)
+        ) WITHOUT ROWID
+        """,
+        *_triggers_mes_cerrado(),
+    ]),
+    
+    (8, "Búsqueda de pacientes por nombre y notas, sin distinguir acentos", [
+        crear_busqueda_pacientes,
+    ]),
+    
+    (9, "Ajustes manuales de deuda, con su motivo", [
+        # Los triggers son lo único que mueve pacientes.deuda; un cambio a mano
+        # queda registrado acá (ver database.ajustar_deuda)
+        """
+        CREATE TABLE IF NOT EXISTS ajustes_deuda (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            paciente_id INTEGER NOT NULL,
+            fecha TEXT NOT NULL,
+            deuda_anterior INTEGER NOT NULL,
+            deuda_nueva INTEGER NOT NULL,
+            motivo TEXT NOT NULL,
+            FOREIGN KEY (paciente_id) REFERENCES pacientes(id) ON DELETE CASCADE
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_ajustes_deuda_paciente ON ajustes_deuda (paciente_id)",
+    ]),
+    
+    (10, "Saldo a favor que dejó cada pago", [
+        # Lo que sobró del pago después de pagar sesiones e informes (en
+        # centavos): eliminar el pago lo vuelve a sumar a la deuda, sin tocar
+        # el resto (ver database.eliminar_pago). Los pagos anteriores a esta
+        # migración quedan en 0: no se sabe qué parte de su monto sobró.
+        "ALTER TABLE pagos ADD COLUMN saldo_a_favor INTEGER NOT NULL DEFAULT 0",
+    ]),
+    
+    (11, "Fecha de pago de sesiones e informes y deuda al cierre de cada mes", [
+        # Cuándo se pagó la sesión o el informe (NULL si sigue pendiente; en un
+        # informe, la fecha del último cambio del pago). Lo marcado como pago
+        # antes de esta migración no tiene fecha: se toma la del registro.
+        "ALTER TABLE sesiones ADD COLUMN fecha_pago TEXT",
+        "ALTER TABLE informes ADD COLUMN fecha_pago TEXT",
+        "UPDATE sesiones SET fecha_pago = fecha WHERE estado != 'PENDIENTE'",
+        "UPDATE informes SET fecha_pago = fecha_creacion WHERE estado_pago = 'PAGADO' OR monto_pagado != 0",
+        # Si había algo pagado, se guarda cuándo corrió la migración: hasta ese
+        # mes la deuda al cierre es aproximada (un pago posterior a la sesión
+        # queda en el mes de la sesión) y cerrar_mes no cierra esos meses.
+        # En una base nueva la tabla queda vacía.
+        "CREATE TABLE IF NOT EXISTS fechas_pago_estimadas (hasta TEXT NOT NULL)",
+        """
+        INSERT INTO fechas_pago_estimadas (hasta)
+        SELECT strftime('%Y-%m-%dT%H:%M:%S', 'now', 'localtime')
+        WHERE EXISTS (SELECT 1 FROM sesiones WHERE fecha_pago IS NOT NULL)
+           OR EXISTS (SELECT 1 FROM informes WHERE fecha_pago IS NOT NULL)
+        """,
+        # Deuda del paciente al terminar el mes (ver _triggers_deuda_al_cierre)
+        "ALTER TABLE resumen_mensual ADD COLUMN deuda_cierre INTEGER NOT NULL DEFAULT 0",
+        "ALTER TABLE resumen_mensual ADD COLUMN informes_cierre INTEGER NOT NULL DEFAULT 0",
+        *_triggers_deuda_al_cierre(),
+        llenar_deuda_al_cierre,
+    ]),
+]
+
+VERSION_ESQUEMA = MIGRACIONES[-1][0]
+
+
+def version_actual(conn: sqlite3.Connection) -> int:
+    """Retorna la versión del esquema guardada en la base (PRAGMA user_version)"""
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def aplicar_migraciones(conn: sqlite3.Connection) -> int:
+    """
+    Aplica en orden las migraciones que la base todavía no tiene.
+    Debe llamarse dentro de una transacción: si un paso falla no queda
+    ninguna migración aplicada a medias.
+    Retorna la cantidad de migraciones aplicadas.
+    """
+    version = version_actual(conn)
+    aplicadas = 0
+
+    for numero, _descripcion, pasos in MIGRACIONES:
+        if numero <= version:
+            continue
+
+        for paso in pasos:
+            if callable(paso):
+                paso(conn)
+            else:
+                conn.execute(paso)
+
+        # PRAGMA no acepta parámetros; numero es siempre un int de esta lista
+        conn.execute(f"PRAGMA user_version = {int(numero)}")
+        aplicadas += 1
+
+    return aplicadas
@@ -1,7 +1,8 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime
+from decimal import Decimal, ROUND_HALF_UP
 from enum import Enum
-from typing import Optional
+from typing import Dict, List, Optional
 
 
 # Enums para los tipos (como en Java)
@@ -51,13 +52,48 @@ class EstadoPagoInforme(Enum):
     PAGADO = "Pagado"
 
 
+# Tablas de búsqueda precalculadas para cada enum (un dict común es más rápido
+# que Enum[...] o Enum(...)):
+#   POR_NOMBRE[TipoSesion]["PAREJA"] -> TipoSesion.PAREJA  (como se guarda en la BD)
+#   POR_VALOR[TipoSesion]["Pareja"]  -> TipoSesion.PAREJA  (como se muestra en pantalla)
+ENUMS = (
+    TipoPaciente, TipoSesion, EstadoSesion, ConceptoPago,
+    TipoInforme, EstadoInforme, EstadoPagoInforme,
+)
+POR_NOMBRE: Dict[type, Dict[str, Enum]] = {
+    enum: {miembro.name: miembro for miembro in enum} for enum in ENUMS
+}
+POR_VALOR: Dict[type, Dict[str, Enum]] = {
+    enum: {miembro.value: miembro for miembro in enum} for enum in ENUMS
+}
+
+
+# Montos de dinero: en la BD son centavos enteros, en los modelos pesos (float)
+_UN_CENTAVO = Decimal("0.01")
+
+
+def a_centavos(pesos) -> int:
+    """Convierte un monto en pesos (float, int o texto) a centavos enteros, redondeando al centavo"""
+    # str() da la representación corta del float (1.005 -> "1.005"), así el
+    # redondeo no depende del error binario de la multiplicación por 100
+    return int(Decimal(str(pesos)).quantize(_UN_CENTAVO, rounding=ROUND_HALF_UP) * 100)
+
+
+def a_pesos(centavos: int) -> float:
+    """Convierte centavos enteros a pesos (float) para mostrar o editar"""
+    return centavos / 100
+
+
 # Clases de datos con @dataclass
-@dataclass
+# slots=True: sin __dict__ por instancia, ocupan menos memoria y el acceso a
+# los atributos es más rápido (importa al cargar miles de sesiones o pagos).
+# No son frozen porque la interfaz modifica los objetos antes de guardarlos.
+@dataclass(slots=True)
 class Paciente:
     id: Optional[int]  # None cuando es nuevo, se asigna al guardar en BD
     nombre: str
     tipo: TipoPaciente
-    costo_sesion: float
+    costo_sesion: float  # Los montos se guardan en la BD en centavos (ver a_centavos)
     deuda: float  # Puede ser negativo si tiene saldo a favor
     arancel_social: bool
     notas: str
@@ -67,7 +103,7 @@ class Paciente:
         return f"{self.nombre} ({self.tipo.value})"
 
 
-@dataclass
+@dataclass(slots=True)
 class Sesion:
     id: Optional[int]
     paciente_id: int
@@ -81,7 +117,7 @@ class Sesion:
         return f"Sesión {self.tipo.value} - {self.fecha.strftime('%d/%m/%Y')}"
 
 
-@dataclass
+@dataclass(slots=True)
 class Pago:
     id: Optional[int]
     paciente_id: int
@@ -94,7 +130,7 @@ class Pago:
         return f"Pago ${self.monto} - {self.concepto.value}"
 
 
-@dataclass
+@dataclass(slots=True)
 class Informe:
     id: Optional[int]
     paciente_id: int
@@ -107,4 +143,41 @@ class Informe:
     fecha_creacion: datetime
     
     def __str__(self):
-        return f"Informe {self.tipo.value} - {self.estado.value}"
\ No newline at end of file
+        return f"Informe {self.tipo.value} - {self.estado.value}"
+
+
+@dataclass(slots=True)
+class PacienteSnapshot:
+    """
+    Todo lo que muestran las pestañas de un paciente, leído de una sola vez
+    (ver database.obtener_snapshot_paciente), con los conteos y totales ya
+    calculados. Se comparte entre llamadas: no hay que modificar las listas.
+    """
+    paciente: Paciente
+    sesiones: List[Sesion]
+    pagos: List[Pago]
+    informes: List[Informe]
+    sesiones_pagas: int
+    sesiones_pendientes: int
+    informes_pagados: int
+    monto_pagado: float  # Suma de todos los pagos
+    
+    def __str__(self):
+        return f"{self.paciente.nombre}: {len(self.sesiones)} sesiones, {len(self.pagos)} pagos, {len(self.informes)} informes"
+
+
+@dataclass(slots=True)
+class Cambios:
+    """
+    Lo que cambió en la base con una modificación (lo retornan las funciones
+    de database que modifican sesiones, pagos e informes), para que la
+    interfaz actualice solo eso en lugar de volver a leer todo el paciente.
+    Los registros guardados están como quedaron en la BD.
+    """
+    paciente: Optional[Paciente]  # Con la deuda nueva (None si ya no existe)
+    sesiones: List[Sesion] = field(default_factory=list)
+    pagos: List[Pago] = field(default_factory=list)
+    informes: List[Informe] = field(default_factory=list)
+    sesiones_eliminadas: List[int] = field(default_factory=list)
+    pagos_eliminados: List[int] = field(default_factory=list)
+    informes_eliminados: List[int] = field(default_factory=list)
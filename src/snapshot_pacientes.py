@@ -0,0 +1,98 @@
+"""
+Copia compacta de la lista de pacientes (id, nombre, tipo y deuda) que se
+guarda en un archivo al cerrar la aplicación. Al abrirla, la lista se
+muestra desde este archivo sin esperar a la base, y después se reemplaza
+por la que se lee de la base en segundo plano (ver gui.cargar_lista_pacientes).
+
+El archivo guarda el tamaño y la fecha de modificación de la base: si la
+base cambió desde entonces (otra instancia, una herramienta, un backup
+restaurado) no coinciden y el archivo se ignora.
+"""
+import os
+import struct
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from src import config
+from src.models import Paciente, TipoPaciente, a_centavos
+
+# Formato (little-endian):
+# - encabezado: marca, versión del formato, tamaño y fecha de modificación
+#   (en ns) de la base, cantidad de pacientes
+# - por paciente: id, tipo (posición en _TIPOS), deuda en centavos, largo del
+#   nombre en bytes, y el nombre en UTF-8
+# Si cambia el formato (o el orden de TipoPaciente) hay que subir _VERSION_FORMATO.
+_MARCA = b"CLPL"
+_VERSION_FORMATO = 1
+_ENCABEZADO = struct.Struct("<4sHqqI")
+_PACIENTE = struct.Struct("<qBqH")
+_TIPOS = tuple(TipoPaciente)
+_POSICION_TIPO = {tipo: i for i, tipo in enumerate(_TIPOS)}
+
+
+def _firma_base() -> Optional[Tuple[int, int]]:
+    """(tamaño, fecha de modificación en ns) del archivo de la base, o None si no existe"""
+    try:
+        stat = os.stat(config.DB_PATH)
+    except OSError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+
+def guardar(pacientes: List[Paciente]):
+    """
+    Guarda la lista de pacientes junto con la firma actual de la base.
+    Hay que llamarla con la base ya cerrada (ver conexion.cerrar_conexiones):
+    al cerrar una conexión SQLite todavía puede escribir en el archivo.
+    """
+    firma = _firma_base()
+    if firma is None:
+        return
+    
+    partes = [_ENCABEZADO.pack(_MARCA, _VERSION_FORMATO, firma[0], firma[1], len(pacientes))]
+    for paciente in pacientes:
+        nombre = paciente.nombre.encode("utf-8")
+        partes.append(_PACIENTE.pack(
+            paciente.id, _POSICION_TIPO[paciente.tipo], a_centavos(paciente.deuda), len(nombre)
+        ))
+        partes.append(nombre)
+    
+    # Escribir en un archivo aparte y reemplazar: nunca queda uno a medio escribir
+    ruta = config.SNAPSHOT_PACIENTES_PATH
+    temporal = ruta.with_name(ruta.name + ".tmp")
+    temporal.write_bytes(b"".join(partes))
+    os.replace(temporal, ruta)
+
+
+def leer() -> Optional[List[Paciente]]:
+    """
+    Retorna los pacientes guardados, o None si no hay archivo, si está dañado
+    o si la base cambió desde que se guardó.
+    Los pacientes solo tienen id, nombre, tipo y deuda: el resto de los campos
+    quedan vacíos (costo 0, sin notas) hasta que se lean de la base.
+    """
+    try:
+        datos = config.SNAPSHOT_PACIENTES_PATH.read_bytes()
+        marca, version, tamaño, modificacion, cantidad = _ENCABEZADO.unpack_from(datos)
+        if marca != _MARCA or version != _VERSION_FORMATO or (tamaño, modificacion) != _firma_base():
+            return None
+        
+        pacientes = []
+        posicion = _ENCABEZADO.size
+        for _ in range(cantidad):
+            id_, tipo, deuda, largo = _PACIENTE.unpack_from(datos, posicion)
+            posicion += _PACIENTE.size
+            nombre = datos[posicion:posicion + largo].decode("utf-8")
+            posicion += largo
+            pacientes.append(Paciente(id_, nombre, _TIPOS[tipo], 0.0, deuda / 100, False, None, datetime.min))
+    except (OSError, struct.error, UnicodeDecodeError, IndexError):
+        return None
+    
+    if posicion != len(datos):
+        return None
+    return pacientes
+
+
+def borrar():
+    """Descarta el archivo guardado (por ejemplo al restaurar un backup)"""
+    config.SNAPSHOT_PACIENTES_PATH.unlink(missing_ok=True)
@@ -0,0 +1,105 @@
+"""
+Tareas en segundo plano para la interfaz.
+
+Las operaciones largas (reportes, exportaciones, backups) y las que escriben
+en la base se ejecutan en un hilo aparte para que la ventana no se congele
+mientras tanto. Tk solo se puede usar desde el hilo principal: el resultado
+de cada tarea se entrega ahí, revisando cada tanto con root.after qué tareas
+terminaron.
+"""
+import tkinter as tk
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, List, Optional, Tuple
+
+# Cada cuánto (ms) se revisa si terminaron las tareas pendientes
+INTERVALO_REVISION = 50
+
+
+class EjecutorTareas:
+    """
+    Ejecuta funciones en un hilo de trabajo y entrega sus resultados en el
+    hilo de Tk.
+    - Hay un solo hilo para las tareas: corren de a una, en el orden en que se
+      pidieron (por ejemplo, una restauración de backup nunca se mezcla con
+      una exportación). El hilo usa su propia conexión a la base (ver conexion.py).
+    - Las lecturas cortas que la ventana principal necesita enseguida (la
+      lista de pacientes, las búsquedas, los datos del paciente elegido) se
+      piden con lectura=True y corren en otro hilo, con otra conexión: no
+      esperan detrás de una exportación.
+    - al_terminar(resultado) o al_fallar(error) se llaman desde root.after,
+      así que pueden usar widgets. Si se indicó una ventana y ya se cerró,
+      no se llama ninguno de los dos.
+    """
+    
+    def __init__(self, root: tk.Misc):
+        self.root = root
+        self._hilo = ThreadPoolExecutor(max_workers=1, thread_name_prefix="tareas")
+        self._hilo_lecturas = ThreadPoolExecutor(max_workers=1, thread_name_prefix="lecturas")
+        self._pendientes: List[Tuple[Future, Optional[Callable], Optional[Callable], Optional[tk.Misc]]] = []
+        self._revision = None  # after() programado por _programar_revision
+    
+    def ejecutar(self, funcion: Callable, *args, al_terminar: Optional[Callable] = None,
+                 al_fallar: Optional[Callable] = None, ventana: Optional[tk.Misc] = None,
+                 lectura: bool = False) -> Future:
+        """
+        Ejecuta funcion(*args) en el hilo de trabajo (en el de lecturas si lectura).
+        Si no se indica al_fallar, los errores se informan como los de
+        cualquier otro callback de Tk (root.report_callback_exception).
+        """
+        futuro = (self._hilo_lecturas if lectura else self._hilo).submit(funcion, *args)
+        self._pendientes.append((futuro, al_terminar, al_fallar, ventana))
+        self._programar_revision()
+        return futuro
+    
+    def ocupado(self) -> bool:
+        """True si hay tareas que todavía no entregaron su resultado"""
+        return bool(self._pendientes)
+    
+    def cerrar(self):
+        """
+        Descarta las tareas que todavía no empezaron y espera a que termine la
+        que está corriendo (por ejemplo un backup a medio copiar).
+        Se llama al cerrar la aplicación.
+        """
+        if self._revision is not None:
+            self.root.after_cancel(self._revision)
+            self._revision = None
+        self._pendientes.clear()
+        self._hilo_lecturas.shutdown(wait=True, cancel_futures=True)
+        self._hilo.shutdown(wait=True, cancel_futures=True)
+    
+    # ----- Internas -----
+    
+    def _programar_revision(self):
+        if self._revision is None:
+            self._revision = self.root.after(INTERVALO_REVISION, self._revisar)
+    
+    def _revisar(self):
+        """Entrega los resultados de las tareas que terminaron"""
+        self._revision = None
+        
+        terminadas = []
+        pendientes = []
+        for tarea in self._pendientes:
+            (terminadas if tarea[0].done() else pendientes).append(tarea)
+        self._pendientes = pendientes
+        
+        for futuro, al_terminar, al_fallar, ventana in terminadas:
+            if futuro.cancelled() or (ventana is not None and not ventana.winfo_exists()):
+                continue
+            
+            error = futuro.exception()
+            try:
+                if error is None:
+                    if al_terminar is not None:
+                        al_terminar(futuro.result())
+                elif al_fallar is not None:
+                    al_fallar(error)
+                else:
+                    raise error
+            except Exception as e:
+                # Un error en un callback no debe impedir entregar los demás
+                self.root.report_callback_exception(type(e), e, e.__traceback__)
+        
+        if self._pendientes:
+            self._programar_revision()
@@ -0,0 +1,434 @@
+"""
+Widgets reutilizables de la interfaz.
+
+ListaVirtual muestra listas largas (sesiones, pagos, informes) sin crear un
+juego de widgets por registro: solo existen las tarjetas que se ven en
+pantalla, más unas pocas de reserva, y se reciclan al hacer scroll.
+configurar y mostrar_u_ocultar cambian un widget solo si hace falta, para
+actualizar las pestañas sin destruir y volver a crear sus widgets.
+IndicadorOcupado avisa que una tarea corre en segundo plano (ver tareas.py).
+"""
+import tkinter as tk
+from tkinter import ttk
+from typing import Callable, Dict, Iterable, List, Optional
+
+from src.models import Sesion, Pago, Informe, EstadoSesion, EstadoPagoInforme
+
+
+# ========== ACTUALIZACIÓN DE WIDGETS ==========
+
+_SIN_VALOR = object()
+
+
+def configurar(widget: tk.Widget, **opciones):
+    """
+    Como widget.configure(**opciones), pero solo aplica las opciones que
+    cambiaron desde la última vez que se configuró con esta función: cada
+    configure es una llamada a Tk y puede hacer que se redibuje el widget.
+    """
+    anteriores = getattr(widget, "_opciones_actuales", None)
+    if anteriores is None:
+        anteriores = widget._opciones_actuales = {}
+    
+    cambios = {clave: valor for clave, valor in opciones.items() if anteriores.get(clave, _SIN_VALOR) != valor}
+    if cambios:
+        widget.configure(**cambios)
+        anteriores.update(cambios)
+
+
+def mostrar_u_ocultar(widget: tk.Widget, visible: bool, **opciones_pack):
+    """Hace pack (con opciones_pack) o pack_forget del widget, solo si no está ya así"""
+    empaquetado = widget.winfo_manager() == "pack"
+    if visible and not empaquetado:
+        widget.pack(**opciones_pack)
+    elif not visible and empaquetado:
+        widget.pack_forget()
+
+
+def _una_linea(texto: str, largo: int = 90) -> str:
+    """Deja el texto en una sola línea (las tarjetas tienen alto fijo), cortándolo si es largo"""
+    texto = " ".join(texto.split())
+    if len(texto) > largo:
+        return texto[:largo - 1] + "…"
+    return texto
+
+
+# ========== LISTA VIRTUAL ==========
+
+class ListaVirtual(tk.Frame):
+    """
+    Lista con scroll de tarjetas de alto fijo.
+    - Solo se crean las tarjetas visibles más `reserva` arriba y abajo; las que
+      salen de la vista vuelven a un pool y se reutilizan para otras filas.
+    - Los datos se piden por páginas con cargar(desde, cantidad) recién cuando
+      hace falta mostrarlos.
+    
+    crear_tarjeta(parent) crea una tarjeta vacía (un widget con el método
+    mostrar(item), ver TarjetaSesion); el alto de las filas se toma de la
+    primera tarjeta creada.
+    """
+    
+    def __init__(self, parent, crear_tarjeta: Callable, cargar: Callable[[int, int], list],
+                 total: int, reserva: int = 3, tamaño_pagina: int = 50, **kwargs):
+        kwargs.setdefault("bg", "white")
+        super().__init__(parent, **kwargs)
+        
+        self.crear_tarjeta = crear_tarjeta
+        self.cargar = cargar
+        self.total = total
+        self.reserva = reserva
+        self.tamaño_pagina = tamaño_pagina
+        self.margen = 5
+        self.alto_fila: Optional[int] = None
+        
+        self._paginas: Dict[int, list] = {}
+        self._visibles: Dict[int, tk.Widget] = {}   # índice de fila -> tarjeta
+        self._libres: List[tk.Widget] = []          # tarjetas para reutilizar
+        self._ventanas: Dict[tk.Widget, int] = {}   # tarjeta -> id en el canvas
+        
+        self.canvas = tk.Canvas(self, bg=kwargs["bg"], highlightthickness=0)
+        self.scrollbar = tk.Scrollbar(self, orient="vertical", command=self._desplazar)
+        self.canvas.configure(yscrollcommand=self.scrollbar.set)
+        
+        self.canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        
+        self.canvas.bind("<Configure>", self._al_redimensionar)
+        
+        # La rueda del mouse mueve la lista mientras el puntero esté encima
+        self.bind("<Enter>", self._activar_rueda)
+        self.bind("<Leave>", self._desactivar_rueda)
+    
+    # ----- Datos -----
+    
+    def item(self, indice: int):
+        """Retorna el registro de la fila indice, cargando su página si hace falta"""
+        numero, posicion = divmod(indice, self.tamaño_pagina)
+        pagina = self._paginas.get(numero)
+        if pagina is None:
+            pagina = self.cargar(numero * self.tamaño_pagina, self.tamaño_pagina)
+            self._paginas[numero] = pagina
+        return pagina[posicion]
+    
+    def actualizar(self, total: int, al_principio: bool = False):
+        """
+        Descarta las páginas cargadas y muestra los datos nuevos. Las tarjetas
+        visibles se quedan en su lugar y cada una cambia solo lo que cambió.
+        Con al_principio=True vuelve al comienzo de la lista.
+        """
+        self.total = total
+        self._paginas.clear()
+        if al_principio:
+            self.canvas.yview_moveto(0)
+        
+        for indice in list(self._visibles):
+            if indice < total:
+                self._visibles[indice].mostrar(self.item(indice))
+            else:
+                self._liberar(indice)
+        self._redibujar()
+    
+    # ----- Scroll -----
+    
+    def _desplazar(self, *args):
+        self.canvas.yview(*args)
+        self._redibujar()
+    
+    def _rueda(self, event):
+        if not self.winfo_exists():
+            return
+        if getattr(event, "num", None) == 4:
+            pasos = -1
+        elif getattr(event, "num", None) == 5:
+            pasos = 1
+        else:
+            pasos = -1 if event.delta > 0 else 1
+        self._desplazar("scroll", pasos * 2, "units")
+    
+    def _activar_rueda(self, _event):
+        self.bind_all("<MouseWheel>", self._rueda)
+        self.bind_all("<Button-4>", self._rueda)
+        self.bind_all("<Button-5>", self._rueda)
+    
+    def _desactivar_rueda(self, event):
+        # También llega Leave al pasar del fondo a una tarjeta: seguir con la rueda
+        dentro = self.winfo_containing(event.x_root, event.y_root)
+        if dentro is not None and str(dentro).startswith(str(self)):
+            return
+        self.unbind_all("<MouseWheel>")
+        self.unbind_all("<Button-4>")
+        self.unbind_all("<Button-5>")
+    
+    def _al_redimensionar(self, event):
+        ancho = max(event.width - 2 * self.margen, 1)
+        for ventana in self._ventanas.values():
+            self.canvas.itemconfigure(ventana, width=ancho)
+        self._redibujar()
+    
+    # ----- Tarjetas -----
+    
+    def _nueva_tarjeta(self) -> tk.Widget:
+        tarjeta = self.crear_tarjeta(self.canvas)
+        self._ventanas[tarjeta] = self.canvas.create_window(
+            self.margen, 0, window=tarjeta, anchor="nw",
+            width=max(self.canvas.winfo_width() - 2 * self.margen, 1)
+        )
+        return tarjeta
+    
+    def _liberar(self, indice: int):
+        tarjeta = self._visibles.pop(indice)
+        self.canvas.itemconfigure(self._ventanas[tarjeta], state="hidden")
+        self._libres.append(tarjeta)
+    
+    def _mostrar_fila(self, indice: int):
+        tarjeta = self._libres.pop() if self._libres else self._nueva_tarjeta()
+        tarjeta.mostrar(self.item(indice))
+        
+        if self.alto_fila is None:
+            # Primera tarjeta: su alto define el de todas las filas
+            tarjeta.update_idletasks()
+            self.alto_fila = tarjeta.winfo_reqheight() + 2 * self.margen
+        
+        ventana = self._ventanas[tarjeta]
+        self.canvas.coords(ventana, self.margen, indice * self.alto_fila + self.margen)
+        self.canvas.itemconfigure(ventana, state="normal", height=self.alto_fila - 2 * self.margen)
+        self._visibles[indice] = tarjeta
+    
+    def _redibujar(self):
+        """Muestra las filas que caen en la parte visible y libera las demás"""
+        if self.total == 0:
+            for indice in list(self._visibles):
+                self._liberar(indice)
+            configurar(self.canvas, scrollregion=(0, 0, 0, 0))
+            return
+        
+        if self.alto_fila is None:
+            self._mostrar_fila(0)
+        
+        configurar(self.canvas, scrollregion=(0, 0, 0, self.total * self.alto_fila))
+        
+        arriba = self.canvas.canvasy(0)
+        alto_visible = max(self.canvas.winfo_height(), self.alto_fila)
+        primero = max(0, int(arriba // self.alto_fila) - self.reserva)
+        ultimo = min(self.total, int((arriba + alto_visible) // self.alto_fila) + 1 + self.reserva)
+        
+        for indice in list(self._visibles):
+            if not primero <= indice < ultimo:
+                self._liberar(indice)
+        
+        for indice in range(primero, ultimo):
+            if indice not in self._visibles:
+                self._mostrar_fila(indice)
+
+
+# ========== TARJETAS ==========
+
+class TarjetaSesion(tk.Frame):
+    """Tarjeta de una sesión, reutilizable: se crea vacía y se llena con mostrar()"""
+    
+    def __init__(self, parent, marcar_paga: Callable, editar: Callable, eliminar: Callable):
+        super().__init__(parent, bg="white", relief=tk.SOLID, borderwidth=2, highlightthickness=2)
+        self.sesion: Optional[Sesion] = None
+        
+        contenido = tk.Frame(self, bg="white")
+        contenido.pack(fill=tk.BOTH, expand=True, padx=15, pady=10)
+        
+        # Primera fila: Fecha y estado
+        fila1 = tk.Frame(contenido, bg="white")
+        fila1.pack(fill=tk.X)
+        self.label_fecha = tk.Label(fila1, font=("Tahoma", 16, "bold"), bg="white")
+        self.label_fecha.pack(side=tk.LEFT)
+        self.label_estado = tk.Label(fila1, font=("Tahoma", 14, "bold"), bg="white")
+        self.label_estado.pack(side=tk.RIGHT)
+        
+        # Segunda fila: Tipo y precio
+        fila2 = tk.Frame(contenido, bg="white")
+        fila2.pack(fill=tk.X, pady=5)
+        self.label_tipo = tk.Label(fila2, font=("Tahoma", 14), bg="white", fg="#7f8c8d")
+        self.label_tipo.pack(side=tk.LEFT)
+        self.label_precio = tk.Label(fila2, font=("Tahoma", 15, "bold"), bg="white")
+        self.label_precio.pack(side=tk.RIGHT)
+        
+        # Tercera fila: Notas (vacía si no hay)
+        self.label_notas = tk.Label(contenido, font=("Tahoma", 13), bg="white", fg="#95a5a6", anchor="w")
+        self.label_notas.pack(fill=tk.X, pady=(5, 0))
+        
+        # Botones de acción
+        botones = tk.Frame(contenido, bg="white")
+        botones.pack(fill=tk.X, pady=(10, 0))
+        self.btn_marcar = tk.Button(
+            botones, text="✓ Marcar como Paga", command=lambda: marcar_paga(self.sesion),
+            bg="#27ae60", fg="white", font=("Tahoma", 13), padx=10, pady=3
+        )
+        self.btn_editar = tk.Button(
+            botones, text="✏️ Editar", command=lambda: editar(self.sesion),
+            bg="#3498db", fg="white", font=("Tahoma", 13), padx=10, pady=3
+        )
+        self.btn_editar.pack(side=tk.LEFT, padx=5)
+        tk.Button(
+            botones, text="🗑️ Eliminar", command=lambda: eliminar(self.sesion),
+            bg="#e74c3c", fg="white", font=("Tahoma", 13), padx=10, pady=3
+        ).pack(side=tk.LEFT, padx=5)
+    
+    def mostrar(self, sesion: Sesion):
+        self.sesion = sesion
+        paga = sesion.estado == EstadoSesion.PAGA
+        color = "#27ae60" if paga else "#e74c3c"
+        
+        configurar(self, highlightbackground=color)
+        configurar(self.label_fecha, text=sesion.fecha.strftime("%d/%m/%Y"))
+        configurar(self.label_estado, text="✓ PAGA" if paga else "⏳ PENDIENTE", fg=color)
+        configurar(self.label_tipo, text=f"Tipo: {sesion.tipo.value}")
+        configurar(self.label_precio, text=f"${sesion.precio:,.0f}")
+        configurar(self.label_notas, text=f"Notas: {_una_linea(sesion.notas)}" if sesion.notas else "")
+        
+        mostrar_u_ocultar(
+            self.btn_marcar, sesion.estado == EstadoSesion.PENDIENTE,
+            side=tk.LEFT, padx=(0, 5), before=self.btn_editar
+        )
+
+
+class TarjetaPago(tk.Frame):
+    """Tarjeta de un pago, reutilizable: se crea vacía y se llena con mostrar()"""
+    
+    def __init__(self, parent, eliminar: Callable):
+        super().__init__(
+            parent, bg="white", relief=tk.SOLID, borderwidth=2,
+            highlightbackground="#2980b9", highlightthickness=2
+        )
+        self.pago: Optional[Pago] = None
+        
+        contenido = tk.Frame(self, bg="white")
+        contenido.pack(fill=tk.BOTH, expand=True, padx=15, pady=10)
+        
+        # Primera fila: Fecha y monto
+        fila1 = tk.Frame(contenido, bg="white")
+        fila1.pack(fill=tk.X)
+        self.label_fecha = tk.Label(fila1, font=("Tahoma", 16, "bold"), bg="white")
+        self.label_fecha.pack(side=tk.LEFT)
+        self.label_monto = tk.Label(fila1, font=("Tahoma", 15, "bold"), bg="white")
+        self.label_monto.pack(side=tk.RIGHT)
+        
+        # Segunda fila: Concepto
+        self.label_concepto = tk.Label(contenido, font=("Tahoma", 14), bg="white", fg="#7f8c8d", anchor="w")
+        self.label_concepto.pack(fill=tk.X, pady=(5, 0))
+        
+        # Tercera fila: Notas (vacía si no hay)
+        self.label_notas = tk.Label(contenido, font=("Tahoma", 13), bg="white", fg="#95a5a6", anchor="w")
+        self.label_notas.pack(fill=tk.X, pady=(5, 0))
+        
+        # Botones de acción
+        botones = tk.Frame(contenido, bg="white")
+        botones.pack(fill=tk.X, pady=(10, 0))
+        tk.Button(
+            botones, text="🗑️ Eliminar", command=lambda: eliminar(self.pago),
+            bg="#e74c3c", fg="white", font=("Tahoma", 13), padx=10, pady=3
+        ).pack(side=tk.LEFT, padx=(0, 5))
+    
+    def mostrar(self, pago: Pago):
+        self.pago = pago
+        configurar(self.label_fecha, text=pago.fecha.strftime("%d/%m/%Y"))
+        configurar(self.label_monto, text=f"${pago.monto:,.0f}")
+        configurar(self.label_concepto, text=f"Concepto: {pago.concepto.value}")
+        configurar(self.label_notas, text=f"Notas: {_una_linea(pago.notas)}" if pago.notas else "")
+
+
+class TarjetaInforme(tk.Frame):
+    """Tarjeta de un informe, reutilizable: se crea vacía y se llena con mostrar()"""
+    
+    def __init__(self, parent, marcar_pagado: Callable, editar: Callable, eliminar: Callable):
+        super().__init__(parent, bg="white", relief=tk.SOLID, borderwidth=2, highlightthickness=2)
+        self.informe: Optional[Informe] = None
+        
+        contenido = tk.Frame(self, bg="white")
+        contenido.pack(fill=tk.BOTH, expand=True, padx=15, pady=10)
+        
+        # Primera fila: Tipo y estado
+        fila1 = tk.Frame(contenido, bg="white")
+        fila1.pack(fill=tk.X)
+        self.label_tipo = tk.Label(fila1, font=("Tahoma", 16, "bold"), bg="white")
+        self.label_tipo.pack(side=tk.LEFT)
+        self.label_estado = tk.Label(fila1, font=("Tahoma", 14, "bold"), bg="white", fg="#7f8c8d")
+        self.label_estado.pack(side=tk.RIGHT)
+        
+        # Segunda fila: Precio y monto pagado
+        fila2 = tk.Frame(contenido, bg="white")
+        fila2.pack(fill=tk.X, pady=5)
+        self.label_precio = tk.Label(fila2, font=("Tahoma", 15), bg="white")
+        self.label_precio.pack(side=tk.LEFT)
+        self.label_pagado = tk.Label(fila2, font=("Tahoma", 15), bg="white")
+        self.label_pagado.pack(side=tk.RIGHT)
+        
+        # Tercera fila: Notas (vacía si no hay)
+        self.label_notas = tk.Label(contenido, font=("Tahoma", 13), bg="white", fg="#95a5a6", anchor="w")
+        self.label_notas.pack(fill=tk.X, pady=(5, 0))
+        
+        # Botones de acción
+        botones = tk.Frame(contenido, bg="white")
+        botones.pack(fill=tk.X, pady=(10, 0))
+        self.btn_marcar = tk.Button(
+            botones, text="✓ Marcar como Pagado", command=lambda: marcar_pagado(self.informe),
+            bg="#27ae60", fg="white", font=("Tahoma", 13), padx=10, pady=3
+        )
+        self.btn_editar = tk.Button(
+            botones, text="✏️ Editar", command=lambda: editar(self.informe),
+            bg="#3498db", fg="white", font=("Tahoma", 13), padx=10, pady=3
+        )
+        self.btn_editar.pack(side=tk.LEFT, padx=5)
+        tk.Button(
+            botones, text="🗑️ Eliminar", command=lambda: eliminar(self.informe),
+            bg="#e74c3c", fg="white", font=("Tahoma", 13), padx=10, pady=3
+        ).pack(side=tk.LEFT, padx=5)
+    
+    def mostrar(self, informe: Informe):
+        self.informe = informe
+        pagado = informe.estado_pago == EstadoPagoInforme.PAGADO
+        
+        configurar(self, highlightbackground="#27ae60" if pagado else "#e74c3c")
+        configurar(self.label_tipo, text=informe.tipo.value)
+        configurar(self.label_estado, text=f"Estado: {informe.estado.value}")
+        configurar(self.label_precio, text=f"Precio: ${informe.precio:,.0f}")
+        configurar(self.label_pagado, text=f"Pagado: ${informe.monto_pagado:,.0f}")
+        configurar(self.label_notas, text=f"Notas: {_una_linea(informe.notas)}" if informe.notas else "")
+        
+        mostrar_u_ocultar(self.btn_marcar, not pagado, side=tk.LEFT, padx=(0, 5), before=self.btn_editar)
+
+
+# ========== TAREA EN CURSO ==========
+
+class IndicadorOcupado(tk.Frame):
+    """
+    Texto y barra de progreso animada para mostrar mientras una tarea corre
+    en segundo plano (no se sabe cuánto falta: la barra solo se mueve).
+    Mientras está visible, los botones indicados quedan deshabilitados (para
+    no lanzar la misma tarea dos veces) y el cursor de la ventana es el de espera.
+    """
+    
+    def __init__(self, parent, botones: Iterable[tk.Widget] = (), opciones_pack: Optional[dict] = None, **kwargs):
+        kwargs.setdefault("bg", parent.cget("bg"))
+        super().__init__(parent, **kwargs)
+        
+        self.botones = list(botones)
+        self.opciones_pack = opciones_pack or {"side": tk.LEFT, "padx": 10}
+        
+        self.label = tk.Label(self, font=("Tahoma", 13), bg=self.cget("bg"), fg="#7f8c8d")
+        self.label.pack(side=tk.LEFT, padx=(0, 8))
+        self.barra = ttk.Progressbar(self, mode="indeterminate", length=140)
+        self.barra.pack(side=tk.LEFT)
+    
+    def mostrar(self, texto: str):
+        """Muestra el indicador con texto y bloquea los botones"""
+        configurar(self.label, text=texto)
+        mostrar_u_ocultar(self, True, **self.opciones_pack)
+        self.barra.start(15)
+        for boton in self.botones:
+            boton.configure(state=tk.DISABLED)
+        self.winfo_toplevel().configure(cursor="watch")
+    
+    def ocultar(self):
+        """Oculta el indicador y vuelve a habilitar los botones"""
+        self.barra.stop()
+        mostrar_u_ocultar(self, False)
+        for boton in self.botones:
+            boton.configure(state=tk.NORMAL)
+        self.winfo_toplevel().configure(cursor="")
@@ -0,0 +1,93 @@
+"""
+Cada test usa una base de datos nueva en un directorio temporal (ver la
+fixture base), nunca la de la clínica.
+"""
+import sqlite3
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+# Como en main.py: los módulos se importan como src.*
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src import config
+import src.database as db
+from src.migraciones import MIGRACIONES
+from src.models import (
+    Paciente, Sesion, Pago, Informe, TipoPaciente, TipoSesion, EstadoSesion, ConceptoPago,
+    TipoInforme, EstadoInforme, EstadoPagoInforme
+)
+
+
+def _usar_tmp_path(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "DB_PATH", tmp_path / "clinica.db")
+    monkeypatch.setattr(config, "BACKUPS_PATH", tmp_path / "backups")
+    monkeypatch.setattr(config, "SNAPSHOT_PACIENTES_PATH", tmp_path / "pacientes.bin")
+
+
+@pytest.fixture
+def base(tmp_path, monkeypatch):
+    """Base de datos vacía, con el esquema al día, en tmp_path"""
+    _usar_tmp_path(tmp_path, monkeypatch)
+    
+    db.inicializar_base_datos()
+    yield config.DB_PATH
+    db.cerrar_conexiones()
+
+
+@pytest.fixture
+def base_sin_migrar(tmp_path, monkeypatch):
+    """
+    Base de la versión anterior a las migraciones, en tmp_path: las tablas
+    originales (montos REAL) y user_version 0. Retorna una conexión para
+    cargarle datos; el test la migra con db.inicializar_base_datos().
+    """
+    _usar_tmp_path(tmp_path, monkeypatch)
+    
+    conn = sqlite3.connect(config.DB_PATH, isolation_level=None)
+    # La migración 1 es el CREATE TABLE que hacía inicializar_base_datos
+    for sql in MIGRACIONES[0][2]:
+        conn.execute(sql)
+    yield conn
+    conn.close()
+    db.cerrar_conexiones()
+
+
+# ========== DATOS DE PRUEBA ==========
+# Cada fixture es una función que guarda un registro y retorna su id
+
+@pytest.fixture
+def crear_paciente(base):
+    def crear(nombre="Ana Pérez", tipo=TipoPaciente.ESTANDAR, notas=None, arancel_social=False) -> int:
+        return db.guardar_paciente(Paciente(None, nombre, tipo, 1000, 0, arancel_social, notas, datetime.now()))
+    return crear
+
+
+@pytest.fixture
+def crear_sesion(base):
+    def crear(paciente_id: int, fecha: datetime, precio=1000, estado=EstadoSesion.PENDIENTE) -> int:
+        sesion = Sesion(None, paciente_id, fecha, precio, estado, TipoSesion.ESTANDAR, None)
+        db.registrar_sesion(sesion)
+        return sesion.id
+    return crear
+
+
+@pytest.fixture
+def crear_pago(base):
+    def crear(paciente_id: int, fecha: datetime, monto) -> int:
+        resultado = db.registrar_pago(Pago(None, paciente_id, fecha, monto, ConceptoPago.SESION, None))
+        return resultado["cambios"].pagos[0].id
+    return crear
+
+
+@pytest.fixture
+def crear_informe(base):
+    def crear(paciente_id: int, fecha: datetime, precio=3000, monto_pagado=0,
+              estado_pago=EstadoPagoInforme.PENDIENTE) -> int:
+        informe = Informe(None, paciente_id, TipoInforme.CARTA, EstadoInforme.PENDIENTE,
+                          estado_pago, precio, monto_pagado, None, fecha)
+        db.registrar_informe(informe)
+        return informe.id
+    return crear
@@ -0,0 +1,52 @@
+from dataclasses import replace
+from datetime import datetime
+
+from src.busqueda import IndicePacientes
+from src.models import Paciente, TipoPaciente
+
+
+def _paciente(id_: int, nombre: str) -> Paciente:
+    return Paciente(id_, nombre, TipoPaciente.ESTANDAR, 1000, 0, False, None, datetime(2026, 1, 1))
+
+
+def _nombres(pacientes):
+    return [p.nombre for p in pacientes]
+
+
+def _indice() -> IndicePacientes:
+    return IndicePacientes([
+        _paciente(1, "Mariana Gómez"),
+        _paciente(2, "Martín Peña"),
+        _paciente(3, "Ana Martínez"),
+        _paciente(4, "Tomás Marín"),
+    ])
+
+
+def test_buscar_en_cualquier_parte_del_nombre():
+    indice = _indice()
+    assert _nombres(indice.buscar()) == ["Ana Martínez", "Mariana Gómez", "Martín Peña", "Tomás Marín"]
+    assert _nombres(indice.buscar("MARTIN")) == ["Ana Martínez", "Martín Peña"]
+    assert _nombres(indice.buscar("pena")) == ["Martín Peña"]
+    assert indice.buscar("xyz") == []
+
+
+def test_seguir_escribiendo_filtra_los_resultados_anteriores():
+    indice = _indice()
+    assert _nombres(indice.buscar("mar")) == ["Ana Martínez", "Mariana Gómez", "Martín Peña", "Tomás Marín"]
+    assert _nombres(indice.buscar("mari")) == ["Mariana Gómez", "Tomás Marín"]
+    assert _nombres(indice.buscar("marin")) == ["Tomás Marín"]
+    # Borrar letras o escribir otra cosa vuelve a buscar en todo el índice
+    assert _nombres(indice.buscar("mart")) == ["Ana Martínez", "Martín Peña"]
+    assert _nombres(indice.buscar("gomez")) == ["Mariana Gómez"]
+
+
+def test_los_cambios_no_dejan_resultados_viejos():
+    indice = _indice()
+    assert _nombres(indice.buscar("mari")) == ["Mariana Gómez", "Tomás Marín"]
+    
+    indice.guardar(replace(indice.obtener(2), nombre="Mariel Peña"))
+    indice.guardar(_paciente(5, "Marisa Ruiz"))
+    indice.quitar(4)
+    assert _nombres(indice.buscar("maris")) == ["Marisa Ruiz"]
+    assert _nombres(indice.buscar("mari")) == ["Mariana Gómez", "Mariel Peña", "Marisa Ruiz"]
+    assert len(indice) == 4
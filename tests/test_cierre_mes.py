@@ -0,0 +1,131 @@
+from dataclasses import replace
+from datetime import datetime
+
+import pytest
+
+import src.database as db
+from src.conexion import conexion, transaccion
+from src.models import EstadoSesion
+
+
+@pytest.fixture
+def enero_cerrado(crear_paciente, crear_sesion):
+    """Paciente con una sesión en enero de 2026, con el mes ya cerrado"""
+    paciente_id = crear_paciente()
+    crear_sesion(paciente_id, datetime(2026, 1, 5))
+    db.cerrar_mes(1, 2026)
+    return paciente_id, db.obtener_sesiones_paciente(paciente_id)[0]
+
+
+def test_mes_cerrado_no_acepta_registros_nuevos(enero_cerrado, crear_sesion, crear_pago):
+    paciente_id, _ = enero_cerrado
+    with pytest.raises(db.PeriodoCerradoError):
+        crear_sesion(paciente_id, datetime(2026, 1, 20))
+    with pytest.raises(db.PeriodoCerradoError):
+        crear_pago(paciente_id, datetime(2026, 1, 21), 500)
+    assert len(db.obtener_sesiones_paciente(paciente_id)) == 1
+    assert db.obtener_pagos_paciente(paciente_id) == []
+
+
+def test_mes_cerrado_no_acepta_cambios(enero_cerrado):
+    _, sesion = enero_cerrado
+    with pytest.raises(db.PeriodoCerradoError):
+        db.modificar_sesion(replace(sesion, precio=2000))
+    # Tampoco se puede mover la sesión fuera del mes cerrado
+    with pytest.raises(db.PeriodoCerradoError):
+        db.modificar_sesion(replace(sesion, fecha=datetime(2026, 2, 5)))
+    # Marcarla paga sí
+    db.modificar_sesion(replace(sesion, estado=EstadoSesion.PAGA))
+
+
+def test_mes_cerrado_no_acepta_eliminaciones(enero_cerrado):
+    paciente_id, sesion = enero_cerrado
+    with pytest.raises(db.PeriodoCerradoError):
+        db.eliminar_sesion(sesion.id)
+    assert db.obtener_sesiones_paciente(paciente_id)[0].precio == 1000
+
+
+def test_mes_cerrado_no_se_cierra_dos_veces(enero_cerrado):
+    with pytest.raises(ValueError):
+        db.cerrar_mes(1, 2026)
+
+
+def test_solo_se_cierran_meses_terminados(base):
+    ahora = datetime.now()
+    with pytest.raises(ValueError):
+        db.cerrar_mes(ahora.month, ahora.year)
+    assert not db.mes_cerrado(ahora.month, ahora.year)
+
+
+# ========== SALDOS DEL CIERRE ==========
+
+def test_el_cierre_guarda_la_deuda_al_terminar_el_mes(crear_paciente, crear_sesion, crear_pago):
+    ana, bruno = crear_paciente("Ana"), crear_paciente("Bruno")
+    crear_sesion(ana, datetime(2026, 3, 10))
+    crear_sesion(bruno, datetime(2026, 3, 11), precio=2000)
+    crear_pago(bruno, datetime(2026, 3, 25), 500)       # no alcanza para la sesión: saldo a favor
+    # Después de marzo: más sesiones y pagos que saldan lo de marzo
+    crear_sesion(ana, datetime(2026, 4, 7))
+    crear_pago(ana, datetime(2026, 4, 20), 1000)
+    crear_sesion(bruno, datetime(2026, 5, 4))
+    crear_pago(bruno, datetime(2026, 5, 6), 1500)
+    
+    antes = db.obtener_estadisticas_mensuales(3, 2026)
+    cierre = db.cerrar_mes(3, 2026)
+    
+    assert [(p["nombre"], p["cobrado"], p["deuda"]) for p in cierre["detalle_pacientes"]] == [
+        ("Ana", 0, 1000),
+        ("Bruno", 500, 1500),
+    ]
+    assert cierre["deuda_total"] == 2500
+    assert cierre["total_cobrado"] == 500
+    
+    # Lo que se veía antes de cerrar es lo que quedó guardado
+    despues = db.obtener_estadisticas_mensuales(3, 2026)
+    assert despues["fecha_cierre"] == cierre["fecha_cierre"]
+    assert {**antes, "fecha_cierre": None} == {**despues, "fecha_cierre": None}
+
+
+def test_el_cierre_no_cambia_con_lo_que_pasa_despues(crear_paciente, crear_sesion, crear_pago):
+    paciente_id = crear_paciente()
+    crear_sesion(paciente_id, datetime(2026, 3, 10))
+    db.cerrar_mes(3, 2026)
+    
+    crear_pago(paciente_id, datetime(2026, 4, 2), 1000)
+    crear_sesion(paciente_id, datetime(2026, 4, 9))
+    stats = db.obtener_estadisticas_mensuales(3, 2026)
+    assert stats["deuda_total"] == 1000
+    assert stats["detalle_pacientes"][0]["deuda"] == 1000
+
+
+def test_no_se_cierran_meses_anteriores_a_la_migracion_de_fechas_de_pago(base_sin_migrar):
+    # Sesión de marzo pagada en abril, cargada antes de que existiera fecha_pago
+    base_sin_migrar.execute(
+        "INSERT INTO pacientes VALUES (1, 'Ana', 'ESTANDAR', 1000.0, 0.0, 0, NULL, '2025-01-15T10:00:00')"
+    )
+    base_sin_migrar.execute(
+        "INSERT INTO sesiones VALUES (1, 1, '2025-03-10T10:00:00', 1000.0, 'PAGA', 'ESTANDAR', NULL)"
+    )
+    base_sin_migrar.execute("INSERT INTO pagos VALUES (1, 1, '2025-04-05T10:00:00', 1000.0, 'SESION', NULL)")
+    db.inicializar_base_datos()
+    
+    with conexion() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM fechas_pago_estimadas").fetchone()[0] == 1
+    # Como si la base se hubiera actualizado el 20 de abril
+    with transaccion() as conn:
+        conn.execute("UPDATE fechas_pago_estimadas SET hasta = '2025-04-20T09:00:00'")
+    
+    # La deuda de marzo (1000) no se puede saber: la sesión figura pagada en marzo
+    with pytest.raises(ValueError, match="04/2025"):
+        db.cerrar_mes(3, 2025)
+    assert not db.mes_cerrado(3, 2025)
+    
+    # Desde el mes de la actualización la deuda al cierre es exacta
+    assert db.cerrar_mes(4, 2025)["deuda_total"] == 0
+
+
+def test_en_una_base_nueva_se_cierra_cualquier_mes_terminado(crear_paciente, crear_sesion):
+    crear_sesion(crear_paciente(), datetime(2020, 6, 1))
+    with conexion() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM fechas_pago_estimadas").fetchone()[0] == 0
+    assert db.cerrar_mes(6, 2020)["deuda_total"] == 1000
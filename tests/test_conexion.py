@@ -0,0 +1,82 @@
+import sqlite3
+import threading
+
+import pytest
+
+from src.conexion import cerrar_conexiones, lectura, transaccion, version_datos
+
+
+def test_lectura_anidada(base):
+    with lectura() as conn:
+        with lectura():
+            conn.execute("SELECT COUNT(*) FROM pacientes").fetchone()
+        with transaccion():
+            conn.execute("SELECT COUNT(*) FROM sesiones").fetchone()
+        assert conn.in_transaction
+    assert not conn.in_transaction
+
+
+def test_lectura_sigue_con_su_conexion_si_otro_hilo_cierra(base):
+    with lectura() as conn:
+        hilo = threading.Thread(target=cerrar_conexiones)
+        hilo.start()
+        hilo.join()
+        # Una consulta anidada no cierra la conexión en medio de la lectura
+        with transaccion() as anidada:
+            assert anidada is conn
+    assert not conn.in_transaction
+
+
+def test_escritura_dentro_de_lectura(base):
+    antes = version_datos()
+    with lectura():
+        with transaccion() as conn:
+            conn.execute("""
+                INSERT INTO pacientes (nombre, tipo, costo_sesion, deuda, arancel_social, fecha_creacion)
+                VALUES ('Ana', 'ESTANDAR', 100000, 0, 0, '2026-01-01T00:00:00')
+            """)
+    assert version_datos() != antes
+
+    with pytest.raises(RuntimeError):
+        with lectura() as conn:
+            with transaccion():
+                conn.execute("DELETE FROM pacientes")
+            raise RuntimeError
+    with lectura() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM pacientes").fetchone()[0] == 1
+
+
+def _en_otro_hilo(funcion):
+    resultado = []
+    hilo = threading.Thread(target=lambda: resultado.append(funcion()))
+    hilo.start()
+    hilo.join()
+    return resultado[0] if resultado else None
+
+
+def _escribir():
+    with transaccion() as conn:
+        conn.execute("""
+            INSERT INTO pacientes (nombre, tipo, costo_sesion, deuda, arancel_social, fecha_creacion)
+            VALUES ('Ana', 'ESTANDAR', 100000, 0, 0, '2026-01-01T00:00:00')
+        """)
+
+
+def test_cada_escritura_cambia_la_version_una_vez(base):
+    antes = version_datos()
+    
+    # Escritura en otro hilo: todos los hilos ven la misma versión nueva
+    _en_otro_hilo(_escribir)
+    assert version_datos() == antes + 1
+    assert _en_otro_hilo(version_datos) == antes + 1
+    assert _en_otro_hilo(version_datos) == antes + 1
+    
+    _escribir()
+    assert _en_otro_hilo(version_datos) == antes + 2
+    assert version_datos() == antes + 2
+    
+    # Escritura de otro proceso
+    with sqlite3.connect(base) as otra:
+        otra.execute("UPDATE pacientes SET nombre = 'Ana María'")
+    otra.close()
+    assert version_datos() == antes + 3
@@ -0,0 +1,122 @@
+import threading
+from dataclasses import replace
+from datetime import date, datetime
+
+import pytest
+
+import src.database as db
+from src.conexion import conexion
+from src.models import Pago, Sesion, TipoSesion, EstadoSesion, ConceptoPago
+
+
+def _nombres(pacientes):
+    return [p.nombre for p in pacientes]
+
+
+# ========== BÚSQUEDA ==========
+
+@pytest.fixture
+def pacientes_para_buscar(crear_paciente):
+    return {
+        nombre: crear_paciente(nombre, notas=notas)
+        for nombre, notas in [
+            ("José García", None),
+            ("Martina Gonzalez", "Derivada por el colegio"),
+            ("Lucía Fernández", None),
+        ]
+    }
+
+
+def test_buscar_sin_acentos_ni_mayusculas(pacientes_para_buscar):
+    assert _nombres(db.buscar_pacientes("jose")) == ["José García"]
+    assert _nombres(db.buscar_pacientes("LUCIA fern")) == ["Lucía Fernández"]
+    assert _nombres(db.buscar_pacientes("colegio")) == ["Martina Gonzalez"]
+
+
+def test_buscar_con_errores_de_tipeo(pacientes_para_buscar):
+    assert _nombres(db.buscar_pacientes("gonzales")) == ["Martina Gonzalez"]
+    assert db.buscar_pacientes("xyzw") == []
+
+
+# ========== CAMBIOS EN EL SNAPSHOT DEL PACIENTE ==========
+
+def test_aplicar_cambios_mantiene_el_orden_de_la_base(crear_paciente, crear_sesion, crear_pago):
+    paciente_id = crear_paciente()
+    for dia in (3, 10, 10, 17):
+        crear_sesion(paciente_id, datetime(2026, 2, dia))
+    crear_pago(paciente_id, datetime(2026, 2, 20), 500)
+    snapshot = db.obtener_snapshot_paciente(paciente_id)
+    
+    # Sesión nueva con la misma fecha que otras dos: va después de ellas (por id)
+    nueva = Sesion(None, paciente_id, datetime(2026, 2, 10), 1000, EstadoSesion.PENDIENTE,
+                   TipoSesion.ESTANDAR, None)
+    snapshot = db.aplicar_cambios_al_snapshot(snapshot, db.registrar_sesion(nueva))
+    
+    # Una sesión que cambia de fecha pasa a su nuevo lugar
+    primera = snapshot.sesiones[-1]
+    cambios = db.modificar_sesion(replace(primera, fecha=datetime(2026, 2, 24)))
+    snapshot = db.aplicar_cambios_al_snapshot(snapshot, cambios)
+    
+    # Un pago que paga varias sesiones, y después se elimina otra
+    pago = Pago(None, paciente_id, datetime(2026, 2, 25), 2000, ConceptoPago.SESION, None)
+    snapshot = db.aplicar_cambios_al_snapshot(snapshot, db.registrar_pago(pago)["cambios"])
+    snapshot = db.aplicar_cambios_al_snapshot(snapshot, db.eliminar_sesion(snapshot.sesiones[1].id))
+    
+    assert snapshot == db.obtener_snapshot_paciente(paciente_id)
+    assert [s.fecha.day for s in snapshot.sesiones] == [24, 10, 10, 10]
+    assert (snapshot.sesiones_pagas, snapshot.sesiones_pendientes) == (2, 2)
+
+
+# ========== CONSULTAS POR RANGO DE FECHAS ==========
+
+def test_rango_mes():
+    assert db.rango_mes(3, 2026) == (datetime(2026, 3, 1), datetime(2026, 4, 1))
+    assert db.rango_mes(12, 2025) == (datetime(2025, 12, 1), datetime(2026, 1, 1))
+
+
+def test_obtener_en_rango(crear_paciente, crear_sesion, crear_pago, crear_informe):
+    ana, beto = crear_paciente("Ana"), crear_paciente("Beto")
+    crear_sesion(ana, datetime(2025, 11, 30, 23, 59))
+    diciembre = crear_sesion(ana, datetime(2025, 12, 1))        # primer día: incluido
+    fin_de_año = crear_sesion(beto, datetime(2025, 12, 31, 20))
+    crear_sesion(ana, datetime(2026, 1, 1))                     # primer día del mes siguiente: no
+    pago_id = crear_pago(beto, datetime(2025, 12, 15), 500)
+    crear_pago(beto, datetime(2026, 1, 2), 500)
+    informe_id = crear_informe(ana, datetime(2025, 12, 20))
+    crear_informe(ana, datetime(2026, 1, 20))
+    
+    rango = db.rango_mes(12, 2025)
+    assert [s.id for s in db.obtener_sesiones_en_rango(*rango)] == [diciembre, fin_de_año]
+    assert [s.id for s in db.obtener_sesiones_en_rango(*rango, paciente_id=beto)] == [fin_de_año]
+    assert [p.id for p in db.obtener_pagos_en_rango(*rango)] == [pago_id]
+    assert db.obtener_pagos_en_rango(*rango, paciente_id=ana) == []
+    assert [i.id for i in db.obtener_informes_en_rango(*rango, paciente_id=ana)] == [informe_id]
+    
+    # Con fechas (sin hora) y con un extremo abierto
+    assert len(db.obtener_sesiones_en_rango(date(2025, 12, 1), None)) == 3
+    assert len(db.obtener_sesiones_en_rango(None, date(2025, 12, 1))) == 1
+
+
+# ========== BACKUPS ==========
+
+def test_restaurar_backup_con_conexion_abierta_en_otro_hilo(crear_paciente):
+    crear_paciente("Antes del backup")
+    ruta = db.crear_backup()
+    crear_paciente("Después del backup")
+    
+    # Otro hilo (como el worker) deja su conexión abierta
+    hilo = threading.Thread(target=lambda: db.obtener_todos_pacientes())
+    hilo.start()
+    hilo.join()
+    
+    assert db.restaurar_backup(ruta)
+    assert _nombres(db.obtener_todos_pacientes()) == ["Antes del backup"]
+    
+    vistos = []
+    def leer():
+        with conexion() as conn:
+            vistos.extend(fila[0] for fila in conn.execute("SELECT nombre FROM pacientes"))
+    hilo = threading.Thread(target=leer)
+    hilo.start()
+    hilo.join()
+    assert vistos == ["Antes del backup"]
@@ -0,0 +1,74 @@
+import asyncio
+import threading
+import time
+from datetime import datetime
+
+import pytest
+
+import src.database as db
+import src.database_async as dba
+from src.models import Pago, ConceptoPago
+
+
+@pytest.fixture(autouse=True)
+def cerrar_hilos():
+    yield
+    dba.cerrar()
+
+
+def test_lee_lo_mismo_que_database(crear_paciente, crear_sesion, crear_pago, crear_informe):
+    paciente_id = crear_paciente()
+    crear_sesion(paciente_id, datetime(2026, 1, 5))
+    crear_pago(paciente_id, datetime(2026, 1, 10), 500)
+    crear_informe(paciente_id, datetime(2026, 1, 12))
+    
+    sesiones, pagos, informes = asyncio.run(dba.obtener_datos_paciente_async(paciente_id))
+    assert sesiones == db.obtener_sesiones_paciente(paciente_id)
+    assert pagos == db.obtener_pagos_paciente(paciente_id)
+    assert informes == db.obtener_informes_paciente(paciente_id)
+    assert dba.obtener_datos_paciente_async.__name__ == "obtener_datos_paciente_async"
+    assert dba.obtener_paciente_async.__name__ == "obtener_paciente_async"
+
+
+def test_escrituras_a_la_vez_en_un_solo_hilo(crear_paciente, crear_sesion):
+    paciente_id = crear_paciente()
+    for dia in range(1, 11):
+        crear_sesion(paciente_id, datetime(2026, 1, dia))
+    hilos = set()
+    
+    def pagar(fecha):
+        hilos.add(threading.current_thread().name)
+        return db.registrar_pago(Pago(None, paciente_id, fecha, 1000, ConceptoPago.SESION, None))
+    
+    async def pagar_todas():
+        return await asyncio.gather(*(
+            dba.ejecutar(pagar, datetime(2026, 1, 20, 10, minuto), escribe=True) for minuto in range(10)
+        ))
+    
+    resultados = asyncio.run(pagar_todas())
+    assert len(hilos) == 1
+    # Cada pago pagó una sesión distinta
+    assert len({r["sesiones_pagadas"][0]["id"] for r in resultados}) == 10
+    assert db.obtener_paciente(paciente_id).deuda == 0
+
+
+def test_limita_las_llamadas_en_curso(base, monkeypatch):
+    monkeypatch.setattr(dba, "MAX_PENDIENTES", 2)
+    lock = threading.Lock()
+    en_curso = [0]
+    maximo = [0]
+    
+    def leer():
+        with lock:
+            en_curso[0] += 1
+            maximo[0] = max(maximo[0], en_curso[0])
+        time.sleep(0.02)
+        with lock:
+            en_curso[0] -= 1
+        return db.obtener_todos_pacientes()
+    
+    async def leer_varias():
+        return await asyncio.gather(*(dba.ejecutar(leer) for _ in range(8)))
+    
+    assert asyncio.run(leer_varias()) == [[]] * 8
+    assert maximo[0] == 2
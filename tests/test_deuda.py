@@ -0,0 +1,80 @@
+from dataclasses import replace
+from datetime import datetime
+
+import pytest
+
+import src.database as db
+from src.models import EstadoSesion, EstadoPagoInforme
+
+
+def _deuda(paciente_id: int) -> float:
+    return db.obtener_paciente(paciente_id).deuda
+
+
+def test_los_triggers_mantienen_la_deuda(crear_paciente, crear_sesion, crear_informe):
+    paciente_id = crear_paciente()
+    sesion_id = crear_sesion(paciente_id, datetime(2026, 1, 5))
+    crear_sesion(paciente_id, datetime(2026, 1, 12), precio=1500.5)
+    informe_id = crear_informe(paciente_id, datetime(2026, 1, 20), precio=3000, monto_pagado=1000,
+                               estado_pago=EstadoPagoInforme.PAGO_PARCIAL)
+    assert _deuda(paciente_id) == 4500.5
+    
+    sesion = next(s for s in db.obtener_sesiones_paciente(paciente_id) if s.id == sesion_id)
+    db.modificar_sesion(replace(sesion, estado=EstadoSesion.PAGA))
+    assert _deuda(paciente_id) == 3500.5
+    
+    db.eliminar_informe(informe_id)
+    assert _deuda(paciente_id) == 1500.5
+    assert db.verificar_deuda_paciente(paciente_id)['diferencia'] == 0
+
+
+def test_guardar_paciente_desactualizado_no_pisa_la_deuda(crear_paciente, crear_sesion):
+    paciente_id = crear_paciente()
+    paciente = db.obtener_paciente(paciente_id)  # deuda 0
+    crear_sesion(paciente_id, datetime(2026, 1, 5))
+    
+    db.guardar_paciente(replace(paciente, notas="Cambió de horario"))
+    
+    guardado = db.obtener_paciente(paciente_id)
+    assert guardado.notas == "Cambió de horario"
+    assert guardado.deuda == 1000
+    assert db.verificar_deuda_paciente(paciente_id) == {'guardada': 1000, 'calculada': 1000, 'diferencia': 0}
+
+
+def test_ajustar_deuda_pide_motivo(crear_paciente):
+    paciente_id = crear_paciente()
+    with pytest.raises(ValueError):
+        db.ajustar_deuda(paciente_id, 500, "  ")
+    
+    assert db.ajustar_deuda(paciente_id, 500, "Deuda del sistema anterior") == 0
+    assert _deuda(paciente_id) == 500
+    assert db.verificar_deuda_paciente(paciente_id)['diferencia'] == 500
+
+
+# ========== ELIMINAR PAGOS ==========
+
+def test_eliminar_pago_conserva_los_ajustes(crear_paciente, crear_pago):
+    paciente_id = crear_paciente()
+    db.ajustar_deuda(paciente_id, 500, "Deuda del sistema anterior")
+    pago_id = crear_pago(paciente_id, datetime(2026, 2, 1), 800)
+    assert _deuda(paciente_id) == -300
+    
+    db.eliminar_pago(pago_id)
+    assert _deuda(paciente_id) == 500
+
+
+def test_eliminar_pago_deshace_solo_su_saldo_a_favor(crear_paciente, crear_sesion, crear_pago):
+    paciente_id = crear_paciente()
+    crear_sesion(paciente_id, datetime(2026, 2, 2))
+    primero = crear_pago(paciente_id, datetime(2026, 2, 3), 1500)   # paga la sesión, sobran 500
+    segundo = crear_pago(paciente_id, datetime(2026, 2, 4), 200)
+    assert _deuda(paciente_id) == -700
+    
+    db.eliminar_pago(primero)
+    # La sesión sigue paga y queda el saldo a favor del segundo pago
+    assert [s.estado for s in db.obtener_sesiones_paciente(paciente_id)] == [EstadoSesion.PAGA]
+    assert _deuda(paciente_id) == -200
+    
+    db.eliminar_pago(segundo)
+    assert _deuda(paciente_id) == 0
+    assert db.eliminar_pago(segundo) is None
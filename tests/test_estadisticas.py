@@ -0,0 +1,61 @@
+import sqlite3
+import threading
+from datetime import datetime
+
+import src.database as db
+from src.models import TipoPaciente
+
+
+def _detalle(stats: dict) -> list:
+    return [(p["nombre"], p["cobrado"], p["deuda"]) for p in stats["detalle_pacientes"]]
+
+
+def test_estadisticas_por_tipo_de_paciente(crear_paciente, crear_sesion, crear_pago, crear_informe):
+    ana = crear_paciente("Ana")
+    beto = crear_paciente("Beto", TipoPaciente.MENSUAL)
+    caro = crear_paciente("Caro", TipoPaciente.DIAGNOSTICO)
+    crear_paciente("Dani")  # sin movimientos: no aparece en el detalle
+    crear_sesion(ana, datetime(2026, 3, 5))
+    crear_pago(ana, datetime(2026, 3, 20), 1000)
+    crear_sesion(beto, datetime(2026, 3, 6), precio=2000)
+    crear_informe(caro, datetime(2026, 3, 10), precio=3000)
+    crear_pago(caro, datetime(2026, 4, 2), 1000)  # abril: no cuenta en marzo
+    
+    marzo = db.obtener_estadisticas_mensuales(3, 2026)
+    assert {clave: marzo[clave] for clave in db._CLAVES_TOTALES} == {
+        "total_cobrado": 1000, "cobrado_estandar": 1000, "cobrado_mensual": 0, "cobrado_diagnostico": 0,
+        "informes_total": 3000,
+        "deuda_total": 5000, "deuda_estandar": 0, "deuda_mensual": 2000, "deuda_diagnostico": 3000,
+    }
+    assert _detalle(marzo) == [("Ana", 1000, 0), ("Beto", 0, 2000), ("Caro", 0, 3000)]
+    assert marzo["fecha_cierre"] is None
+    
+    abril = db.obtener_estadisticas_mensuales(4, 2026)
+    assert abril["total_cobrado"] == 1000
+    assert abril["cobrado_diagnostico"] == 1000
+    assert abril["informes_total"] == 2000
+    assert abril["deuda_total"] == 4000
+    assert _detalle(abril) == [("Beto", 0, 2000), ("Caro", 1000, 2000)]
+
+
+def test_las_estadisticas_se_recalculan_despues_de_escribir(base, crear_paciente, crear_sesion, crear_pago):
+    ana = crear_paciente("Ana")
+    crear_sesion(ana, datetime(2026, 3, 5))
+    
+    guardadas = db.obtener_estadisticas_mensuales(3, 2026)
+    assert db.obtener_estadisticas_mensuales(3, 2026) is guardadas
+    
+    crear_pago(ana, datetime(2026, 3, 20), 1000)
+    assert db.obtener_estadisticas_mensuales(3, 2026)["total_cobrado"] == 1000
+    
+    # Escritura desde otro hilo (como el de tareas)
+    hilo = threading.Thread(target=crear_sesion, args=(ana, datetime(2026, 3, 25)))
+    hilo.start()
+    hilo.join()
+    assert db.obtener_estadisticas_mensuales(3, 2026)["deuda_total"] == 1000
+    
+    # Escritura desde otra conexión (por ejemplo otra instancia de la aplicación)
+    with sqlite3.connect(base) as otra:
+        otra.execute("UPDATE pacientes SET nombre = 'Ana María' WHERE id = ?", (ana,))
+    otra.close()
+    assert _detalle(db.obtener_estadisticas_mensuales(3, 2026)) == [("Ana María", 1000, 1000)]
@@ -0,0 +1,71 @@
+from datetime import date, datetime
+
+import src.database as db
+
+
+def _leer(ruta) -> list:
+    with open(ruta, newline='', encoding='utf-8') as archivo:
+        return archivo.read().split("\r\n")
+
+
+def test_exportar_sesiones_por_lotes(crear_paciente, crear_sesion, tmp_path, monkeypatch):
+    # Lotes chicos para que el archivo se escriba en varias tandas
+    monkeypatch.setattr(db, "TAMAÑO_LOTE_EXPORTACION", 2)
+    beto, ana = crear_paciente("Beto"), crear_paciente("Ana")
+    for paciente_id in (beto, ana):
+        for dia in (3, 4, 5):
+            crear_sesion(paciente_id, datetime(2026, 1, dia, 10, 30), precio=1234.5)
+    crear_sesion(ana, datetime(2026, 2, 1))
+    
+    ruta = tmp_path / "sesiones.csv"
+    db.exportar_sesiones_csv(str(ruta), date(2026, 1, 1), date(2026, 2, 1))
+    
+    assert _leer(ruta) == [
+        "Paciente,Fecha,Tipo,Precio,Estado,Notas",
+        'Ana,05/01/2026,Estándar,"$1,234.50",Pendiente,',
+        'Ana,04/01/2026,Estándar,"$1,234.50",Pendiente,',
+        'Ana,03/01/2026,Estándar,"$1,234.50",Pendiente,',
+        'Beto,05/01/2026,Estándar,"$1,234.50",Pendiente,',
+        'Beto,04/01/2026,Estándar,"$1,234.50",Pendiente,',
+        'Beto,03/01/2026,Estándar,"$1,234.50",Pendiente,',
+        "",
+    ]
+
+
+def test_exportar_pacientes(crear_paciente, crear_sesion, tmp_path):
+    ana = crear_paciente("Ana", notas="Viene los martes, a veces")
+    crear_paciente("Beto")
+    crear_sesion(ana, datetime(2026, 1, 5))
+    
+    ruta = tmp_path / "pacientes.csv"
+    db.exportar_pacientes_csv(str(ruta))
+    
+    assert _leer(ruta) == [
+        "Nombre,Tipo,Costo Sesión,Deuda Actual,Arancel Social,Notas",
+        'Ana,Estándar,"$1,000.00","$1,000.00",No,"Viene los martes, a veces"',
+        'Beto,Estándar,"$1,000.00",$0.00,No,',
+        "",
+    ]
+
+
+def test_exportar_pagos_e_informes_de_un_mes(crear_paciente, crear_pago, crear_informe, tmp_path):
+    ana = crear_paciente("Ana")
+    crear_informe(ana, datetime(2025, 11, 30), precio=2000)
+    crear_informe(ana, datetime(2025, 12, 1), precio=3000)
+    crear_pago(ana, datetime(2025, 12, 31, 18), 1000)
+    crear_pago(ana, datetime(2026, 1, 1), 1000)
+    
+    pagos, informes = tmp_path / "pagos.csv", tmp_path / "informes.csv"
+    db.exportar_pagos_csv(str(pagos), *db.rango_mes(12, 2025))
+    db.exportar_informes_csv(str(informes), *db.rango_mes(12, 2025))
+    
+    assert _leer(pagos) == [
+        "Paciente,Fecha,Monto,Concepto,Notas",
+        'Ana,31/12/2025,"$1,000.00",Sesión,',
+        "",
+    ]
+    assert _leer(informes) == [
+        "Paciente,Tipo,Estado,Precio,Monto Pagado,Estado Pago,Notas",
+        'Ana,"Carta - Instituciones, psiquiatras, trabajo, etc.",Pendiente,"$3,000.00",$0.00,Pendiente,',
+        "",
+    ]
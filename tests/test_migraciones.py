@@ -0,0 +1,86 @@
+from datetime import datetime
+
+import src.database as db
+from src.conexion import conexion
+from src.migraciones import VERSION_ESQUEMA, version_actual
+from src.models import Paciente, TipoPaciente
+
+
+def _cargar_datos_viejos(conn):
+    """
+    Datos como los guardaba la versión anterior a las migraciones: montos REAL
+    con centavos y fechas de datetime.isoformat() (con microsegundos o sin la T)
+    """
+    conn.executemany("INSERT INTO pacientes VALUES (?, ?, ?, ?, ?, ?, ?, ?)", [
+        (1, "Ana", "ESTANDAR", 1500.5, 3500.6, 0, None, "2025-01-15T11:20:33.456789"),
+        (2, "Beto", "MENSUAL", 2000.0, 0.0, 1, "Viene los martes", "2025-02-01 08:00:00"),
+    ])
+    conn.executemany("INSERT INTO sesiones VALUES (?, ?, ?, ?, ?, ?, ?)", [
+        (1, 1, "2025-02-03T09:00:00", 1500.5, "PAGA", "ESTANDAR", None),
+        (2, 1, "2025-03-10T14:30:00.123456", 1500.5, "PENDIENTE", "ESTANDAR", None),
+        (3, 2, "2025-03-04T18:00:00.5", 2000.0, "PAGA", "ESTANDAR", None),
+    ])
+    conn.executemany("INSERT INTO pagos VALUES (?, ?, ?, ?, ?, ?)", [
+        (1, 1, "2025-02-03T18:45:10.500000", 1500.5, "SESION", None),
+        (2, 1, "2025-03-25 10:00:00", 1000.0, "INFORME", None),
+        (3, 2, "2025-03-31T12:00:00.250000", 2000.0, "MENSUAL", None),
+    ])
+    conn.execute("INSERT INTO informes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", (
+        1, 1, "CARTA", "PENDIENTE", "PAGO_PARCIAL", 3000.1, 1000.0, None, "2025-03-20T10:00:00.000001"
+    ))
+
+
+def test_migrar_una_base_de_la_version_anterior(base_sin_migrar):
+    _cargar_datos_viejos(base_sin_migrar)
+    
+    db.inicializar_base_datos()
+    
+    with conexion() as conn:
+        assert version_actual(conn) == VERSION_ESQUEMA
+        assert conn.execute("PRAGMA integrity_check").fetchall() == [("ok",)]
+        assert conn.execute("PRAGMA foreign_key_check").fetchall() == []
+    
+        # Montos en centavos enteros y fechas 'YYYY-MM-DDTHH:MM:SS'
+        assert conn.execute(
+            "SELECT id, costo_sesion, deuda, fecha_creacion FROM pacientes ORDER BY id"
+        ).fetchall() == [
+            (1, 150050, 350060, "2025-01-15T11:20:33"),
+            (2, 200000, 0, "2025-02-01T08:00:00"),
+        ]
+        assert conn.execute("SELECT id, fecha, precio FROM sesiones ORDER BY id").fetchall() == [
+            (1, "2025-02-03T09:00:00", 150050),
+            (2, "2025-03-10T14:30:00", 150050),
+            (3, "2025-03-04T18:00:00", 200000),
+        ]
+        assert conn.execute("SELECT id, fecha, monto FROM pagos ORDER BY id").fetchall() == [
+            (1, "2025-02-03T18:45:10", 150050),
+            (2, "2025-03-25T10:00:00", 100000),
+            (3, "2025-03-31T12:00:00", 200000),
+        ]
+        assert conn.execute(
+            "SELECT fecha_creacion, precio, monto_pagado FROM informes"
+        ).fetchall() == [("2025-03-20T10:00:00", 300010, 100000)]
+    
+        assert conn.execute("""
+            SELECT paciente_id, mes, facturado, cobrado, informes
+            FROM resumen_mensual
+            WHERE facturado OR cobrado OR informes
+            ORDER BY paciente_id, mes
+        """).fetchall() == [
+            (1, "2025-02", 150050, 150050, 0),
+            (1, "2025-03", 150050, 100000, 300010),
+            (2, "2025-03", 200000, 200000, 0),
+        ]
+    
+    assert db.obtener_deuda_al_cierre(2, 2025) == {}
+    assert db.obtener_deuda_al_cierre(3, 2025) == {1: 3500.6}
+    
+    # Las consultas de siempre leen los datos migrados
+    assert [p.deuda for p in db.obtener_todos_pacientes()] == [3500.6, 0]
+    assert [s.fecha for s in db.obtener_sesiones_paciente(1)] == [
+        datetime(2025, 3, 10, 14, 30), datetime(2025, 2, 3, 9, 0)
+    ]
+    
+    # AUTOINCREMENT sigue después de los ids que ya había
+    nuevo = Paciente(None, "Caro", TipoPaciente.ESTANDAR, 1000, 0, False, None, datetime.now())
+    assert db.guardar_paciente(nuevo) == 3
@@ -0,0 +1,24 @@
+from decimal import Decimal
+
+import pytest
+
+from src.models import a_centavos, a_pesos
+
+
+@pytest.mark.parametrize("pesos, centavos", [
+    (1.005, 101),       # 1.005 * 100 da 100.49999... en binario
+    (0.1 + 0.2, 30),
+    (2.675, 268),
+    ("10.10", 1010),
+    (Decimal("3.335"), 334),
+    (1500, 150000),
+    (-0.005, -1),       # la mitad se redondea alejándose de cero
+    (-12.345, -1235),
+])
+def test_a_centavos_redondea_al_centavo(pesos, centavos):
+    assert a_centavos(pesos) == centavos
+
+
+def test_a_pesos_vuelve_al_mismo_monto():
+    for centavos in (0, 1, 101, -1235, 150000):
+        assert a_centavos(a_pesos(centavos)) == centavos
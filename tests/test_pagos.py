@@ -0,0 +1,56 @@
+from datetime import datetime
+
+import pytest
+
+import src.database as db
+from src.models import EstadoSesion, EstadoPagoInforme
+
+
+def _estados_sesiones(paciente_id: int) -> dict:
+    return {s.id: s.estado for s in db.obtener_sesiones_paciente(paciente_id)}
+
+
+def test_pago_automatico_reparte_sesiones_informes_y_saldo(crear_paciente, crear_sesion, crear_informe):
+    paciente_id = crear_paciente()
+    primera = crear_sesion(paciente_id, datetime(2026, 1, 5))
+    segunda = crear_sesion(paciente_id, datetime(2026, 1, 12))
+    tercera = crear_sesion(paciente_id, datetime(2026, 2, 2), precio=1500)
+    informe_id = crear_informe(paciente_id, datetime(2026, 1, 20), precio=3000)
+    
+    # Alcanza para las dos primeras sesiones; lo que sobra va al informe
+    resultado = db.aplicar_pago_automatico(paciente_id, 2500, datetime(2026, 2, 10))
+    assert [s["id"] for s in resultado["sesiones_pagadas"]] == [primera, segunda]
+    assert [(i["id"], i["monto_aplicado"], i["nuevo_estado"]) for i in resultado["informes_actualizados"]] == [
+        (informe_id, 500, EstadoPagoInforme.PAGO_PARCIAL.value)
+    ]
+    assert resultado["saldo_a_favor"] == 0
+    assert (resultado["deuda_anterior"], resultado["deuda_nueva"]) == (6500, 4000)
+    assert _estados_sesiones(paciente_id)[tercera] == EstadoSesion.PENDIENTE
+    
+    resultado = db.aplicar_pago_automatico(paciente_id, 5000, datetime(2026, 2, 20))
+    assert [s["id"] for s in resultado["sesiones_pagadas"]] == [tercera]
+    assert [(i["monto_aplicado"], i["nuevo_estado"]) for i in resultado["informes_actualizados"]] == [
+        (2500, EstadoPagoInforme.PAGADO.value)
+    ]
+    assert resultado["saldo_a_favor"] == 1000
+    assert db.obtener_paciente(paciente_id).deuda == -1000
+    assert db.verificar_deuda_paciente(paciente_id)["calculada"] == 0
+
+
+def test_pago_automatico_fallido_no_aplica_nada(crear_paciente, crear_sesion, crear_informe, monkeypatch):
+    paciente_id = crear_paciente()
+    crear_sesion(paciente_id, datetime(2026, 1, 5))
+    informe_id = crear_informe(paciente_id, datetime(2026, 1, 20), precio=3000)
+    
+    def falla(*_args):
+        raise RuntimeError("falla al guardar el saldo a favor")
+    monkeypatch.setattr(db, "_mover_deuda", falla)
+    
+    with pytest.raises(RuntimeError):
+        db.aplicar_pago_automatico(paciente_id, 5000)
+    
+    # Ya había marcado la sesión y el informe: se deshizo todo
+    assert set(_estados_sesiones(paciente_id).values()) == {EstadoSesion.PENDIENTE}
+    informe = next(i for i in db.obtener_informes_paciente(paciente_id) if i.id == informe_id)
+    assert (informe.estado_pago, informe.monto_pagado) == (EstadoPagoInforme.PENDIENTE, 0)
+    assert db.obtener_paciente(paciente_id).deuda == 4000
@@ -0,0 +1,136 @@
+from dataclasses import replace
+from datetime import datetime
+
+import src.database as db
+from src.conexion import conexion
+from src.models import EstadoSesion
+
+
+def _resumen():
+    """Renglones de resumen_mensual con montos del mes (sin los que solo llevan la deuda)"""
+    with conexion() as conn:
+        return conn.execute("""
+            SELECT paciente_id, mes, facturado, cobrado, informes, deuda_cierre, informes_cierre
+            FROM resumen_mensual
+            WHERE facturado OR cobrado OR informes
+            ORDER BY paciente_id, mes
+        """).fetchall()
+
+
+def _marcar(paciente_id: int, sesion_id: int, estado=EstadoSesion.PAGA):
+    sesion = next(s for s in db.obtener_sesiones_paciente(paciente_id) if s.id == sesion_id)
+    db.modificar_sesion(replace(sesion, estado=estado))
+
+
+def test_los_triggers_coinciden_con_reconstruir(crear_paciente, crear_sesion, crear_pago, crear_informe):
+    ana, bruno = crear_paciente("Ana"), crear_paciente("Bruno")
+    primera = crear_sesion(ana, datetime(2026, 1, 5))
+    crear_sesion(ana, datetime(2026, 2, 5), precio=1500)
+    crear_sesion(bruno, datetime(2026, 1, 7))
+    crear_informe(bruno, datetime(2026, 2, 10), precio=3000)
+    crear_pago(bruno, datetime(2026, 2, 12), 2000)  # paga la sesión y 1000 del informe
+    _marcar(ana, primera)
+    sesion = next(s for s in db.obtener_sesiones_paciente(ana) if s.id != primera)
+    db.modificar_sesion(replace(sesion, fecha=datetime(2026, 3, 1)))  # cambia de mes
+    
+    por_triggers = _resumen()
+    deudas_por_triggers = [db.obtener_deuda_al_cierre(mes, 2026) for mes in range(1, 13)]
+    db.reconstruir_resumen_mensual()
+    assert _resumen() == por_triggers
+    assert [db.obtener_deuda_al_cierre(mes, 2026) for mes in range(1, 13)] == deudas_por_triggers
+    
+    # (paciente_id, mes, facturado, cobrado, informes, deuda_cierre, informes_cierre)
+    assert por_triggers == [
+        (ana, "2026-01", 100000, 0, 0, 100000, 0),
+        (ana, "2026-03", 150000, 0, 0, 250000, 0),
+        (bruno, "2026-01", 100000, 0, 0, 100000, 0),
+        (bruno, "2026-02", 0, 200000, 300000, 200000, 200000),
+    ]
+    # La primera sesión de Ana se marcó paga hoy: hasta el mes pasado se debía
+    assert deudas_por_triggers[1] == {ana: 1000, bruno: 2000}
+
+
+def test_totales_por_mes(crear_paciente, crear_sesion, crear_pago):
+    ana, bruno = crear_paciente("Ana"), crear_paciente("Bruno")
+    crear_sesion(ana, datetime(2026, 1, 5))
+    crear_sesion(bruno, datetime(2026, 1, 20), precio=2000)
+    crear_pago(ana, datetime(2026, 2, 1), 1000)
+    
+    assert db.obtener_totales_por_mes() == [
+        {'mes': "2026-01", 'facturado': 3000, 'cobrado': 0, 'informes': 0},
+        {'mes': "2026-02", 'facturado': 0, 'cobrado': 1000, 'informes': 0},
+    ]
+    assert db.obtener_totales_por_mes(*db.rango_mes(2, 2026)) == [
+        {'mes': "2026-02", 'facturado': 0, 'cobrado': 1000, 'informes': 0},
+    ]
+
+
+# ========== DEUDA AL CIERRE DEL MES ==========
+
+def test_deuda_al_cierre_no_cambia_con_pagos_posteriores(crear_paciente, crear_sesion, crear_pago):
+    paciente_id = crear_paciente()
+    crear_sesion(paciente_id, datetime(2026, 3, 10))
+    crear_sesion(paciente_id, datetime(2026, 4, 10))
+    crear_pago(paciente_id, datetime(2026, 5, 2), 2000)  # paga las dos
+    
+    assert db.obtener_paciente(paciente_id).deuda == 0
+    assert db.obtener_deuda_al_cierre(2, 2026) == {}
+    assert db.obtener_deuda_al_cierre(3, 2026) == {paciente_id: 1000}
+    assert db.obtener_deuda_al_cierre(4, 2026) == {paciente_id: 2000}
+    assert db.obtener_deuda_al_cierre(5, 2026) == {}
+
+
+def test_deuda_al_cierre_con_pagos_del_mes(crear_paciente, crear_sesion, crear_pago, crear_informe):
+    paciente_id = crear_paciente()
+    crear_sesion(paciente_id, datetime(2026, 3, 10))
+    crear_informe(paciente_id, datetime(2026, 3, 15), precio=3000)
+    crear_pago(paciente_id, datetime(2026, 3, 20), 1500)   # la sesión y 500 del informe
+    crear_sesion(paciente_id, datetime(2026, 4, 10))
+    crear_pago(paciente_id, datetime(2026, 4, 20), 1000)   # la sesión de abril
+    
+    assert db.obtener_deuda_al_cierre(3, 2026) == {paciente_id: 2500}
+    assert db.obtener_deuda_al_cierre(4, 2026) == {paciente_id: 2500}
+    
+    crear_pago(paciente_id, datetime(2026, 5, 3), 2500)    # el resto del informe
+    assert db.obtener_deuda_al_cierre(3, 2026) == {paciente_id: 2500}
+    assert db.obtener_deuda_al_cierre(5, 2026) == {}
+
+
+def test_deuda_al_cierre_con_sesion_marcada_paga_despues(crear_paciente, crear_sesion):
+    paciente_id = crear_paciente()
+    sesion_id = crear_sesion(paciente_id, datetime(2026, 3, 10))
+    crear_sesion(paciente_id, datetime(2026, 3, 20), estado=EstadoSesion.PAGA)
+    db.cerrar_mes(3, 2026)
+    
+    # Se marca paga después de terminado marzo: la deuda de marzo no cambia
+    _marcar(paciente_id, sesion_id)
+    assert db.obtener_paciente(paciente_id).deuda == 0
+    assert db.obtener_deuda_al_cierre(3, 2026) == {paciente_id: 1000}
+    assert db.obtener_estadisticas_mensuales(3, 2026)["deuda_total"] == 1000
+    
+    mes_actual = datetime.now()
+    assert db.obtener_deuda_al_cierre(mes_actual.month, mes_actual.year) == {}
+    
+    # Y vuelve a estar pendiente: tampoco
+    _marcar(paciente_id, sesion_id, EstadoSesion.PENDIENTE)
+    assert db.obtener_deuda_al_cierre(3, 2026) == {paciente_id: 1000}
+
+
+def test_deuda_al_cierre_con_saldo_a_favor_y_ajustes(crear_paciente, crear_sesion, crear_pago):
+    paciente_id = crear_paciente()
+    crear_sesion(paciente_id, datetime(2026, 3, 10))
+    crear_pago(paciente_id, datetime(2026, 3, 20), 1500)    # 500 de saldo a favor
+    crear_sesion(paciente_id, datetime(2026, 4, 10), precio=400)  # lo usa
+    
+    assert db.obtener_deuda_al_cierre(3, 2026) == {}
+    assert db.obtener_estadisticas_mensuales(3, 2026)["deuda_total"] == 0
+    
+    db.ajustar_deuda(paciente_id, 800, "Deuda anterior al sistema")
+    mes_actual = datetime.now()
+    assert db.obtener_deuda_al_cierre(mes_actual.month, mes_actual.year) == {paciente_id: 800}
+    assert db.obtener_deuda_al_cierre(4, 2026) == {}
+    
+    # Reconstruir da lo mismo que los triggers
+    deudas = [db.obtener_deuda_al_cierre(mes, 2026) for mes in range(1, 13)]
+    db.reconstruir_resumen_mensual()
+    assert [db.obtener_deuda_al_cierre(mes, 2026) for mes in range(1, 13)] == deudas
@@ -0,0 +1,46 @@
+from src import config, snapshot_pacientes
+import src.database as db
+from src.models import TipoPaciente
+
+
+def _guardar_snapshot():
+    """Guarda la lista como al cerrar la aplicación (con la base ya cerrada)"""
+    pacientes = db.obtener_todos_pacientes()
+    db.cerrar_conexiones()
+    snapshot_pacientes.guardar(pacientes)
+    return pacientes
+
+
+def test_lee_lo_que_se_guardo(crear_paciente):
+    crear_paciente("Ana Pérez", TipoPaciente.MENSUAL)
+    crear_paciente("Ñandú Gómez", TipoPaciente.MENSUAL)
+    pacientes = _guardar_snapshot()
+    
+    leidos = snapshot_pacientes.leer()
+    assert [(p.id, p.nombre, p.tipo, p.deuda) for p in leidos] == \
+        [(p.id, p.nombre, p.tipo, p.deuda) for p in pacientes]
+
+
+def test_se_descarta_si_la_base_cambio(crear_paciente):
+    crear_paciente("Ana Pérez", TipoPaciente.MENSUAL)
+    _guardar_snapshot()
+    
+    crear_paciente("Bruno Díaz", TipoPaciente.MENSUAL)
+    db.cerrar_conexiones()
+    assert snapshot_pacientes.leer() is None
+
+
+def test_se_descarta_si_esta_danado(crear_paciente):
+    crear_paciente("Ana Pérez", TipoPaciente.MENSUAL)
+    _guardar_snapshot()
+    
+    datos = config.SNAPSHOT_PACIENTES_PATH.read_bytes()
+    config.SNAPSHOT_PACIENTES_PATH.write_bytes(datos[:-3])
+    assert snapshot_pacientes.leer() is None
+    
+    config.SNAPSHOT_PACIENTES_PATH.write_bytes(b"basura")
+    assert snapshot_pacientes.leer() is None
+
+
+def test_sin_archivo(base):
+    assert snapshot_pacientes.leer() is None